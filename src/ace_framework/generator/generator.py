@@ -19,7 +19,7 @@ from ace_framework.playbook.schemas import (
     GenerationResult,
     TrajectoryStep
 )
-from ace_framework.playbook.playbook_manager import PlaybookManager
+from ace_framework.playbook.playbook_manager import PlaybookManager, get_playbook_manager
 from utils.llm_provider import BaseLLMProvider, parse_json_response, extract_json_from_text
 from utils.config_loader import GeneratorConfig
 from utils.structured_logger import StructuredLogger, create_generator_logger
@@ -549,15 +549,17 @@ def create_generator(
     if config is None:
         config = get_ace_config().generator
 
-    playbook_manager = PlaybookManager(
-        playbook_path=playbook_path,
-        embedding_model=embedding_model
-    )
-
-    # Try to load existing playbook, or create empty one
+    # Try to reuse the loaded playbook, or create empty one
     try:
-        playbook_manager.load()
+        playbook_manager = get_playbook_manager(
+            playbook_path=playbook_path,
+            embedding_model=embedding_model
+        )
     except FileNotFoundError:
+        playbook_manager = PlaybookManager(
+            playbook_path=playbook_path,
+            embedding_model=embedding_model
+        )
         playbook_manager.get_or_create()
 
     return PlanGenerator(
@@ -12,7 +12,10 @@ Implements playbook operations:
 import json
 import os
 import hashlib
+import pickle
+import tempfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Dict, Tuple
 import numpy as np
@@ -21,6 +24,7 @@ import numpy as np
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from utils.qwen_embedding import QwenEmbeddingProvider, util
+from utils import json_utils
 
 from .schemas import Playbook, PlaybookBullet, BulletMetadata, BulletTag
 
@@ -28,6 +32,10 @@ from .schemas import Playbook, PlaybookBullet, BulletMetadata, BulletTag
 CACHE_VERSION = "1.0"
 CACHE_EMBEDDING_DIM = 1024  # Qwen text-embedding-v4 的维度
 
+# 进程间共享的已解析 playbook 快照（tmpfs 优先，仅当前用户可读写）
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = Path("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()) / f"ace-playbook-{os.getuid()}"
+
 
 class PlaybookManager:
     """
@@ -83,9 +91,15 @@ class PlaybookManager:
         if not self.playbook_path.exists():
             raise FileNotFoundError(f"Playbook not found: {self.playbook_path}")
 
+        # Step 0: 其他工作进程已解析过同一版本的 playbook 时直接复用快照
+        # （版本键在读取文件前获取，避免读取期间文件被改写导致快照与内容不符）
+        snapshot_key = self._snapshot_key()
+        if self._load_snapshot(snapshot_key):
+            print(f"  ✅ 复用已解析的 Playbook 快照，加载 {len(self._embeddings_cache)} 个 embedding")
+            return self._playbook
+
         # Step 1: 加载主文件
-        with open(self.playbook_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json_utils.loads(self.playbook_path.read_bytes())
 
         # Parse with Pydantic for validation
         self._playbook = Playbook(**data)
@@ -128,6 +142,9 @@ class PlaybookManager:
         if needs_compute or sync_status["needs_delete"]:
             self._save_cache_file(cache_data)
 
+        # Step 8: 保存快照（playbook 与 embedding 已完全同步）
+        self._save_snapshot(snapshot_key)
+
         return self._playbook
 
     def save(self, playbook: Optional[Playbook] = None) -> None:
@@ -198,6 +215,71 @@ class PlaybookManager:
     # Embedding Cache 管理
     # ========================================================================
 
+    # ========================================================================
+    # Parsed Snapshot (shared across worker processes)
+    # ========================================================================
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Snapshot file for this playbook (keyed on its absolute path)."""
+        key = hashlib.sha256(str(self.playbook_path.resolve()).encode()).hexdigest()[:16]
+        return SNAPSHOT_DIR / f"{self.playbook_path.stem}-{key}.pkl"
+
+    def _snapshot_key(self) -> tuple:
+        """Version key: the snapshot is valid only for this exact playbook file."""
+        stat = self.playbook_path.stat()
+        return (SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size, self.embedding_model)
+
+    def _load_snapshot(self, snapshot_key: tuple) -> bool:
+        """加载快照
+
+        Args:
+            snapshot_key: 当前 playbook 文件的版本键
+
+        Returns:
+            是否成功（快照不存在、过期、不可信或损坏时返回 False，由调用方走 JSON 加载）
+        """
+        try:
+            # 只信任当前用户独占目录中的快照（pickle 不可加载不可信数据）
+            dir_stat = SNAPSHOT_DIR.stat()
+            if dir_stat.st_uid != os.getuid() or dir_stat.st_mode & 0o077:
+                return False
+
+            with open(self.snapshot_path, 'rb') as f:
+                key, playbook, embeddings = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"  ⚠️  Playbook 快照不可用: {e}")
+            return False
+
+        if key != snapshot_key:
+            return False
+
+        self._playbook = playbook
+        self._embeddings_cache = embeddings
+        return True
+
+    def _save_snapshot(self, snapshot_key: tuple) -> None:
+        """原子写入快照（失败不影响加载结果）
+
+        Args:
+            snapshot_key: 读取 playbook 文件前获取的版本键
+        """
+        temp_file = self.snapshot_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            SNAPSHOT_DIR.mkdir(mode=0o700, exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                pickle.dump(
+                    (snapshot_key, self._playbook, self._embeddings_cache),
+                    f,
+                    protocol=5
+                )
+            temp_file.replace(self.snapshot_path)
+        except Exception as e:
+            temp_file.unlink(missing_ok=True)
+            print(f"  ⚠️  Playbook 快照保存失败: {e}")
+
     def _compute_content_hash(self, content: str) -> str:
         """计算 bullet content 的 SHA256 hash（前16字符）
 
@@ -230,8 +312,7 @@ class PlaybookManager:
             return None
 
         try:
-            with open(self.cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            cache_data = json_utils.loads(self.cache_path.read_bytes())
 
             # 验证版本兼容性
             if not self._validate_cache_version(cache_data):
@@ -763,3 +844,46 @@ class PlaybookManager:
     def playbook(self) -> Optional[Playbook]:
         """Get current playbook instance."""
         return self._playbook
+
+
+# ============================================================================
+# Process-level shared instance
+# ============================================================================
+
+@lru_cache(maxsize=4)
+def _load_playbook_manager(
+    playbook_path: str,
+    mtime_ns: int,
+    embedding_model: str
+) -> PlaybookManager:
+    """Create and load a PlaybookManager (cached per file version)."""
+    manager = PlaybookManager(playbook_path=playbook_path, embedding_model=embedding_model)
+    manager.load()
+    return manager
+
+
+def get_playbook_manager(
+    playbook_path: str,
+    embedding_model: str = "text-embedding-v4"
+) -> PlaybookManager:
+    """
+    Get a loaded PlaybookManager shared within the current process.
+
+    Components that ask for the same playbook get the same instance, so the
+    playbook JSON and embedding cache are parsed once per process. The cache
+    key includes the file's mtime: after save() rewrites the playbook, the
+    next call loads the new version.
+
+    Args:
+        playbook_path: Path to playbook JSON file
+        embedding_model: Qwen embedding model name
+
+    Returns:
+        Loaded PlaybookManager
+
+    Raises:
+        FileNotFoundError: If playbook file doesn't exist
+    """
+    path = str(Path(playbook_path).resolve())
+    return _load_playbook_manager(path, os.stat(path).st_mtime_ns, embedding_model)
+
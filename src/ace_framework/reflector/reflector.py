@@ -12,6 +12,7 @@ Implements ACE paper §3 Reflector role with:
 from typing import List, Dict, Optional
 import json
 import time
+from collections import Counter
 from datetime import datetime
 
 from ace_framework.playbook.schemas import (
@@ -190,14 +191,8 @@ class PlanReflector:
         bullet_tags = self._parse_bullet_tags(refined_output.get("bullet_tags", {}))
 
         # Log bullet tagging
-        tag_counts = {"helpful": 0, "harmful": 0, "neutral": 0}
-        for tag in bullet_tags.values():
-            if tag == BulletTag.HELPFUL:
-                tag_counts["helpful"] += 1
-            elif tag == BulletTag.HARMFUL:
-                tag_counts["harmful"] += 1
-            elif tag == BulletTag.NEUTRAL:
-                tag_counts["neutral"] += 1
+        counts = Counter(bullet_tags.values())
+        tag_counts = {tag.value: counts[tag] for tag in BulletTag}
 
         self.logger.log_bullet_tagging_done(
             tags={bid: tag.value for bid, tag in bullet_tags.items()},
@@ -0,0 +1,188 @@
+"""
+JSON Utilities - Fast JSON (de)serialization with optional orjson acceleration.
+
+orjson is an optional dependency (pip install orjson). When it is not
+installed, the standard library json module is used instead, so callers
+always get the same Python objects back.
+
+Both backends raise json.JSONDecodeError on invalid input
+(orjson.JSONDecodeError is a subclass of it).
+
+write_atomic() / write_bytes_atomic() / open_atomic() replace a file
+crash-safely (temp file + fsync + os.replace), so readers never observe a
+partially written document.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Union
+
+# orjson 作为可选依赖，不可用时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: JSON text (str) or UTF-8 encoded bytes
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Non-ASCII characters are written as-is (like ensure_ascii=False).
+    Objects orjson cannot handle fall back to the stdlib json module.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+        sort_keys: Sort dict keys, giving equal objects the same output
+            (e.g. for cache keys)
+
+    Returns:
+        JSON document as bytes
+
+    Raises:
+        TypeError: If obj is not JSON serializable
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass  # e.g. float subclasses, big ints - let stdlib json decide
+
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        sort_keys=sort_keys
+    ).encode("utf-8")
+
+
+def write_atomic(path: Union[str, Path], obj: Any, indent: bool = False) -> None:
+    """
+    Atomically write an object as JSON to a file.
+
+    See write_bytes_atomic() for the replacement guarantees.
+
+    Args:
+        path: Target file path
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+
+    Raises:
+        TypeError: If obj is not JSON serializable
+        OSError: If the file cannot be written
+    """
+    write_bytes_atomic(path, dumps(obj, indent=indent))
+
+
+def write_bytes_atomic(path: Union[str, Path], data: bytes, fsync: bool = True) -> None:
+    """
+    Atomically replace a file with the given bytes.
+
+    See open_atomic() for the replacement guarantees.
+
+    Args:
+        path: Target file path
+        data: New file content
+        fsync: Flush the file and the directory entry to disk. Without it
+            the replacement is still atomic for concurrent readers, but a
+            power loss may lose the latest write.
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    with open_atomic(path, fsync=fsync) as f:
+        f.write(data)
+
+
+@contextmanager
+def open_atomic(path: Union[str, Path], fsync: bool = True) -> Iterator[BinaryIO]:
+    """
+    Open a binary file whose content atomically replaces path on success.
+
+    Writes go to a temporary file in the same directory, which is moved over
+    the target with os.replace when the block exits normally, so readers see
+    either the old or the new content, never a truncated one. If the block
+    raises, the temporary file is removed and the target is left untouched.
+    An existing file's permission bits are preserved.
+
+    Args:
+        path: Target file path
+        fsync: Flush the file and the directory entry to disk (see
+            write_bytes_atomic)
+
+    Yields:
+        Binary file object for the new content
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.urandom(4).hex()}.tmp")
+
+    # 0o666 经 umask 处理，与普通 open() 新建文件的权限一致
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        except FileNotFoundError:
+            pass  # 新文件：保留 umask 决定的权限
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if not fsync:
+        return
+
+    # 持久化目录项（rename 本身），不支持目录 fsync 的平台忽略
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
@@ -198,13 +198,23 @@ class LogsManager:
     # ========================================================================
 
     def get_run_dir(self, run_id: Optional[str] = None) -> Path:
-        """Get run directory path."""
+        """Get run directory path.
+
+        The current run resolves to current_run_dir without searching (its
+        directory may have been removed; writers recreate it).
+
+        Raises:
+            ValueError: If there is no current run, or run_id is not found
+        """
+        if self.current_run_dir and run_id in (None, self.current_run_id):
+            return self.current_run_dir
         if run_id is None:
-            if self.current_run_dir:
-                return self.current_run_dir
             raise ValueError("No current run and no run_id provided")
 
-        return self._get_run_dir(run_id)
+        run_dir = self._get_run_dir(run_id)
+        if run_dir is None:
+            raise ValueError(f"Run directory not found: {run_id}")
+        return run_dir
 
     def get_component_log_path(
         self,
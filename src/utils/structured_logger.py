@@ -8,12 +8,15 @@ Provides:
 - Support for both per-run and global logs
 """
 
-import json
+import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, Optional, Literal
 from pathlib import Path
 
 from .logs_manager import LogsManager, get_logs_manager
+from . import json_utils
 
 
 LogLevel = Literal["debug", "info", "warning", "error"]
@@ -53,6 +56,16 @@ class StructuredLogger:
 
         # Global component log path
         self.global_log_path = self.logs_manager.components_dir / f"{component}.jsonl"
+        self.global_log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Run IDs whose log directory is known to exist (mkdir once per run)
+        self._dirs_ready: set = set()
+
+        # Cached raw O_APPEND file descriptors, keyed by log path, in LRU order.
+        # The logger is shared by worker threads: the lock keeps a descriptor
+        # from being evicted (closed) while another thread writes to it.
+        self._fds: "OrderedDict[Path, int]" = OrderedDict()
+        self._fd_lock = threading.Lock()
 
     # ========================================================================
     # Main Logging Methods
@@ -95,12 +108,16 @@ class StructuredLogger:
                     self.component,
                     run_id
                 )
+                if run_id not in self._dirs_ready:
+                    log_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._dirs_ready.add(run_id)
                 self._write_log_entry(log_path, entry)
 
                 # Register component usage
                 self.logs_manager.register_component(self.component, run_id)
             except (ValueError, FileNotFoundError) as e:
-                # Run directory doesn't exist yet
+                # Run directory doesn't exist yet; check it again on the next call
+                self._dirs_ready.discard(run_id)
                 print(f"Warning: Could not write to run log: {e}")
 
         # Write to global component log
@@ -456,10 +473,70 @@ class StructuredLogger:
     # ========================================================================
 
     def _write_log_entry(self, log_path: Path, entry: Dict[str, Any]):
-        """Write a log entry to file in JSONL format."""
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(log_path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        """Write a log entry to file in JSONL format (recreates a missing parent dir).
+
+        Uses a single os.write on an O_APPEND descriptor: the kernel positions
+        each write at end-of-file atomically, so concurrent writers never
+        interleave within a line and no user-space buffer needs flushing.
+        """
+        line = json_utils.dumps(entry) + b"\n"
+        with self._fd_lock:
+            try:
+                os.write(self._get_fd(log_path), line)
+            except OSError:
+                # Stale descriptor (e.g. EBADF): reopen once and retry
+                self._discard_fd(log_path)
+                os.write(self._get_fd(log_path), line)
+
+    def _get_fd(self, log_path: Path) -> int:
+        """Get (or open) the cached append-only descriptor for a log file.
+
+        Caller holds self._fd_lock.
+        """
+        fd = self._fds.get(log_path)
+        if fd is not None:
+            self._fds.move_to_end(log_path)
+            return fd
+
+        # Keep only a handful of run logs open in long-lived processes
+        if len(self._fds) >= 8:
+            _, oldest = self._fds.popitem(last=False)
+            try:
+                os.close(oldest)
+            except OSError:
+                pass
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC
+        try:
+            fd = os.open(log_path, flags, 0o644)
+        except FileNotFoundError:
+            # Log directory removed while running (log cleanup, rm): recreate once
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(log_path, flags, 0o644)
+        self._fds[log_path] = fd
+        return fd
+
+    def _discard_fd(self, log_path: Path):
+        """Drop and close the cached descriptor for one log file (caller holds the lock)."""
+        fd = self._fds.pop(log_path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def close(self):
+        """Close all cached log file descriptors."""
+        with self._fd_lock:
+            fds, self._fds = self._fds, OrderedDict()
+        for fd in fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __del__(self):
+        if getattr(self, "_fds", None):
+            self.close()
 
 
 # Factory functions for convenience
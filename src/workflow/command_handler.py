@@ -22,9 +22,50 @@ from workflow.task_manager import (
     GenerationTask,
     LogWriter
 )
-from workflow.retry_handler import RetryHandler
+from workflow.retry_handler import RetryHandler, STAGE_ALIASES
 from ace_framework.generator.generator import PlanGenerator
 from utils.llm_provider import BaseLLMProvider, extract_json_from_text
+from utils import json_utils
+
+
+# 需求提取提示词（{history} 为唯一占位符）
+EXTRACTION_PROMPT = """分析以下对话历史，提取实验需求信息。
+
+# 对话历史
+{history}
+
+# 任务
+提取以下信息（未提及的字段设为null）：
+
+1. **target_compound**: 目标化合物名称（必需）
+2. **objective**: 实验目标描述（必需，建议格式："反应类型+合成+化合物"或简洁描述）
+3. **constraints**: 约束条件列表（如"2小时内"、"使用基础设备"、"成本<500元"）
+4. **materials**: 材料列表（如果明确提到）
+5. **special_requirements**: 特殊要求（如"需要在通风橱操作"）
+
+# 输出格式
+只输出JSON，格式：
+```json
+{{
+  "target_compound": "化合物名称",
+  "objective": "实验目标描述",
+  "constraints": ["约束1", "约束2"],
+  "materials": [{{"name": "材料名", "amount": "10g", "purity": "99%"}}],
+  "special_requirements": "特殊要求"
+}}
+```
+
+**重要规则**：
+- target_compound和objective至少要有一个
+- constraints必须是具体的字符串列表，不要只写"是"/"否"
+- 没提到的字段用null
+- 只输出JSON，不要其他文字
+"""
+
+# 预先按 {history} 切分并还原 {{ }} 转义，避免每次调用走 str.format 解析整段模板
+_PROMPT_HEAD, _PROMPT_TAIL = (
+    part.format() for part in EXTRACTION_PROMPT.split("{history}")
+)
 
 
 class GenerateCommandHandler:
@@ -139,6 +180,9 @@ class GenerateCommandHandler:
             3. 等待用户确认（轮询任务状态）
             4. RAG 检索相关模板
             5. Generator 生成实验方案
+
+            中间状态（EXTRACTING/RETRIEVING/GENERATING）通过 mark_dirty 延迟落盘，
+            检查点（等待确认、完成、失败）通过 flush 立即落盘。
         """
         task_manager = get_task_manager()
 
@@ -146,7 +190,7 @@ class GenerateCommandHandler:
         # Step 1: 提取需求
         # ================================================================
         task.status = TaskStatus.EXTRACTING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         log.write("=" * 60)
         log.write("STEP 1: 提取需求")
@@ -158,14 +202,14 @@ class GenerateCommandHandler:
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = f"获取对话历史失败: {str(e)}"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log.write(f"失败: {task.error}")
             return
 
         if len(history) < 2:
             task.status = TaskStatus.FAILED
             task.error = "对话内容不足（至少需要2条消息）"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log.write(f"失败: {task.error}")
             return
 
@@ -179,7 +223,7 @@ class GenerateCommandHandler:
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = f"需求提取失败: {str(e)}"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log.write(f"失败: {task.error}")
             return
 
@@ -187,7 +231,7 @@ class GenerateCommandHandler:
         if not requirements.get("target_compound") and not requirements.get("objective"):
             task.status = TaskStatus.FAILED
             task.error = "无法提取足够信息（缺少target_compound和objective）"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log.write(f"失败: {task.error}")
             return
 
@@ -203,7 +247,7 @@ class GenerateCommandHandler:
         # Step 2: 等待用户确认
         # ================================================================
         task.status = TaskStatus.AWAITING_CONFIRM
-        task_manager._save_task(task)
+        task_manager.flush(task)
 
         log.write("")
         log.write("=" * 60)
@@ -239,7 +283,7 @@ class GenerateCommandHandler:
         if not requirements:
             task.status = TaskStatus.FAILED
             task.error = "需求文件不存在或已损坏"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log.write(f"失败: {task.error}")
             return
 
@@ -249,7 +293,7 @@ class GenerateCommandHandler:
         # Step 3: RAG检索
         # ================================================================
         task.status = TaskStatus.RETRIEVING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         log.write("")
         log.write("=" * 60)
@@ -275,7 +319,7 @@ class GenerateCommandHandler:
         # Step 4: 生成方案
         # ================================================================
         task.status = TaskStatus.GENERATING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         log.write("")
         log.write("=" * 60)
@@ -300,7 +344,7 @@ class GenerateCommandHandler:
 
             # 完成
             task.status = TaskStatus.COMPLETED
-            task_manager._save_task(task)
+            task_manager.flush(task)
 
             log.write("")
             log.write("=" * 60)
@@ -311,7 +355,7 @@ class GenerateCommandHandler:
             import traceback
             task.status = TaskStatus.FAILED
             task.error = f"生成失败: {str(e)}"
-            task_manager._save_task(task)
+            task_manager.flush(task)
 
             log.write(f"失败: {task.error}")
             log.write(traceback.format_exc())
@@ -335,46 +379,13 @@ class GenerateCommandHandler:
         Raises:
             ValueError: 提取失败
         """
-        EXTRACTION_PROMPT = """分析以下对话历史，提取实验需求信息。
-
-# 对话历史
-{history}
-
-# 任务
-提取以下信息（未提及的字段设为null）：
-
-1. **target_compound**: 目标化合物名称（必需）
-2. **objective**: 实验目标描述（必需，建议格式："反应类型+合成+化合物"或简洁描述）
-3. **constraints**: 约束条件列表（如"2小时内"、"使用基础设备"、"成本<500元"）
-4. **materials**: 材料列表（如果明确提到）
-5. **special_requirements**: 特殊要求（如"需要在通风橱操作"）
-
-# 输出格式
-只输出JSON，格式：
-```json
-{{
-  "target_compound": "化合物名称",
-  "objective": "实验目标描述",
-  "constraints": ["约束1", "约束2"],
-  "materials": [{{"name": "材料名", "amount": "10g", "purity": "99%"}}],
-  "special_requirements": "特殊要求"
-}}
-```
-
-**重要规则**：
-- target_compound和objective至少要有一个
-- constraints必须是具体的字符串列表，不要只写"是"/"否"
-- 没提到的字段用null
-- 只输出JSON，不要其他文字
-"""
-
         # 格式化对话历史
         formatted_history = "\n".join([
             f"{'用户' if msg['role'] == 'user' else '助手'}: {msg['content']}"
             for msg in history
         ])
 
-        prompt = EXTRACTION_PROMPT.format(history=formatted_history)
+        prompt = _PROMPT_HEAD + formatted_history + _PROMPT_TAIL
 
         # 调用LLM
         log.write("调用LLM提取需求...")
@@ -385,14 +396,27 @@ class GenerateCommandHandler:
 
         log.write(f"LLM响应: {len(response.content)}字符")
 
-        # 解析JSON
+        # 解析JSON（orjson可用时走C解析器，JSON允许首尾空白，无需strip）
+        content = response.content
         try:
-            requirements = json.loads(response.content.strip())
+            requirements = json_utils.loads(content)
         except json.JSONDecodeError:
-            # 尝试从文本中提取JSON
-            requirements = extract_json_from_text(response.content)
+            requirements = None
+
+            # 先尝试截取最外层 {...}（覆盖 ```json 代码块等常见包裹）
+            start = content.find("{")
+            end = content.rfind("}")
+            if start != -1 and end > start:
+                try:
+                    requirements = json_utils.loads(content[start:end + 1])
+                except json.JSONDecodeError:
+                    requirements = None
+
+            # 最后尝试从文本中提取JSON
+            if not isinstance(requirements, dict):
+                requirements = extract_json_from_text(content)
             if not requirements:
-                raise ValueError(f"无法解析LLM响应为JSON: {response.content[:200]}")
+                raise ValueError(f"无法解析LLM响应为JSON: {content[:200]}")
 
         # 清理空值
         requirements = {
@@ -472,14 +496,10 @@ class RetryCommandHandler:
         task = self.task_manager.get_task(task_id)
 
         # 5. 根据策略启动子进程
-        # 别名映射（与 retry_handler 保持一致）
-        stage_aliases = {
-            "generate": "generating",
-            "feedback": "evaluating"
-        }
-        actual_stage = stage_aliases.get(force_stage, force_stage) if force_stage else None
+        # 别名映射（与 retry_handler 共用同一份映射）
+        actual_stage = STAGE_ALIASES.get(force_stage, force_stage) if force_stage else None
 
-        if actual_stage in ['evaluating', 'reflecting', 'curating']:
+        if actual_stage in {'evaluating', 'reflecting', 'curating'}:
             # Feedback 流程：使用独立子进程
             success = self.task_scheduler.submit_feedback_task(
                 task_id=task_id,
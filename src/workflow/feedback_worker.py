@@ -15,11 +15,12 @@
 """
 
 import sys
-import json
 import argparse
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # 确保 src 在 Python 路径中
 current_file = Path(__file__).resolve()
@@ -33,6 +34,33 @@ from dotenv import load_dotenv
 load_dotenv(project_root / ".env")
 
 
+# 状态输出缓冲：stdout 是追加打开的 task.log，PYTHONUNBUFFERED=1 下每次 print 都是
+# 一次单独的 write；这里按阶段攒批，由 _flush() 在阶段边界（以及长耗时操作/退出之前）
+# 一次性写出，每个阶段只产生一次 write
+_log_batch: List[str] = []
+
+
+def _log(line: str = ""):
+    """缓存一行状态输出"""
+    _log_batch.append(line)
+
+
+def _banner(title: str):
+    """缓存阶段标题"""
+    _log()
+    _log("=" * 70)
+    _log(title)
+    _log("=" * 70)
+
+
+def _flush():
+    """一次性写出缓存的状态输出"""
+    if _log_batch:
+        sys.stdout.write("\n".join(_log_batch) + "\n")
+        _log_batch.clear()
+    sys.stdout.flush()
+
+
 def main():
     """反馈工作进程主入口"""
     # 解析参数
@@ -60,6 +88,7 @@ def main():
 
     except Exception as e:
         import traceback
+        _flush()
         print()
         print("=" * 70)
         print(f"❌ Feedback Worker 异常: {e}")
@@ -74,7 +103,7 @@ def main():
             if task:
                 task.status = TaskStatus.FAILED
                 task.error = f"反馈流程失败: {str(e)}"
-                tm._save_task(task)
+                tm.flush(task)
         except:
             pass
 
@@ -97,30 +126,32 @@ def run_feedback_workflow(task_id: str, evaluation_mode: Optional[str] = None):
         6. 完成（FEEDBACK_COMPLETED）
     """
     from workflow.task_manager import get_task_manager, TaskStatus
-    from utils.config_loader import get_ace_config
 
     # 1. 加载任务
     task_manager = get_task_manager()
     task = task_manager.get_task(task_id)
 
     if not task:
-        print(f"❌ 任务 {task_id} 不存在")
+        _log(f"❌ 任务 {task_id} 不存在")
+        _flush()
         sys.exit(1)
 
     # 验证状态
     if task.status != TaskStatus.COMPLETED:
-        print(f"❌ 任务状态为 {task.status.value}，只能对已完成的任务进行反馈")
+        _log(f"❌ 任务状态为 {task.status.value}，只能对已完成的任务进行反馈")
+        _flush()
         sys.exit(1)
 
-    print(f"[Worker] 任务已完成，开始反馈训练流程")
+    _log(f"[Worker] 任务已完成，开始反馈训练流程")
 
     # 2. 从配置读取默认评估模式（如果未指定）
     if evaluation_mode is None:
+        from utils.config_loader import get_ace_config
         ace_config = get_ace_config()
         evaluation_mode = ace_config.training.feedback_source
-        print(f"[Worker] 使用配置的评估模式: {evaluation_mode}")
+        _log(f"[Worker] 使用配置的评估模式: {evaluation_mode}")
     else:
-        print(f"[Worker] 使用指定的评估模式: {evaluation_mode}")
+        _log(f"[Worker] 使用指定的评估模式: {evaluation_mode}")
 
     # human模式需要读取反馈文件路径
     feedback_file = None
@@ -131,174 +162,112 @@ def run_feedback_workflow(task_id: str, evaluation_mode: Optional[str] = None):
                 "human模式需要feedback_file_path，但任务中未找到。\n"
                 "请使用: /feedback <task_id> --mode human --file feedback.yaml"
             )
-        print(f"[Worker] 反馈文件: {feedback_file}")
+        _log(f"[Worker] 反馈文件: {feedback_file}")
 
     # 3. 从 generation_result.json 加载完整数据
-    print()
-    print("=" * 70)
-    print("加载生成结果")
-    print("=" * 70)
+    _banner("加载生成结果")
+
+    from ace_framework.playbook.schemas import ExperimentPlan, TrajectoryStep
 
-    generation_result_data = task.load_generation_result()
+    # trajectory 在加载时直接构建为 TrajectoryStep（大文件流式解析，不保留原始字典）
+    generation_result_data = task.load_generation_result(
+        trajectory_factory=lambda step: TrajectoryStep(**step)
+    )
 
     if not generation_result_data:
         # 旧任务（没有 generation_result.json）
-        print("⚠️  旧任务缺少 generation_result.json，进行降级处理")
+        _log("⚠️  旧任务缺少 generation_result.json，进行降级处理")
 
         # 降级：只加载 plan
-        with open(task.plan_file, 'r', encoding='utf-8') as f:
-            plan_data = json.load(f)
+        from utils import json_utils
+        plan_data = json_utils.loads(task.plan_file.read_bytes())
 
-        from ace_framework.playbook.schemas import ExperimentPlan
         plan = ExperimentPlan(**plan_data)
 
         trajectory = []
         relevant_bullets = []
 
-        print(f"  ⚠️  Trajectory: 不可用（旧任务）")
-        print(f"  ⚠️  Relevant bullets: 不可用（旧任务）")
-        print(f"  ℹ️  反馈功能将受限")
+        _log(f"  ⚠️  Trajectory: 不可用（旧任务）")
+        _log(f"  ⚠️  Relevant bullets: 不可用（旧任务）")
+        _log(f"  ℹ️  反馈功能将受限")
     else:
         # 新任务（有完整数据）
-        from ace_framework.playbook.schemas import ExperimentPlan, TrajectoryStep
-
         plan = ExperimentPlan(**generation_result_data["plan"])
 
-        # 提取 trajectory（给 Reflector 分析推理过程）
-        trajectory = [
-            TrajectoryStep(**step)
-            for step in generation_result_data.get("trajectory", [])
-        ]
+        # 提取 trajectory（给 Reflector 分析推理过程，加载时已构建为 TrajectoryStep）
+        trajectory = generation_result_data["trajectory"]
 
         # 提取 relevant_bullets（给 Reflector 标记有用/有害的 bullets）
         relevant_bullets = generation_result_data.get("relevant_bullets", [])
 
-        print(f"  ✅ Plan: {plan.title}")
-        print(f"  ✅ Trajectory 步骤: {len(trajectory)}")
-        print(f"  ✅ Relevant bullets: {len(relevant_bullets)}")
+        _log(f"  ✅ Plan: {plan.title}")
+        _log(f"  ✅ Trajectory 步骤: {len(trajectory)}")
+        _log(f"  ✅ Relevant bullets: {len(relevant_bullets)}")
 
         if trajectory:
-            print(f"  ℹ️  Trajectory 预览: {trajectory[0].thought[:60]}...")
+            _log(f"  ℹ️  Trajectory 预览: {trajectory[0].thought[:60]}...")
         if relevant_bullets:
-            print(f"  ℹ️  Bullets 预览: {', '.join(relevant_bullets[:5])}")
+            _log(f"  ℹ️  Bullets 预览: {', '.join(relevant_bullets[:5])}")
+    _flush()
 
-    # 4. 初始化组件
-    print()
-    print("=" * 70)
-    print("初始化ACE组件")
-    print("=" * 70)
-
-    # LLM Provider
-    print("[1/4] 正在初始化LLM Provider...")
-    from utils.llm_provider import QwenProvider
-
-    llm_provider = QwenProvider(
-        model_name="qwen-max",
-        temperature=0.7,
-        max_tokens=4096
-    )
-    print("  ✅ Qwen Provider 已初始化")
-
-    # Playbook Manager
-    print("[2/4] 正在加载Playbook...")
-    from ace_framework.playbook.playbook_manager import PlaybookManager
-
-    playbook_path = "data/playbooks/chemistry_playbook.json"
-    playbook_manager = PlaybookManager(playbook_path=playbook_path)
-    playbook_manager.load()
-    print(f"  ✅ Playbook 已加载: {playbook_manager.playbook.size} bullets")
-
-    # Reflector
-    print("[3/4] 正在初始化Reflector...")
-    from ace_framework.reflector.reflector import PlanReflector
-    from utils.config_loader import ReflectorConfig
-
-    reflector = PlanReflector(
-        llm_provider=llm_provider,
-        config=ReflectorConfig(),
-        playbook_manager=playbook_manager
-    )
-    print("  ✅ Reflector 已初始化")
-
-    # Curator
-    print("[4/4] 正在初始化Curator...")
-    from ace_framework.curator.curator import PlaybookCurator
-    from utils.config_loader import CuratorConfig
-
-    curator = PlaybookCurator(
-        playbook_manager=playbook_manager,
-        llm_provider=llm_provider,
-        config=CuratorConfig()
-        # 使用配置文件中的 allow_new_sections 设置（configs/playbook_sections.yaml）
-        # 不在运行时覆盖，确保行为可预测且配置统一
-    )
-    print("  ✅ Curator 已初始化")
+    # 4. 初始化LLM Provider（重量级模块在此处才导入，任务校验失败时不产生导入开销）
+    llm_provider = _init_llm_provider()
 
     # ========================================================================
-    # Step 1: 评估
+    # Step 1: 评估（与Playbook/Reflector/Curator初始化并行）
     # ========================================================================
+    # 评估只依赖 plan 和 llm_provider，与组件初始化互不依赖；
+    # 后台线程先发起评估（llm_judge模式为一次LLM调用），主线程同时初始化组件，
+    # 耗时从 Σ 变为 max。反思依赖评估结果、更新依赖反思结果，这两步仍需串行。
+    # 阶段切换用 mark_dirty 延迟写入（相邻的快速切换合并为一次 task.json 写入），
+    # 完成/失败等终态用 flush 立即落盘（同时取消待执行的延迟写入）
     task.feedback_status = "evaluating"
-    task_manager._save_task(task)
-
-    print()
-    print("=" * 70)
-    print("STEP 1: 评估方案质量")
-    print("=" * 70)
-    print(f"  评估模式: {evaluation_mode}")
-
-    from evaluation.evaluator import create_evaluator
+    task_manager.mark_dirty(task)
 
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evaluator")
     try:
-        # 创建评估器（human模式传入文件路径）
-        if evaluation_mode == "human":
-            evaluator = create_evaluator(
-                source="human",
-                feedback_file=feedback_file
-            )
-        elif evaluation_mode == "llm_judge":
-            evaluator = create_evaluator(
-                source="llm_judge",
-                llm_provider=llm_provider
-            )
-        else:  # auto
-            evaluator = create_evaluator(source="auto")
+        evaluation_future = executor.submit(
+            _evaluate_plan, plan, evaluation_mode, llm_provider, feedback_file
+        )
+        playbook_manager, reflector, curator = _init_components(llm_provider)
+    except BaseException:
+        # 组件初始化失败：取消尚未开始的评估，不让后台线程继续发起 LLM 调用
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    # 成功时不取消：评估可能尚未被线程取走，仍需执行
+    executor.shutdown(wait=False)
+
+    _banner("STEP 1: 评估方案质量")
+    _log(f"  评估模式: {evaluation_mode}")
+    _flush()
 
-        # 执行评估
-        feedback = evaluator.evaluate(plan)
+    try:
+        # 等待后台评估完成
+        feedback = evaluation_future.result()
 
         task.save_feedback(feedback)
-        print(f"  ✅ 评估完成: {feedback.overall_score:.2f}")
+        _log(f"  ✅ 评估完成: {feedback.overall_score:.2f}")
 
         # 显示评分详情
-        print(f"\n  评分详情:")
+        _log(f"\n  评分详情:")
         for score in feedback.scores:
-            print(f"    - {score.criterion}: {score.score:.2f}")
-        print(f"  评论: {feedback.comments}")
-        print(f"  ✅ 反馈已保存: {task.feedback_file}")
+            _log(f"    - {score.criterion}: {score.score:.2f}")
+        _log(f"  评论: {feedback.comments}")
+        _log(f"  ✅ 反馈已保存: {task.feedback_file}")
+        _flush()
 
     except Exception as e:
         # Feedback流程失败，不影响主任务
-        task.feedback_status = "failed"
-        task.feedback_error = f"评估失败: {str(e)}"
-        task.failed_stage = "evaluating"  # 记录失败阶段
-        task.status = TaskStatus.FAILED  # 标记整体失败（用于retry）
-        task.error = task.feedback_error
-        task_manager._save_task(task)
-        print(f"  ❌ 评估失败: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        _fail_stage(task_manager, task, "evaluating", "评估失败", e)
 
     # ========================================================================
     # Step 2: 反思
     # ========================================================================
     task.feedback_status = "reflecting"
-    task_manager._save_task(task)
+    task_manager.mark_dirty(task)
 
-    print()
-    print("=" * 70)
-    print("STEP 2: 反思分析")
-    print("=" * 70)
+    _banner("STEP 2: 反思分析")
+    _flush()
 
     try:
         reflection_result = reflector.reflect(
@@ -310,51 +279,39 @@ def run_feedback_workflow(task_id: str, evaluation_mode: Optional[str] = None):
         )
 
         task.save_reflection(reflection_result)
-        print(f"  ✅ 提取了 {len(reflection_result.insights)} 个 insights")
-        print(f"  ✅ 标记了 {len(reflection_result.bullet_tags)} 个 bullets")
+        _log(f"  ✅ 提取了 {len(reflection_result.insights)} 个 insights")
+        _log(f"  ✅ 标记了 {len(reflection_result.bullet_tags)} 个 bullets")
 
         # 显示insights示例
         if reflection_result.insights:
-            print(f"\n  示例insight:")
+            _log(f"\n  示例insight:")
             for i, insight in enumerate(reflection_result.insights[:3], 1):
-                print(f"    {i}. [{insight.type}] {insight.description[:60]}...")
-                print(f"       优先级: {insight.priority}")
+                _log(f"    {i}. [{insight.type}] {insight.description[:60]}...")
+                _log(f"       优先级: {insight.priority}")
 
         # 显示bullet标记统计
         if reflection_result.bullet_tags:
-            helpful_count = sum(1 for tag in reflection_result.bullet_tags.values() if tag == "helpful")
-            harmful_count = sum(1 for tag in reflection_result.bullet_tags.values() if tag == "harmful")
-            neutral_count = sum(1 for tag in reflection_result.bullet_tags.values() if tag == "neutral")
-            print(f"\n  Bullet 标记统计:")
-            print(f"    - Helpful: {helpful_count}")
-            print(f"    - Harmful: {harmful_count}")
-            print(f"    - Neutral: {neutral_count}")
+            tag_counts = Counter(reflection_result.bullet_tags.values())
+            _log(f"\n  Bullet 标记统计:")
+            _log(f"    - Helpful: {tag_counts['helpful']}")
+            _log(f"    - Harmful: {tag_counts['harmful']}")
+            _log(f"    - Neutral: {tag_counts['neutral']}")
 
-        print(f"  ✅ 反思结果已保存: {task.reflection_file}")
+        _log(f"  ✅ 反思结果已保存: {task.reflection_file}")
+        _flush()
 
     except Exception as e:
-        # Feedback流程失败
-        task.feedback_status = "failed"
-        task.feedback_error = f"反思失败: {str(e)}"
-        task.failed_stage = "reflecting"  # 记录失败阶段
-        task.status = TaskStatus.FAILED
-        task.error = task.feedback_error
-        task_manager._save_task(task)
-        print(f"  ❌ 反思失败: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        # Feedback流程失败，不影响主任务
+        _fail_stage(task_manager, task, "reflecting", "反思失败", e)
 
     # ========================================================================
     # Step 3: 更新 Playbook
     # ========================================================================
     task.feedback_status = "curating"
-    task_manager._save_task(task)
+    task_manager.mark_dirty(task)
 
-    print()
-    print("=" * 70)
-    print("STEP 3: 更新 Playbook")
-    print("=" * 70)
+    _banner("STEP 3: 更新 Playbook")
+    _flush()
 
     size_before = playbook_manager.playbook.size
 
@@ -367,53 +324,170 @@ def run_feedback_workflow(task_id: str, evaluation_mode: Optional[str] = None):
         size_after = playbook_manager.playbook.size
 
         task.save_curation(curation_result)
-        print(f"  ✅ Playbook已更新: {size_before} → {size_after} bullets")
-        print(f"  ✅ 操作: +{curation_result.bullets_added} "
+        _log(f"  ✅ Playbook已更新: {size_before} → {size_after} bullets")
+        _log(f"  ✅ 操作: +{curation_result.bullets_added} "
               f"-{curation_result.bullets_removed} ~{curation_result.bullets_updated}")
 
         # 显示新增bullets示例
         if curation_result.bullets_added > 0:
-            print(f"\n  新增bullets预览:")
+            _log(f"\n  新增bullets预览:")
             # 获取最新的bullets（bullets是list，不是dict）
             new_bullets = playbook_manager.playbook.bullets[-min(3, curation_result.bullets_added):]
             for bullet in new_bullets:
-                print(f"    - [{bullet.section}] {bullet.content[:60]}...")
+                _log(f"    - [{bullet.section}] {bullet.content[:60]}...")
 
-        print(f"  ✅ 更新记录已保存: {task.curation_file}")
+        _log(f"  ✅ 更新记录已保存: {task.curation_file}")
+        _flush()
 
     except Exception as e:
-        # Feedback流程失败
-        task.feedback_status = "failed"
-        task.feedback_error = f"Playbook更新失败: {str(e)}"
-        task.failed_stage = "curating"  # 记录失败阶段
-        task.status = TaskStatus.FAILED
-        task.error = task.feedback_error
-        task_manager._save_task(task)
-        print(f"  ❌ Playbook更新失败: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        # Feedback流程失败，不影响主任务
+        _fail_stage(task_manager, task, "curating", "Playbook更新失败", e)
 
     # ========================================================================
     # 完成
     # ========================================================================
     task.feedback_status = "completed"
-    task_manager._save_task(task)
+    task.metadata.pop("feedback_traceback", None)  # 清除之前失败留下的堆栈
+    task_manager.flush(task)
 
-    print()
-    print("=" * 70)
-    print("✅ 反馈流程完成！")
-    print("=" * 70)
-    print(f"\n反馈数据:")
-    print(f"  - 评估反馈: {task.feedback_file}")
-    print(f"  - 反思结果: {task.reflection_file}")
-    print(f"  - 更新记录: {task.curation_file}")
-    print(f"\nPlaybook 变化:")
-    print(f"  - 大小: {size_before} → {size_after} bullets")
-    print(f"  - 新增: {curation_result.bullets_added}")
-    print(f"  - 删除: {curation_result.bullets_removed}")
-    print(f"  - 更新: {curation_result.bullets_updated}")
-    print()
+    _banner("✅ 反馈流程完成！")
+    _log(f"\n反馈数据:")
+    _log(f"  - 评估反馈: {task.feedback_file}")
+    _log(f"  - 反思结果: {task.reflection_file}")
+    _log(f"  - 更新记录: {task.curation_file}")
+    _log(f"\nPlaybook 变化:")
+    _log(f"  - 大小: {size_before} → {size_after} bullets")
+    _log(f"  - 新增: {curation_result.bullets_added}")
+    _log(f"  - 删除: {curation_result.bullets_removed}")
+    _log(f"  - 更新: {curation_result.bullets_updated}")
+    _log()
+    _flush()
+
+
+def _fail_stage(task_manager, task, stage: str, label: str, error: Exception):
+    """记录阶段失败并退出
+
+    traceback 只格式化一次：写入 task.metadata 供重试排查，同时输出到 stderr。
+    task.error 仍只保存简短信息（重试判断基于错误消息匹配，不能混入堆栈文本）。
+
+    Args:
+        task_manager: 任务管理器
+        task: 当前任务
+        stage: 失败阶段（evaluating/reflecting/curating）
+        label: 错误前缀（如"评估失败"）
+        error: 捕获的异常
+    """
+    import traceback
+    from workflow.task_manager import TaskStatus
+
+    tb = traceback.format_exc()
+
+    task.feedback_status = "failed"
+    task.feedback_error = f"{label}: {str(error)}"
+    task.failed_stage = stage  # 记录失败阶段
+    task.status = TaskStatus.FAILED  # 标记整体失败（用于retry）
+    task.error = task.feedback_error
+    task.metadata["feedback_traceback"] = tb
+    task_manager.flush(task)
+
+    _log(f"  ❌ {label}: {error}")
+    _flush()
+    sys.stderr.write(tb)
+    sys.exit(1)
+
+
+def _init_llm_provider():
+    """初始化LLM Provider（惰性导入，只有任务通过校验后才会调用）"""
+    _banner("初始化ACE组件")
+
+    _log("[1/4] 正在初始化LLM Provider...")
+    from utils.llm_provider import QwenProvider
+
+    llm_provider = QwenProvider(
+        model_name="qwen-max",
+        temperature=0.7,
+        max_tokens=4096
+    )
+    _log("  ✅ Qwen Provider 已初始化")
+
+    return llm_provider
+
+
+def _init_components(llm_provider):
+    """初始化ACE组件（Playbook、Reflector、Curator）
+
+    所有重量级模块（ACE框架）都在此函数内惰性导入，
+    只有任务通过校验并成功加载生成结果后才会调用，
+    因此无效任务的快速失败路径不承担这些导入开销。
+
+    Args:
+        llm_provider: 共享的LLM Provider
+
+    Returns:
+        (playbook_manager, reflector, curator)
+    """
+    # Playbook Manager
+    _log("[2/4] 正在加载Playbook...")
+    _flush()  # Playbook 加载时会直接打印 embedding 缓存状态
+    from ace_framework.playbook.playbook_manager import get_playbook_manager
+
+    playbook_path = "data/playbooks/chemistry_playbook.json"
+    playbook_manager = get_playbook_manager(playbook_path)
+    _log(f"  ✅ Playbook 已加载: {playbook_manager.playbook.size} bullets")
+
+    # Reflector
+    _log("[3/4] 正在初始化Reflector...")
+    from ace_framework.reflector.reflector import PlanReflector
+    from utils.config_loader import ReflectorConfig
+
+    reflector = PlanReflector(
+        llm_provider=llm_provider,
+        config=ReflectorConfig(),
+        playbook_manager=playbook_manager
+    )
+    _log("  ✅ Reflector 已初始化")
+
+    # Curator
+    _log("[4/4] 正在初始化Curator...")
+    from ace_framework.curator.curator import PlaybookCurator
+    from utils.config_loader import CuratorConfig
+
+    curator = PlaybookCurator(
+        playbook_manager=playbook_manager,
+        llm_provider=llm_provider,
+        config=CuratorConfig()
+        # 使用配置文件中的 allow_new_sections 设置（configs/playbook_sections.yaml）
+        # 不在运行时覆盖，确保行为可预测且配置统一
+    )
+    _log("  ✅ Curator 已初始化")
+    _flush()
+
+    return playbook_manager, reflector, curator
+
+
+def _evaluate_plan(plan, evaluation_mode: str, llm_provider, feedback_file: Optional[str]):
+    """按评估模式创建评估器并评估方案（在后台线程执行）
+
+    Returns:
+        FeedbackResult
+    """
+    from evaluation.evaluator import create_evaluator
+
+    # 创建评估器（human模式传入文件路径）
+    if evaluation_mode == "human":
+        evaluator = create_evaluator(
+            source="human",
+            feedback_file=feedback_file
+        )
+    elif evaluation_mode == "llm_judge":
+        evaluator = create_evaluator(
+            source="llm_judge",
+            llm_provider=llm_provider
+        )
+    else:  # auto
+        evaluator = create_evaluator(source="auto")
+
+    return evaluator.evaluate(plan)
 
 
 if __name__ == "__main__":
@@ -3,9 +3,66 @@
 在真实RAG实现之前，使用简单的关键词匹配从mock数据中检索模板
 """
 
-import json
+import heapq
+import mmap
+import os
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# pyahocorasick 作为可选依赖，不可用时回退到逐关键词子串匹配
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# msgpack 作为可选依赖（模板二进制缓存），不可用时每次解析JSON
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+from utils import json_utils
+
+# 超过该大小（字节）的二进制缓存用mmap读取
+_MMAP_THRESHOLD = 1 << 20
+
+
+# 难度偏好关键词
+_EASY_WORDS = ("基础", "简单", "入门")
+_HARD_WORDS = ("高级", "复杂", "精密")
+
+# 参与检索的需求字段
+_QUERY_FIELDS = ("objective", "target_compound", "constraints", "special_requirements")
+
+
+class _KeywordMatcher:
+    """多关键词匹配器
+
+    基于Aho-Corasick自动机，对每个字段只扫描一次即可得到命中的关键词数，
+    结果与逐个执行 `keyword in text` 相同（重复关键词按次数计，空关键词恒命中）。
+    """
+
+    def __init__(self, keywords: List[str]):
+        counts = Counter(keywords)
+        self._always = counts.pop("", 0)
+
+        self._automaton = None
+        if counts:
+            self._automaton = ahocorasick.Automaton()
+            for word, n in counts.items():
+                self._automaton.add_word(word, (word, n))
+            self._automaton.make_automaton()
+
+    def count(self, text: str) -> int:
+        """统计 text 中包含的关键词个数"""
+        if self._automaton is None:
+            return self._always
+        matched = {value for _, value in self._automaton.iter(text)}
+        return self._always + sum(n for _, n in matched)
 
 
 class MockRAGRetriever:
@@ -20,18 +77,71 @@ class MockRAGRetriever:
         self.templates_file = Path(templates_file)
         self.templates = self._load_templates()
 
+        # 预先小写化的检索字段（与 self.templates 一一对应），模板加载后不可变
+        self._search_fields = [
+            (
+                t.get("title", "").lower(),
+                t.get("procedure_summary", "").lower(),
+                [p.lower() for p in t.get("key_points", [])],
+            )
+            for t in self.templates
+        ]
+
+        # 检索结果LRU缓存（按实例绑定，模板加载后不可变）
+        self._retrieve_cached = lru_cache(maxsize=256)(self._retrieve_impl)
+
     def _load_templates(self) -> List[Dict]:
         """加载模板数据"""
         if not self.templates_file.exists():
             print(f"[MockRAG] 警告: 模板文件不存在 {self.templates_file}")
             return []
 
-        with open(self.templates_file, 'r', encoding='utf-8') as f:
-            templates = json.load(f)
+        templates = self._load_binary_cache()
+        if templates is None:
+            templates = json_utils.loads(self.templates_file.read_bytes())
+            self._save_binary_cache(templates)
 
         print(f"[MockRAG] 加载了 {len(templates)} 个模板")
         return templates
 
+    @property
+    def _cache_file(self) -> Path:
+        """模板二进制缓存路径（与JSON同目录，后缀 .msgpack）"""
+        return self.templates_file.with_suffix(".msgpack")
+
+    def _load_binary_cache(self) -> Optional[List[Dict]]:
+        """读取模板二进制缓存
+
+        Returns:
+            模板列表；msgpack不可用、缓存不存在、比JSON旧或已损坏时返回None
+        """
+        if not MSGPACK_AVAILABLE:
+            return None
+
+        try:
+            if self._cache_file.stat().st_mtime_ns < self.templates_file.stat().st_mtime_ns:
+                return None
+
+            with open(self._cache_file, "rb") as f:
+                if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        return msgpack.unpackb(buf, raw=False)
+                return msgpack.unpackb(f.read(), raw=False)
+        except (OSError, ValueError, msgpack.UnpackException):
+            return None
+
+    def _save_binary_cache(self, templates: List[Dict]):
+        """写入模板二进制缓存（先写临时文件再替换；目录不可写时跳过）"""
+        if not MSGPACK_AVAILABLE:
+            return
+
+        tmp_file = self._cache_file.with_name(f".{self._cache_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_bytes(msgpack.packb(templates, use_bin_type=True))
+            os.replace(tmp_file, self._cache_file)
+        except (OSError, TypeError, ValueError):
+            tmp_file.unlink(missing_ok=True)
+
     def retrieve(
         self,
         requirements: Dict[str, Any],
@@ -50,30 +160,67 @@ class MockRAGRetriever:
 
         Returns:
             相关模板列表
+
+        Notes:
+            相同需求（按 _QUERY_FIELDS 取值）的重复检索直接命中LRU缓存，
+            返回缓存结果的浅拷贝；取值无法序列化为JSON时不缓存
         """
         if not self.templates:
             return []
 
+        query = {
+            name: requirements[name]
+            for name in _QUERY_FIELDS
+            if requirements.get(name) is not None
+        }
+        try:
+            key = self._cache_key(query)
+        except TypeError:
+            return list(self._search(query, top_k))
+
+        return list(self._retrieve_cached(key, top_k))
+
+    @staticmethod
+    def _cache_key(query: Dict[str, Any]) -> bytes:
+        """构建检索缓存键：规范化的JSON（嵌套的列表、字典也可作为键）
+
+        Raises:
+            TypeError: 取值无法序列化为JSON
+        """
+        return json_utils.dumps(query, sort_keys=True)
+
+    def _retrieve_impl(self, key: bytes, top_k: int) -> Tuple[Dict, ...]:
+        """检索实现（被LRU缓存包装）"""
+        return self._search(json_utils.loads(key), top_k)
+
+    def _search(self, requirements: Dict[str, Any], top_k: int) -> Tuple[Dict, ...]:
+        """按关键词相关度选出 top_k 个模板"""
         # 提取关键词
         keywords = self._extract_keywords(requirements)
         print(f"[MockRAG] 提取关键词: {keywords}")
 
+        # 关键词自动机和难度偏好每次检索只计算一次
+        matcher = _KeywordMatcher(keywords) if AHOCORASICK_AVAILABLE else None
+        wanted_difficulty = self._wanted_difficulty(keywords)
+
         # 计算每个模板的相关度
         scored_templates = []
-        for template in self.templates:
-            score = self._calculate_relevance(template, keywords)
+        for template, fields in zip(self.templates, self._search_fields):
+            score = self._calculate_relevance(
+                template, fields, keywords, matcher, wanted_difficulty
+            )
             scored_templates.append((template, score))
 
-        # 排序并返回top_k
-        scored_templates.sort(key=lambda x: x[1], reverse=True)
+        # 选出top_k（O(N log k)；同分时保持模板原有顺序，与稳定排序一致）
+        top_scored = heapq.nlargest(top_k, scored_templates, key=lambda x: x[1])
 
-        top_templates = [t for t, score in scored_templates[:top_k]]
+        top_templates = [t for t, score in top_scored]
 
         print(f"[MockRAG] 检索到 {len(top_templates)} 个相关模板:")
         for i, t in enumerate(top_templates, 1):
             print(f"  {i}. {t['title']}")
 
-        return top_templates
+        return tuple(top_templates)
 
     def _extract_keywords(self, requirements: Dict) -> List[str]:
         """从需求中提取关键词"""
@@ -100,48 +247,68 @@ class MockRAGRetriever:
 
         return keywords
 
+    @staticmethod
+    def _wanted_difficulty(keywords: List[str]) -> Optional[str]:
+        """根据关键词推断偏好的难度级别（None表示不加分）"""
+        joined = " ".join(keywords)
+        if "constraints" not in joined:
+            return None
+        # 如果需求提到"基础"/"简单"，优先匹配beginner
+        if any(word in joined for word in _EASY_WORDS):
+            return "beginner"
+        # 如果提到"高级"/"复杂"，优先匹配advanced
+        if any(word in joined for word in _HARD_WORDS):
+            return "advanced"
+        return None
+
     def _calculate_relevance(
         self,
         template: Dict,
-        keywords: List[str]
+        fields: Tuple[str, str, List[str]],
+        keywords: List[str],
+        matcher: Optional[_KeywordMatcher] = None,
+        wanted_difficulty: Optional[str] = None
     ) -> float:
         """计算模板与关键词的相关度
 
         简单策略：统计关键词在模板各字段中出现的次数
+
+        Args:
+            template: 模板
+            fields: 预先小写化的 (title, procedure_summary, key_points)
+            keywords: 关键词列表
+            matcher: 关键词自动机（None时逐关键词子串匹配）
+            wanted_difficulty: 偏好的难度级别（由 _wanted_difficulty 预先计算）
         """
         score = 0.0
+        title, summary, key_points = fields
+
+        if matcher is not None:
+            # 标题（权重高）> 摘要 > 关键点
+            score += 3.0 * matcher.count(title)
+            score += 2.0 * matcher.count(summary)
+            for point_lower in key_points:
+                score += 1.0 * matcher.count(point_lower)
+        else:
+            # 在标题中搜索（权重高）
+            for keyword in keywords:
+                if keyword in title:
+                    score += 3.0
 
-        # 在标题中搜索（权重高）
-        title = template.get("title", "").lower()
-        for keyword in keywords:
-            if keyword in title:
-                score += 3.0
-
-        # 在摘要中搜索
-        summary = template.get("procedure_summary", "").lower()
-        for keyword in keywords:
-            if keyword in summary:
-                score += 2.0
-
-        # 在关键点中搜索
-        key_points = template.get("key_points", [])
-        for point in key_points:
-            point_lower = point.lower()
+            # 在摘要中搜索
             for keyword in keywords:
-                if keyword in point_lower:
-                    score += 1.0
-
-        # 在难度级别中搜索
-        if "constraints" in " ".join(keywords):
-            difficulty = template.get("difficulty", "")
-            # 如果需求提到"基础"/"简单"，优先匹配beginner
-            if any(word in " ".join(keywords) for word in ["基础", "简单", "入门"]):
-                if difficulty == "beginner":
-                    score += 1.5
-            # 如果提到"高级"/"复杂"，优先匹配advanced
-            elif any(word in " ".join(keywords) for word in ["高级", "复杂", "精密"]):
-                if difficulty == "advanced":
-                    score += 1.5
+                if keyword in summary:
+                    score += 2.0
+
+            # 在关键点中搜索
+            for point_lower in key_points:
+                for keyword in keywords:
+                    if keyword in point_lower:
+                        score += 1.0
+
+        # 匹配难度级别
+        if wanted_difficulty is not None and template.get("difficulty", "") == wanted_difficulty:
+            score += 1.5
 
         return score
 
@@ -5,6 +5,7 @@
 2. 格式转换：LargeRAG 输出 → Generator 需要的格式
 3. 统一错误处理
 4. 惰性初始化（只在第一次调用时加载RAG）
+5. 语义缓存（相似查询直接复用检索结果，跳过向量检索和重排序）
 
 设计原则：
 - 只传递必要字段给 Generator（title, content, score）
@@ -12,8 +13,10 @@
 - 确保与 Generator prompts 兼容
 """
 
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import sys
 import logging
 
@@ -25,14 +28,25 @@ logger = logging.getLogger(__name__)
 class RAGAdapter:
     """RAG 检索适配器 - 统一 RAG 接口"""
 
-    def __init__(self, config_path: Optional[str] = None):
+    # 进程内精确匹配缓存的最大条目数
+    EXACT_CACHE_SIZE = 256
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        semantic_cache_path: Optional[str] = "data/cache/rag_semcache.sqlite"
+    ):
         """初始化（惰性加载）
 
         Args:
             config_path: RAG 配置文件路径（可选）
+            semantic_cache_path: 语义缓存数据库路径（None 表示禁用缓存）
         """
         self.config_path = config_path
+        self.semantic_cache_path = semantic_cache_path
         self._rag = None  # 延迟初始化
+        self._sem_cache = None
+        self._exact_cache: "OrderedDict[Tuple[str, int], List[Dict]]" = OrderedDict()
         self._initialized = False
 
     def _ensure_initialized(self):
@@ -70,10 +84,30 @@ class RAGAdapter:
             self._initialized = True
             logger.info("[RAGAdapter] ✅ LargeRAG 初始化完成")
 
+            self._init_semantic_cache()
+
         except Exception as e:
             logger.error(f"[RAGAdapter] ❌ 初始化失败: {e}")
             raise RuntimeError(f"RAG 初始化失败: {e}")
 
+    def _init_semantic_cache(self):
+        """初始化语义缓存（复用 LargeRAG 的 embedding 模型，失败时禁用缓存）"""
+        if not self.semantic_cache_path:
+            return
+
+        try:
+            from workflow.semantic_cache import SemanticCache
+
+            self._sem_cache = SemanticCache(
+                path=self.semantic_cache_path,
+                embed_fn=self._rag.indexer.embed_model.get_query_embedding,
+                threshold=0.92,
+                ttl=86400
+            )
+        except Exception as e:
+            logger.warning(f"[RAGAdapter] ⚠️  语义缓存不可用，直接检索: {e}")
+            self._sem_cache = None
+
     def retrieve_templates(
         self,
         requirements: Dict[str, Any],
@@ -107,7 +141,21 @@ class RAGAdapter:
         query = self._build_query(requirements)
         logger.info(f"[RAGAdapter] 查询: {query}")
 
-        # 2. 调用 LargeRAG
+        # 2. 缓存（先精确匹配，再语义相似）
+        key = (query, top_k)
+        cached = self._exact_cache.get(key)
+        if cached is not None:
+            self._exact_cache.move_to_end(key)
+            logger.info(f"[RAGAdapter] ✅ 查询缓存命中（{len(cached)} 个文档）")
+            return list(cached)
+
+        cached = self._cache_get(query, top_k)
+        if cached is not None:
+            logger.info(f"[RAGAdapter] ✅ 语义缓存命中（{len(cached)} 个文档）")
+            self._remember(key, cached)
+            return cached
+
+        # 3. 调用 LargeRAG
         try:
             docs = self._rag.get_similar_docs(
                 query_text=query,
@@ -121,14 +169,44 @@ class RAGAdapter:
             traceback.print_exc()
             return []
 
-        # 3. 格式转换（精简版）
+        # 4. 格式转换（精简版）
         templates = self._convert_to_template_format(docs)
 
-        # 4. 打印预览
+        # 5. 打印预览
         self._print_preview(templates)
 
+        if templates:
+            self._remember(key, templates)
+            self._cache_put(query, top_k, templates)
+
         return templates
 
+    def _remember(self, key: Tuple[str, int], templates: List[Dict]):
+        """写入进程内精确匹配缓存（LRU 淘汰）"""
+        self._exact_cache[key] = list(templates)
+        self._exact_cache.move_to_end(key)
+        if len(self._exact_cache) > self.EXACT_CACHE_SIZE:
+            self._exact_cache.popitem(last=False)
+
+    def _cache_get(self, query: str, top_k: int) -> Optional[List[Dict]]:
+        """查询语义缓存（缓存出错视为未命中）"""
+        if self._sem_cache is None:
+            return None
+        try:
+            return self._sem_cache.get(query, top_k)
+        except Exception as e:
+            logger.warning(f"[RAGAdapter] ⚠️  语义缓存读取失败: {e}")
+            return None
+
+    def _cache_put(self, query: str, top_k: int, templates: List[Dict]):
+        """写入语义缓存（缓存出错不影响检索结果）"""
+        if self._sem_cache is None:
+            return
+        try:
+            self._sem_cache.put(query, top_k, templates)
+        except Exception as e:
+            logger.warning(f"[RAGAdapter] ⚠️  语义缓存写入失败: {e}")
+
     def _build_query(self, requirements: Dict[str, Any]) -> str:
         """从 requirements 构建查询字符串
 
@@ -138,29 +216,31 @@ class RAGAdapter:
         Returns:
             查询字符串
         """
-        parts = []
-
-        # 优先级：objective > target_compound > constraints
-        if "objective" in requirements:
-            parts.append(requirements["objective"])
-
-        if "target_compound" in requirements:
-            parts.append(requirements["target_compound"])
-
-        if "constraints" in requirements and requirements["constraints"]:
-            # 只取前3个约束（避免过长）
-            constraints = requirements["constraints"][:3]
-            parts.append(" ".join(constraints))
-
-        query = " ".join(parts)
+        query = " ".join(self._iter_query_parts(requirements)).strip()
 
         # 如果查询为空，使用默认查询
-        if not query.strip():
+        if not query:
             query = "实验方案"
             logger.warning(f"[RAGAdapter] ⚠️  需求为空，使用默认查询: {query}")
 
         return query
 
+    @staticmethod
+    def _iter_query_parts(requirements: Dict[str, Any]) -> Iterator[str]:
+        """按优先级产出查询片段：objective > target_compound > constraints"""
+        objective = requirements.get("objective")
+        if objective:
+            yield objective
+
+        target_compound = requirements.get("target_compound")
+        if target_compound:
+            yield target_compound
+
+        constraints = requirements.get("constraints")
+        if constraints:
+            # 只取前3个约束（避免过长），islice 不复制列表
+            yield " ".join(islice(constraints, 3))
+
     def _convert_to_template_format(self, docs: List[Dict]) -> List[Dict]:
         """
         将 LargeRAG 输出转换为 Generator 需要的精简格式
@@ -188,32 +268,29 @@ class RAGAdapter:
         - 不传递冗余的 metadata
         - title 生成简洁描述性标题
         """
-        templates = []
-
-        for i, doc in enumerate(docs, 1):
-            # 提取文本内容
-            text = doc.get("text", "")
-            score = doc.get("score", 0.0)
-
-            # 生成简洁标题（包含相关度信息）
-            title = f"相关文献 {i} (相关度: {score:.3f})"
-
-            # 可选：从 content 前50字符生成更描述性的标题
-            if len(text) > 50:
-                preview = text[:50].replace("\n", " ").strip() + "..."
-                title = f"文献 {i}: {preview}"
-
-            # 构建精简模板
-            template = {
-                "title": title,
-                "content": text,  # 完整内容，让 Generator 自己处理
-                "score": score,   # 保留分数供参考
-                # 不包含 metadata（避免冗余）
-            }
-
-            templates.append(template)
+        to_template = self._to_template
+        return [to_template(i, doc) for i, doc in enumerate(docs, 1)]
+
+    @classmethod
+    def _to_template(cls, i: int, doc: Dict) -> Dict:
+        """转换单个文档"""
+        text = doc.get("text", "")
+        score = doc.get("score", 0.0)
+
+        # 不包含 metadata（避免冗余）；content 保留完整内容，让 Generator 自己处理
+        return {
+            "title": cls._make_title(i, text, score),
+            "content": text,
+            "score": score,   # 保留分数供参考
+        }
 
-        return templates
+    @staticmethod
+    def _make_title(i: int, text: str, score: float) -> str:
+        """生成简洁标题：长文本用前50字符预览，否则显示相关度"""
+        if len(text) > 50:
+            preview = text[:50].replace("\n", " ").strip() + "..."
+            return f"文献 {i}: {preview}"
+        return f"相关文献 {i} (相关度: {score:.3f})"
 
     def _print_preview(self, templates: List[Dict]):
         """打印检索结果预览"""
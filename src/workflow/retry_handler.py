@@ -7,17 +7,33 @@
 4. 处理边缘情况（子进程、文件锁等）
 """
 
+import os
+import random
+import sys
 import time
-from typing import Optional, Dict, List
+import traceback
+from typing import Optional, Dict, List, NamedTuple, Tuple
 from pathlib import Path
 from datetime import datetime
+from types import MappingProxyType
 
+from utils import json_utils
 from workflow.task_manager import (
     GenerationTask,
+    RetryRecord,
     TaskStatus,
+    STREAM_PARSE_THRESHOLD,
     get_task_manager
 )
 
+# ijson 作为可选依赖（只解析超大 generation_result.json 的 plan 字段），不可用时整体加载
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+
 
 # 不可重试的错误模式
 NON_RETRYABLE_ERRORS = [
@@ -30,6 +46,159 @@ NON_RETRYABLE_ERRORS = [
     "FileNotFoundError"
 ]
 
+# 逐个模式做子串查找：str 的 in 走 CPython fastsearch（memchr 加速），
+# 对长错误信息（LLM 堆栈）比正则多选一分支快数倍，也无需编码为 bytes
+_NON_RETRYABLE_PATTERNS = tuple(NON_RETRYABLE_ERRORS)
+
+# 重试退避（指数退避 + full jitter），避免对持续失败的上游（API 限流、文件锁）连续重试
+_BACKOFF_BASE_S = 1.0
+_BACKOFF_CAP_S = 60.0
+
+# 子进程仍存活但 task.json 超过该时间（秒）未更新时，视为卡死（或 PID 已被系统复用）
+_STUCK_TIMEOUT_S = 3600
+
+# 阶段别名：用户友好的名称 → 实际阶段（只读，command_handler 共用）
+STAGE_ALIASES = MappingProxyType({
+    "generate": "generating",  # 用户自然语言：从生成阶段重试
+    "feedback": "evaluating",  # 用户自然语言：从反馈阶段重试
+})
+
+# 子进程退出后可能残留的中间状态（视为隐式失败）
+_STUCK_STATES = frozenset({
+    TaskStatus.PENDING,
+    TaskStatus.EXTRACTING,
+    TaskStatus.RETRIEVING,
+    TaskStatus.GENERATING
+})
+
+# 卡住状态 → 自动检测的重试阶段
+_STATE_TO_STAGE = {
+    TaskStatus.PENDING: "extracting",
+    TaskStatus.EXTRACTING: "extracting",
+    TaskStatus.RETRIEVING: "retrieving",
+    TaskStatus.GENERATING: "generating"
+}
+
+# Feedback流程阶段（重试时需要重置 feedback_status）
+_FEEDBACK_STAGES = frozenset({"evaluating", "reflecting", "curating"})
+
+# 可恢复的阶段
+VALID_STAGES = frozenset({
+    "extracting", "retrieving", "generating",
+    "evaluating", "reflecting", "curating"
+})
+
+# 从失败点继续（FAILED / 卡住 / CANCELLED）：
+# 阶段 → (恢复到的状态, 保留的文件, 删除的文件)
+_STAGE_MAPPING_PARTIAL = {
+    # 主任务阶段
+    "extracting": (TaskStatus.PENDING, (), ("requirements.json",)),
+    "retrieving": (TaskStatus.AWAITING_CONFIRM, ("requirements.json",), ("templates.json",)),
+    "generating": (
+        TaskStatus.RETRIEVING,
+        ("requirements.json", "templates.json"),
+        ("plan.json", "generation_result.json")
+    ),
+
+    # Feedback流程阶段
+    "evaluating": (
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json"),
+        ("feedback.json",)
+    ),
+    "reflecting": (
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json",
+         "feedback.json"),
+        ("reflection.json",)
+    ),
+    "curating": (
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json",
+         "feedback.json", "reflection.json"),
+        ("curation.json",)
+    ),
+}
+
+# 重新生成（COMPLETED）：下游产物全部作废
+_STAGE_MAPPING_REGENERATE = {
+    "extracting": (
+        # 从头开始（清除所有中间数据）
+        TaskStatus.PENDING,
+        ("config.json", "task.json"),
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json",
+         "feedback.json", "reflection.json", "curation.json")
+    ),
+    "generating": (
+        # 保留需求和模板，重新生成方案
+        TaskStatus.RETRIEVING,
+        ("requirements.json", "templates.json"),
+        ("plan.json", "generation_result.json",
+         "feedback.json", "reflection.json", "curation.json")
+    ),
+    "evaluating": (
+        # 重新执行反馈流程
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json"),
+        ("feedback.json", "reflection.json", "curation.json")
+    ),
+    "reflecting": (
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json",
+         "feedback.json"),
+        ("reflection.json", "curation.json")
+    ),
+    "curating": (
+        TaskStatus.COMPLETED,
+        ("requirements.json", "templates.json", "plan.json", "generation_result.json",
+         "feedback.json", "reflection.json"),
+        ("curation.json",)
+    ),
+}
+
+
+
+class _RetryPlan(NamedTuple):
+    """某个流程下从某阶段恢复的静态计划"""
+    status: TaskStatus          # 恢复到的状态
+    keep: Tuple[str, ...]       # 保留的文件
+    remove: Tuple[str, ...]     # 删除的文件
+
+
+def _build_retry_plans() -> Dict[Tuple[str, str, bool], _RetryPlan]:
+    """导入时展开 (策略, 阶段, keep_playbook) → 计划
+
+    保留 playbook 时不删除 curation.json，让新的 Curator 覆盖它
+    （FAILED 的部分重试不涉及 playbook，两种取值计划相同）
+    """
+    plans = {}
+    for strategy, mapping, honours_keep in (
+        ("partial", _STAGE_MAPPING_PARTIAL, False),
+        ("resume_cancelled", _STAGE_MAPPING_PARTIAL, True),
+        ("regenerate", _STAGE_MAPPING_REGENERATE, True),
+    ):
+        for stage, (status, keep, remove) in mapping.items():
+            plans[(strategy, stage, False)] = _RetryPlan(status, keep, remove)
+            if honours_keep:
+                remove = tuple(f for f in remove if f != "curation.json")
+            plans[(strategy, stage, True)] = _RetryPlan(status, keep, remove)
+    return plans
+
+
+_RETRY_PLANS = _build_retry_plans()
+
+
+def _normalize_stage(stage: Optional[str]) -> str:
+    """把阶段别名转换为实际阶段并验证有效性
+
+    Raises:
+        ValueError: 未知的阶段
+    """
+    normalized = STAGE_ALIASES.get(stage, stage)
+    if normalized not in VALID_STAGES:
+        raise ValueError(f"未知的阶段: {stage}")
+    return normalized
+
 
 class RetryHandler:
     """重试处理器"""
@@ -41,6 +210,21 @@ class RetryHandler:
         """
         self.task_manager = task_manager or get_task_manager()
 
+        # 按任务状态分派（构建一次，调用时 O(1) 查表）
+        self._check_dispatch = {
+            TaskStatus.FAILED: self._can_retry_failed,
+            TaskStatus.CANCELLED: self._can_retry_cancelled,
+            TaskStatus.COMPLETED: self._can_retry_completed,
+            # 中间状态：任务卡住（子进程已退出但状态未更新）
+            **dict.fromkeys(_STUCK_STATES, self._can_retry_stuck),
+        }
+        self._prepare_dispatch = {
+            TaskStatus.CANCELLED: self._prepare_cancelled_retry,
+            TaskStatus.COMPLETED: self._prepare_completed_retry,
+            # 卡住的中间状态：视为FAILED，但自动检测阶段
+            **dict.fromkeys(_STUCK_STATES, self._prepare_stuck_retry),
+        }
+
     def can_retry(self, task: GenerationTask, force: bool = False, force_stage: Optional[str] = None) -> tuple[bool, str]:
         """检查任务是否可以重试（支持所有状态）
 
@@ -53,17 +237,10 @@ class RetryHandler:
             (可重试, 原因)
         """
         # 1. 根据任务状态路由到不同的检查方法
-        if task.status == TaskStatus.FAILED:
-            return self._can_retry_failed(task, force, force_stage)
-        elif task.status == TaskStatus.CANCELLED:
-            return self._can_retry_cancelled(task, force_stage)
-        elif task.status == TaskStatus.COMPLETED:
-            return self._can_retry_completed(task, force, force_stage)
-        elif task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
-            # 中间状态：任务卡住（子进程已退出但状态未更新）
-            return self._can_retry_stuck(task, force, force_stage)
-        else:
+        check = self._check_dispatch.get(task.status)
+        if check is None:
             return False, f"任务状态不支持重试（当前: {task.status.value}）"
+        return check(task, force, force_stage)
 
     def _can_retry_failed(self, task: GenerationTask, force: bool, force_stage: Optional[str]) -> tuple[bool, str]:
         """检查FAILED任务是否可重试（现有逻辑）"""
@@ -82,7 +259,7 @@ class RetryHandler:
 
         return True, "可以重试"
 
-    def _can_retry_cancelled(self, task: GenerationTask, force_stage: Optional[str]) -> tuple[bool, str]:
+    def _can_retry_cancelled(self, task: GenerationTask, force: bool, force_stage: Optional[str]) -> tuple[bool, str]:
         """检查CANCELLED任务是否可重试（新增）"""
         # CANCELLED 任务特点：
         # 1. 用户主动取消，不是系统错误
@@ -92,21 +269,11 @@ class RetryHandler:
         # 检测恢复阶段（优先使用 force_stage）
         resume_stage = force_stage or task.failed_stage or "extracting"
 
-        # 别名映射
-        stage_aliases = {
-            "generate": "generating",
-            "feedback": "evaluating",
-        }
-        if resume_stage in stage_aliases:
-            resume_stage = stage_aliases[resume_stage]
-
-        # 验证阶段有效性
-        valid_stages = [
-            "extracting", "retrieving", "generating",
-            "evaluating", "reflecting", "curating"
-        ]
-        if resume_stage not in valid_stages:
-            return False, f"未知的阶段: {resume_stage}"
+        # 别名映射 + 验证阶段有效性
+        try:
+            resume_stage = _normalize_stage(resume_stage)
+        except ValueError as e:
+            return False, str(e)
 
         return True, f"可以从 {resume_stage} 阶段恢复"
 
@@ -124,13 +291,11 @@ class RetryHandler:
         # 如果没有指定阶段，默认从 generating 开始（保留需求和模板）
         resume_stage = force_stage or "generating"
 
-        # 别名映射
-        stage_aliases = {
-            "generate": "generating",
-            "feedback": "evaluating",
-        }
-        if resume_stage in stage_aliases:
-            resume_stage = stage_aliases[resume_stage]
+        # 别名映射 + 验证阶段有效性
+        try:
+            resume_stage = _normalize_stage(resume_stage)
+        except ValueError as e:
+            return False, str(e)
 
         # 警告：完全重试会丢失所有数据
         if resume_stage == "extracting":
@@ -144,55 +309,73 @@ class RetryHandler:
         场景：子进程已退出但任务状态未更新为 FAILED
         处理：视为隐式失败，允许重试
         """
-        # 1. 检查重试次数（除非force）
+        # 1. 检查子进程是否仍在运行（避免覆盖正在执行的任务）
+        if not force and self._is_process_running(task):
+            return False, (
+                "任务似乎仍在运行（子进程存活且状态近期有更新）\n"
+                "  如确认已卡死，请使用 --force 强制重试"
+            )
+
+        # 2. 检查重试次数（除非force）
         if not force and task.retry_count >= task.max_retries:
             return False, f"已达到最大重试次数 ({task.retry_count}/{task.max_retries})"
 
-        # 2. 检测重试阶段
+        # 3. 检测重试阶段
         if force_stage:
             # 用户明确指定阶段
             resume_stage = force_stage
         else:
             # 自动检测：根据当前状态推断
-            state_to_stage = {
-                TaskStatus.PENDING: "extracting",
-                TaskStatus.EXTRACTING: "extracting",
-                TaskStatus.RETRIEVING: "retrieving",
-                TaskStatus.GENERATING: "generating"
-            }
-            resume_stage = state_to_stage.get(task.status, "extracting")
-
-        # 别名映射
-        stage_aliases = {
-            "generate": "generating",
-            "feedback": "evaluating",
-        }
-        if resume_stage in stage_aliases:
-            resume_stage = stage_aliases[resume_stage]
+            resume_stage = _STATE_TO_STAGE.get(task.status, "extracting")
 
-        # 验证阶段有效性
-        valid_stages = [
-            "extracting", "retrieving", "generating",
-            "evaluating", "reflecting", "curating"
-        ]
-        if resume_stage not in valid_stages:
-            return False, f"未知的阶段: {resume_stage}"
+        # 别名映射 + 验证阶段有效性
+        try:
+            resume_stage = _normalize_stage(resume_stage)
+        except ValueError as e:
+            return False, str(e)
 
         return True, f"检测到任务卡住，可以从 {resume_stage} 阶段重试"
 
+    def _is_process_running(self, task: GenerationTask) -> bool:
+        """检查任务子进程是否仍在正常运行
+
+        判定规则：
+        - 没有 PID 文件 / PID 文件损坏 / 进程已退出 → 未运行
+        - 进程存活但 task.json 超过 _STUCK_TIMEOUT_S 未更新 → 视为卡死（未运行）
+        - 其余情况 → 仍在运行
+        """
+        pid_file = task.task_dir / "process.pid"
+        try:
+            pid = int(pid_file.read_text().strip())
+        except (OSError, ValueError):
+            return False
+        if pid <= 0:
+            return False
+
+        try:
+            os.kill(pid, 0)  # 信号 0 只检查进程存在
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # 进程存在但属于其他用户
+
+        try:
+            age = time.time() - (task.task_dir / "task.json").stat().st_mtime
+        except OSError:
+            return True
+        return age <= _STUCK_TIMEOUT_S
+
     def _is_retryable_error(self, error_msg: str) -> bool:
         """判断错误是否可重试"""
-        for pattern in NON_RETRYABLE_ERRORS:
-            if pattern in error_msg:
-                return False
-        return True
+        return not any(pattern in error_msg for pattern in _NON_RETRYABLE_PATTERNS)
 
     def prepare_retry(
         self,
         task: GenerationTask,
         clean: bool = False,
         force_stage: Optional[str] = None,
-        keep_playbook: bool = True
+        keep_playbook: bool = True,
+        entries: Optional[Dict[str, os.DirEntry]] = None
     ) -> Dict:
         """准备重试任务（支持所有状态）
 
@@ -201,6 +384,7 @@ class RetryHandler:
             clean: 是否完全清理
             force_stage: 强制指定阶段
             keep_playbook: 是否保留 playbook bullets（仅对 feedback 结束的任务有效）
+            entries: 任务目录快照（_snapshot_dir 的结果，可选）
 
         Returns:
             准备信息字典
@@ -209,28 +393,30 @@ class RetryHandler:
             # 完全重试：适用于所有状态
             return self._prepare_clean_retry(task)
 
-        # 部分重试：根据状态选择策略
-        if task.status == TaskStatus.CANCELLED:
-            return self._prepare_cancelled_retry(task, force_stage, keep_playbook)
-        elif task.status == TaskStatus.COMPLETED:
-            return self._prepare_completed_retry(task, force_stage, keep_playbook)
-        elif task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
-            # 卡住的中间状态：视为FAILED，但自动检测阶段
-            if force_stage:
-                stage = force_stage
-            else:
-                # 根据当前状态自动检测阶段
-                state_to_stage = {
-                    TaskStatus.PENDING: "extracting",
-                    TaskStatus.EXTRACTING: "extracting",
-                    TaskStatus.RETRIEVING: "retrieving",
-                    TaskStatus.GENERATING: "generating"
-                }
-                stage = state_to_stage.get(task.status, "extracting")
-            return self._prepare_partial_retry(task, stage)
-        else:  # FAILED
-            stage = force_stage or task.failed_stage
-            return self._prepare_partial_retry(task, stage)
+        # 部分重试：根据状态选择策略（其余状态按 FAILED 处理）
+        prepare = self._prepare_dispatch.get(task.status, self._prepare_failed_retry)
+        return prepare(task, force_stage, keep_playbook, entries)
+
+    def _prepare_failed_retry(
+        self,
+        task: GenerationTask,
+        force_stage: Optional[str],
+        keep_playbook: bool,
+        entries: Optional[Dict[str, os.DirEntry]] = None
+    ) -> Dict:
+        """准备FAILED任务的重试：从失败阶段继续"""
+        return self._prepare_partial_retry(task, force_stage or task.failed_stage)
+
+    def _prepare_stuck_retry(
+        self,
+        task: GenerationTask,
+        force_stage: Optional[str],
+        keep_playbook: bool,
+        entries: Optional[Dict[str, os.DirEntry]] = None
+    ) -> Dict:
+        """准备卡住任务的重试：未指定阶段时根据当前状态自动检测"""
+        stage = force_stage or _STATE_TO_STAGE.get(task.status, "extracting")
+        return self._prepare_partial_retry(task, stage)
 
     def _prepare_clean_retry(self, task: GenerationTask) -> Dict:
         """准备完全重试（所有状态通用）"""
@@ -251,294 +437,142 @@ class RetryHandler:
             "playbook_action": "none"  # 完全重试不涉及 playbook 操作
         }
 
+    @staticmethod
+    def _plan_to_info(strategy: str, stage: str, plan: _RetryPlan, playbook_action: str) -> Dict:
+        """展开静态计划为准备信息字典（列表为新副本，调用方可修改）"""
+        return {
+            "strategy": strategy,
+            "resume_from_stage": stage,
+            "resume_from_status": plan.status,
+            "files_to_keep": list(plan.keep),
+            "files_to_remove": list(plan.remove),
+            "playbook_action": playbook_action
+        }
+
     def _prepare_partial_retry(self, task: GenerationTask, failed_stage: str) -> Dict:
         """准备部分重试（从失败点继续）"""
 
-        # 别名映射：用户友好的名称 → 实际阶段
-        stage_aliases = {
-            "generate": "generating",  # 用户自然语言：从生成阶段重试
-            "feedback": "evaluating",   # 用户自然语言：从反馈阶段重试
-        }
-
         # 如果是别名，转换为实际阶段
-        if failed_stage in stage_aliases:
-            failed_stage = stage_aliases[failed_stage]
-
-        # 根据失败阶段决定从哪里恢复
-        stage_mapping = {
-            # 主任务阶段
-            "extracting": {
-                "resume_from_status": TaskStatus.PENDING,
-                "files_to_keep": [],
-                "files_to_remove": ["requirements.json"]
-            },
-            "retrieving": {
-                "resume_from_status": TaskStatus.AWAITING_CONFIRM,
-                "files_to_keep": ["requirements.json"],
-                "files_to_remove": ["templates.json"]
-            },
-            "generating": {
-                "resume_from_status": TaskStatus.RETRIEVING,
-                "files_to_keep": ["requirements.json", "templates.json"],
-                "files_to_remove": ["plan.json", "generation_result.json"]
-            },
-
-            # Feedback流程阶段
-            "evaluating": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": ["requirements.json", "templates.json", "plan.json", "generation_result.json"],
-                "files_to_remove": ["feedback.json"]
-            },
-            "reflecting": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": ["requirements.json", "templates.json", "plan.json", "generation_result.json", "feedback.json"],
-                "files_to_remove": ["reflection.json"]
-            },
-            "curating": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": ["requirements.json", "templates.json", "plan.json", "generation_result.json", "feedback.json", "reflection.json"],
-                "files_to_remove": ["curation.json"]
-            }
-        }
+        failed_stage = _normalize_stage(failed_stage)
 
-        if failed_stage not in stage_mapping:
-            raise ValueError(f"未知的失败阶段: {failed_stage}")
-
-        info = stage_mapping[failed_stage]
-        return {
-            "strategy": "partial",
-            "resume_from_stage": failed_stage,
-            "resume_from_status": info["resume_from_status"],
-            "files_to_keep": info["files_to_keep"],
-            "files_to_remove": info["files_to_remove"],
-            "playbook_action": "none"  # FAILED 任务不涉及 playbook 操作
-        }
+        # 根据失败阶段决定从哪里恢复（FAILED 任务不涉及 playbook 操作）
+        plan = _RETRY_PLANS[("partial", failed_stage, False)]
+        return self._plan_to_info("partial", failed_stage, plan, "none")
 
     def _prepare_cancelled_retry(
         self,
         task: GenerationTask,
         force_stage: Optional[str],
-        keep_playbook: bool
+        keep_playbook: bool,
+        entries: Optional[Dict[str, os.DirEntry]] = None
     ) -> Dict:
         """准备CANCELLED任务的恢复（新增）"""
         # 检测恢复阶段
-        resume_stage = force_stage or task.failed_stage or "extracting"
-
-        # 别名映射
-        stage_aliases = {"generate": "generating", "feedback": "evaluating"}
-        if resume_stage in stage_aliases:
-            resume_stage = stage_aliases[resume_stage]
-
-        # 根据恢复阶段决定保留/删除文件（复用 stage_mapping）
-        stage_mapping = {
-            "extracting": {
-                "resume_from_status": TaskStatus.PENDING,
-                "files_to_keep": [],
-                "files_to_remove": ["requirements.json"]
-            },
-            "retrieving": {
-                "resume_from_status": TaskStatus.AWAITING_CONFIRM,
-                "files_to_keep": ["requirements.json"],
-                "files_to_remove": ["templates.json"]
-            },
-            "generating": {
-                "resume_from_status": TaskStatus.RETRIEVING,
-                "files_to_keep": ["requirements.json", "templates.json"],
-                "files_to_remove": ["plan.json", "generation_result.json"]
-            },
-            "evaluating": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json"
-                ],
-                "files_to_remove": ["feedback.json"]
-            },
-            "reflecting": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json", "feedback.json"
-                ],
-                "files_to_remove": ["reflection.json"]
-            },
-            "curating": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json",
-                    "feedback.json", "reflection.json"
-                ],
-                "files_to_remove": ["curation.json"]
-            }
-        }
-
-        if resume_stage not in stage_mapping:
-            raise ValueError(f"未知的阶段: {resume_stage}")
-
-        info = stage_mapping[resume_stage]
-        files_to_remove = info["files_to_remove"].copy()
+        resume_stage = _normalize_stage(force_stage or task.failed_stage or "extracting")
 
-        # 🔧 如果保留 playbook，不删除 curation.json
-        # 让新的 Curator 覆盖它（新任务分身会生成新的 curation.json）
-        if keep_playbook and "curation.json" in files_to_remove:
-            files_to_remove.remove("curation.json")
+        # 根据恢复阶段决定保留/删除文件（复用 FAILED 的映射表）
+        plan = _RETRY_PLANS[("resume_cancelled", resume_stage, keep_playbook)]
 
         # 判断 playbook 操作
         playbook_action = self._determine_playbook_action(
-            task, resume_stage, keep_playbook
+            task, resume_stage, keep_playbook, entries
         )
 
-        return {
-            "strategy": "resume_cancelled",
-            "resume_from_stage": resume_stage,
-            "resume_from_status": info["resume_from_status"],
-            "files_to_keep": info["files_to_keep"],
-            "files_to_remove": files_to_remove,
-            "playbook_action": playbook_action
-        }
+        return self._plan_to_info("resume_cancelled", resume_stage, plan, playbook_action)
 
     def _prepare_completed_retry(
         self,
         task: GenerationTask,
         force_stage: Optional[str],
-        keep_playbook: bool
+        keep_playbook: bool,
+        entries: Optional[Dict[str, os.DirEntry]] = None
     ) -> Dict:
         """准备COMPLETED任务的重新生成（新增）"""
         # 默认从 generating 阶段开始（保留需求和模板）
-        resume_stage = force_stage or "generating"
-
-        # 别名映射
-        stage_aliases = {"generate": "generating", "feedback": "evaluating"}
-        if resume_stage in stage_aliases:
-            resume_stage = stage_aliases[resume_stage]
-
-        # 重新生成策略
-        stage_mapping = {
-            "extracting": {
-                # 从头开始（清除所有中间数据）
-                "resume_from_status": TaskStatus.PENDING,
-                "files_to_keep": ["config.json", "task.json"],
-                "files_to_remove": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json",
-                    "feedback.json", "reflection.json", "curation.json"
-                ]
-            },
-            "generating": {
-                # 保留需求和模板，重新生成方案
-                "resume_from_status": TaskStatus.RETRIEVING,
-                "files_to_keep": ["requirements.json", "templates.json"],
-                "files_to_remove": [
-                    "plan.json", "generation_result.json",
-                    "feedback.json", "reflection.json", "curation.json"
-                ]
-            },
-            "evaluating": {
-                # 重新执行反馈流程
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json"
-                ],
-                "files_to_remove": [
-                    "feedback.json", "reflection.json", "curation.json"
-                ]
-            },
-            "reflecting": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json", "feedback.json"
-                ],
-                "files_to_remove": ["reflection.json", "curation.json"]
-            },
-            "curating": {
-                "resume_from_status": TaskStatus.COMPLETED,
-                "files_to_keep": [
-                    "requirements.json", "templates.json",
-                    "plan.json", "generation_result.json",
-                    "feedback.json", "reflection.json"
-                ],
-                "files_to_remove": ["curation.json"]
-            }
-        }
-
-        if resume_stage not in stage_mapping:
-            raise ValueError(f"未知的阶段: {resume_stage}")
-
-        info = stage_mapping[resume_stage]
-        files_to_remove = info["files_to_remove"].copy()
+        resume_stage = _normalize_stage(force_stage or "generating")
 
-        # 🔧 如果保留 playbook，不删除 curation.json
-        # 让新的 Curator 覆盖它（新任务分身会生成新的 curation.json）
-        if keep_playbook and "curation.json" in files_to_remove:
-            files_to_remove.remove("curation.json")
+        # 重新生成策略（不支持只重新检索）
+        plan = _RETRY_PLANS.get(("regenerate", resume_stage, keep_playbook))
+        if plan is None:
+            raise ValueError(f"不支持从 {resume_stage} 阶段重新生成")
 
         # 判断 playbook 操作
         playbook_action = self._determine_playbook_action(
-            task, resume_stage, keep_playbook
+            task, resume_stage, keep_playbook, entries
         )
 
-        return {
-            "strategy": "regenerate",
-            "resume_from_stage": resume_stage,
-            "resume_from_status": info["resume_from_status"],
-            "files_to_keep": info["files_to_keep"],
-            "files_to_remove": files_to_remove,
-            "playbook_action": playbook_action
-        }
+        return self._plan_to_info("regenerate", resume_stage, plan, playbook_action)
 
-    def validate_files(self, task: GenerationTask, files_to_keep: List[str]) -> List[str]:
+    @staticmethod
+    def _snapshot_dir(task: GenerationTask) -> Dict[str, os.DirEntry]:
+        """一次 scandir 获取任务目录下的全部条目（文件名 → DirEntry）
+
+        DirEntry 缓存了 stat 结果，后续存在性检查和大小查询不再产生系统调用
+        """
+        try:
+            with os.scandir(task.task_dir) as it:
+                return {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            return {}
+
+    def validate_files(
+        self,
+        task: GenerationTask,
+        files_to_keep: List[str],
+        entries: Optional[Dict[str, os.DirEntry]] = None
+    ) -> List[str]:
         """验证文件完整性
 
         Args:
             task: 任务对象
             files_to_keep: 需要保留的文件列表
+            entries: 任务目录快照（_snapshot_dir 的结果，省略时自动获取）
 
         Returns:
             损坏的文件列表
         """
+        if entries is None:
+            entries = self._snapshot_dir(task)
+
         corrupted = []
 
         for filename in files_to_keep:
-            filepath = task.task_dir / filename
-
-            if not filepath.exists():
+            entry = entries.get(filename)
+            if entry is None:
                 corrupted.append(filename)
                 continue
 
-            # 验证文件内容
+            # 验证文件内容（只检查结构）
             try:
+                if filename == "generation_result.json":
+                    # 只需确认 plan 非空：大文件用 ijson 只解析 plan 字段，不构造 trajectory
+                    if IJSON_AVAILABLE and entry.stat().st_size > STREAM_PARSE_THRESHOLD:
+                        with open(entry.path, 'rb') as f:
+                            plan = next(ijson.items(f, "plan", use_float=True), None)
+                    else:
+                        plan = json_utils.loads(Path(entry.path).read_bytes()).get("plan")
+                    if not plan:
+                        corrupted.append(filename)
+                    continue
+
+                data = json_utils.loads(Path(entry.path).read_bytes())
+
                 if filename == "requirements.json":
-                    req = task.load_requirements()
-                    if not req or (not req.get("objective") and not req.get("target_compound")):
+                    if not data or (not data.get("objective") and not data.get("target_compound")):
                         corrupted.append(filename)
 
                 elif filename == "templates.json":
-                    import json
-                    with open(filepath, 'r') as f:
-                        templates = json.load(f)
-                    if not isinstance(templates, list):
+                    if not isinstance(data, list):
                         corrupted.append(filename)
 
                 elif filename == "plan.json":
-                    import json
-                    with open(filepath, 'r') as f:
-                        plan = json.load(f)
-                    if not plan or not plan.get("title"):
-                        corrupted.append(filename)
-
-                elif filename == "generation_result.json":
-                    result = task.load_generation_result()
-                    if not result or not result.get("plan"):
+                    if not data or not data.get("title"):
                         corrupted.append(filename)
 
                 # 其他文件只验证JSON格式
-                else:
-                    import json
-                    with open(filepath, 'r') as f:
-                        json.load(f)
+
+            except FileNotFoundError:
+                corrupted.append(filename)
 
             except Exception as e:
                 print(f"  ⚠️  文件验证失败: {filename} - {e}")
@@ -546,27 +580,43 @@ class RetryHandler:
 
         return corrupted
 
-    def clean_files(self, task: GenerationTask, files_to_remove: List[str]):
+    def clean_files(
+        self,
+        task: GenerationTask,
+        files_to_remove: List[str],
+        entries: Optional[Dict[str, os.DirEntry]] = None
+    ):
         """清理文件
 
         Args:
             task: 任务对象
             files_to_remove: 需要删除的文件列表
+            entries: 任务目录快照（_snapshot_dir 的结果，省略时自动获取）
         """
+        if entries is None:
+            entries = self._snapshot_dir(task)
+
+        # 删除后 to_dict 的 has_* 需要重新检查磁盘
+        task.discard_file_state(files_to_remove)
+
         for filename in files_to_remove:
-            filepath = task.task_dir / filename
-            if filepath.exists():
-                try:
-                    filepath.unlink()
-                    print(f"  🗑️  已删除: {filename}")
-                except Exception as e:
-                    print(f"  ⚠️  删除失败: {filename} - {e}")
+            entry = entries.get(filename)
+            if entry is None:
+                continue
+            try:
+                os.unlink(entry.path)
+                print(f"  🗑️  已删除: {filename}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"  ⚠️  删除失败: {filename} - {e}")
 
     def _determine_playbook_action(
         self,
         task: GenerationTask,
         resume_stage: str,
-        keep_playbook: bool
+        keep_playbook: bool,
+        entries: Optional[Dict[str, os.DirEntry]] = None
     ) -> str:
         """判断 playbook 操作类型
 
@@ -574,39 +624,47 @@ class RetryHandler:
             task: 任务对象
             resume_stage: 恢复阶段
             keep_playbook: 用户指定是否保留
+            entries: 任务目录快照（可选）
 
         Returns:
             "none" - 不涉及 playbook 操作
             "rollback" - 回滚 playbook（丢弃 bullets）
         """
-        # 1. 检查任务是否完成了 feedback 流程
-        if not self._has_completed_feedback(task):
-            return "none"  # 未完成 feedback，无需处理
-
-        # 2. 所有阶段都由用户参数决定（不自动回滚）
+        # 1. 所有阶段都由用户参数决定（不自动回滚）
         # 用户可能想用不同的评估模式重新执行 feedback，但保留之前的 playbook bullets
+        # 先判断参数：默认保留时无需检查 feedback 状态
         if keep_playbook:
             return "none"  # 保留 bullets（默认）
-        else:
-            return "rollback"  # 丢弃 bullets（用户明确指定 --discard-playbook）
 
-    def _has_completed_feedback(self, task: GenerationTask) -> bool:
+        # 2. 检查任务是否完成了 feedback 流程
+        if not self._has_completed_feedback(task, entries):
+            return "none"  # 未完成 feedback，无需处理
+
+        return "rollback"  # 丢弃 bullets（用户明确指定 --discard-playbook）
+
+    def _has_completed_feedback(
+        self,
+        task: GenerationTask,
+        entries: Optional[Dict[str, os.DirEntry]] = None
+    ) -> bool:
         """检查任务是否完成了 feedback 流程
 
+        Args:
+            task: 任务对象
+            entries: 任务目录快照（提供时不再 stat curation.json）
+
         Returns:
             True - 已完成 feedback，playbook 可能已更新
             False - 未完成 feedback
         """
-        # 方法1: 检查 curation.json 是否存在
-        curation_file = task.task_dir / "curation.json"
-        if curation_file.exists():
-            return True
-
-        # 方法2: 检查任务元数据（如果有 feedback_status）
-        if hasattr(task, 'feedback_status') and task.feedback_status == "completed":
+        # 方法1: 检查任务元数据（内存判断，无需文件系统调用）
+        if getattr(task, 'feedback_status', None) == "completed":
             return True
 
-        return False
+        # 方法2: 检查 curation.json 是否存在
+        if entries is not None:
+            return "curation.json" in entries
+        return (task.task_dir / "curation.json").exists()
 
     def _rollback_playbook(self, task: GenerationTask) -> bool:
         """回滚 playbook（丢弃此任务生成的 bullets）
@@ -620,20 +678,26 @@ class RetryHandler:
         try:
             # 读取 curation.json，获取此任务的所有操作
             curation_file = task.task_dir / "curation.json"
-            if not curation_file.exists():
+            try:
+                curation_bytes = curation_file.read_bytes()
+            except FileNotFoundError:
                 print("  ℹ️  未找到 curation.json，跳过 playbook 回滚")
                 return True
 
-            import json
-            with open(curation_file, 'r', encoding='utf-8') as f:
-                curation_result = json.load(f)
+            curation_result = json_utils.loads(curation_bytes)
+
+            # 没有任何 delta 操作：无需读取（可能很大的）playbook
+            delta_operations = curation_result.get("delta_operations") or []
+            if not delta_operations:
+                print("  ℹ️  此任务未修改 bullets，无需回滚")
+                return True
 
             # 提取需要回滚的操作
             added_bullet_ids = []
             updated_bullets = []  # [(bullet_id, old_content), ...]
             removed_bullets = []  # [完整的 bullet 对象, ...]
 
-            for update in curation_result.get("delta_operations", []):
+            for update in delta_operations:
                 operation = update.get("operation")
 
                 if operation == "ADD":
@@ -662,51 +726,51 @@ class RetryHandler:
                 print("  ℹ️  此任务未修改 bullets，无需回滚")
                 return True
 
-            # 从 playbook 中回滚变更
+            # 从 playbook 中回滚变更（一次读取 → 按 id 索引原地修改 → 原子写回）
             playbook_path = Path("data/playbooks/chemistry_playbook.json")
-
-            with open(playbook_path, 'r', encoding='utf-8') as f:
-                playbook = json.load(f)
-
-            # 1. 移除 ADD 的 bullets
-            original_count = len(playbook.get("bullets", []))
-            playbook["bullets"] = [
-                b for b in playbook.get("bullets", [])
-                if b["id"] not in added_bullet_ids
-            ]
-            removed_count = original_count - len(playbook["bullets"])
-
-            # 2. 还原 UPDATE 的 bullets
+            try:
+                playbook_bytes = playbook_path.read_bytes()
+            except FileNotFoundError:
+                print(f"  ℹ️  未找到 playbook ({playbook_path})，跳过回滚")
+                return True
+            playbook = json_utils.loads(playbook_bytes)
+
+            # 1+2. 单次遍历：跳过 ADD 的 bullets，还原 UPDATE 的 bullets，同时记录已有 id
+            added = set(added_bullet_ids)
+            updates = dict(updated_bullets)
+            new_bullets = []
+            existing_ids = set()
+            removed_count = 0
             restored_count = 0
-            for bullet_id, old_content in updated_bullets:
-                for bullet in playbook.get("bullets", []):
-                    if bullet["id"] == bullet_id:
-                        bullet["content"] = old_content
-                        # 清除 embedding（需要重新计算）
-                        if "metadata" in bullet and "embedding" in bullet["metadata"]:
-                            bullet["metadata"]["embedding"] = None
-                        restored_count += 1
-                        break
-
-            # 3. 恢复 REMOVE 的 bullets
+            for bullet in playbook.get("bullets", []):
+                bullet_id = bullet["id"]
+                if bullet_id in added:
+                    removed_count += 1
+                    continue
+                old_content = updates.get(bullet_id)
+                if old_content is not None:
+                    bullet["content"] = old_content
+                    # 清除 embedding（需要重新计算）
+                    if "metadata" in bullet and "embedding" in bullet["metadata"]:
+                        bullet["metadata"]["embedding"] = None
+                    restored_count += 1
+                new_bullets.append(bullet)
+                existing_ids.add(bullet_id)
+
+            # 3. 恢复 REMOVE 的 bullets（已存在的不重复添加）
+            # 注意：embedding 可能为 None（因为 curation.json 保存时移除了 embedding）
+            # 这是正常的，下次 Curator 运行时会重新计算 embedding
             recovered_count = 0
             for removed_bullet in removed_bullets:
-                # 检查 bullet 是否已存在（避免重复添加）
-                bullet_exists = any(
-                    b["id"] == removed_bullet["id"]
-                    for b in playbook.get("bullets", [])
-                )
-
-                if not bullet_exists:
-                    # 恢复被删除的 bullet
-                    # 注意：embedding 可能为 None（因为 curation.json 保存时移除了 embedding）
-                    # 这是正常的，下次 Curator 运行时会重新计算 embedding
-                    playbook["bullets"].append(removed_bullet)
+                if removed_bullet["id"] not in existing_ids:
+                    new_bullets.append(removed_bullet)
+                    existing_ids.add(removed_bullet["id"])
                     recovered_count += 1
 
-            # 保存回滚后的 playbook
-            with open(playbook_path, 'w', encoding='utf-8') as f:
-                json.dump(playbook, f, ensure_ascii=False, indent=2)
+            playbook["bullets"] = new_bullets
+
+            # 保存回滚后的 playbook：原子替换，中途崩溃不会留下半个文件
+            json_utils.write_atomic(playbook_path, playbook, indent=True)
 
             # 显示回滚结果
             print(f"  ✅ Playbook 已回滚:")
@@ -719,9 +783,19 @@ class RetryHandler:
 
             return True
 
+        except json_utils.JSONDecodeError as e:
+            # curation.json 或 playbook 损坏：不修改 playbook
+            print(f"  ⚠️  Playbook 回滚失败: JSON 格式错误 - {e}")
+            return False
+
+        except OSError as e:
+            # 读写失败（权限、磁盘满等），原子写入保证 playbook 未被破坏
+            print(f"  ⚠️  Playbook 回滚失败: {e}")
+            return False
+
         except Exception as e:
+            # 未预期的错误（如数据结构不符），输出完整堆栈便于排查
             print(f"  ⚠️  Playbook 回滚失败: {e}")
-            import traceback
             traceback.print_exc()
             return False
 
@@ -751,115 +825,169 @@ class RetryHandler:
             print(f"❌ 无法重试: {reason}")
             return False
 
-        # 2. 准备重试
-        print(f"\n🔄 准备重试任务 {task.task_id}")
-        print(f"  ✅ 任务状态: {task.status.value}")
+        # 状态输出先缓存，在子步骤自行输出前 / 结束时一次性写出
+        out: List[str] = []
+        emit = out.append
 
-        # 根据状态显示不同信息
-        if task.status == TaskStatus.CANCELLED:
-            print(f"  💡 恢复已取消的任务")
-        elif task.status == TaskStatus.COMPLETED:
-            print(f"  💡 重新生成方案")
-        elif task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
-            print(f"  💡 检测到任务卡住（子进程已退出），视为失败重试")
+        def flush():
+            if out:
+                sys.stdout.write("\n".join(out) + "\n")
+                out.clear()
+            sys.stdout.flush()
 
-        # 显示阶段信息
-        if force_stage:
-            print(f"  ✅ 指定阶段: {force_stage}")
-        elif task.failed_stage:
-            print(f"  ✅ 恢复阶段: {task.failed_stage}")
-        elif task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
-            # 卡住状态：显示自动检测的阶段
-            state_to_stage = {
-                TaskStatus.PENDING: "extracting",
-                TaskStatus.EXTRACTING: "extracting",
-                TaskStatus.RETRIEVING: "retrieving",
-                TaskStatus.GENERATING: "generating"
-            }
-            detected_stage = state_to_stage.get(task.status, "extracting")
-            print(f"  ✅ 自动检测阶段: {detected_stage}")
-
-        # 对 FAILED 和卡住状态显示重试次数
-        if task.status == TaskStatus.FAILED or task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
-            print(f"  ✅ 重试次数: {task.retry_count}/{task.max_retries}")
-            if task.error:
-                print(f"  ℹ️  错误信息: {task.error[:100]}...")
-
-        prep_info = self.prepare_retry(
-            task,
-            clean=clean,
-            force_stage=force_stage,
-            keep_playbook=keep_playbook
-        )
+        try:
+            # 2. 准备重试
+            emit(f"\n🔄 准备重试任务 {task.task_id}")
+            emit(f"  ✅ 任务状态: {task.status.value}")
+
+            # 根据状态显示不同信息
+            if task.status == TaskStatus.CANCELLED:
+                emit(f"  💡 恢复已取消的任务")
+            elif task.status == TaskStatus.COMPLETED:
+                emit(f"  💡 重新生成方案")
+            elif task.status in _STUCK_STATES:
+                emit(f"  💡 检测到任务卡住（子进程已退出），视为失败重试")
+
+            # 显示阶段信息
+            if force_stage:
+                emit(f"  ✅ 指定阶段: {force_stage}")
+            elif task.failed_stage:
+                emit(f"  ✅ 恢复阶段: {task.failed_stage}")
+            elif task.status in _STUCK_STATES:
+                # 卡住状态：显示自动检测的阶段
+                detected_stage = _STATE_TO_STAGE.get(task.status, "extracting")
+                emit(f"  ✅ 自动检测阶段: {detected_stage}")
+
+            # 对 FAILED 和卡住状态显示重试次数
+            if task.status == TaskStatus.FAILED or task.status in _STUCK_STATES:
+                emit(f"  ✅ 重试次数: {task.retry_count}/{task.max_retries}")
+                if task.error:
+                    emit(f"  ℹ️  错误信息: {task.error[:100]}...")
+
+            # 失败重试：退避期内直接拒绝（--force 跳过），不在 CLI 中阻塞等待
+            backoff_delay = 0.0
+            if not force and self._get_operation_type(task.status) == "retry":
+                backoff_delay, remaining = self._backoff_remaining(task)
+                if remaining > 0:
+                    out.clear()
+                    print(f"❌ 无法重试: 退避中，{remaining:.0f} 秒后可重试（或使用 --force 立即重试）")
+                    return False
+
+            # 任务目录快照：playbook 判断、验证和清理共用，避免逐个文件 stat
+            entries = self._snapshot_dir(task)
+
+            prep_info = self.prepare_retry(
+                task,
+                clean=clean,
+                force_stage=force_stage,
+                keep_playbook=keep_playbook,
+                entries=entries
+            )
 
-        print(f"\n📋 重试策略: {prep_info['strategy']}")
-        print(f"  - 从阶段开始: {prep_info['resume_from_stage']}")
-        print(f"  - 恢复到状态: {prep_info['resume_from_status'].value}")
-
-        # 3. Playbook 操作（关键新增）
-        if prep_info['playbook_action'] == 'rollback':
-            print(f"\n🔄 回滚 Playbook...")
-            self._rollback_playbook(task)
-
-        # 4. 验证文件
-        if prep_info['files_to_keep']:
-            print(f"\n🔍 验证文件完整性...")
-            corrupted = self.validate_files(task, prep_info['files_to_keep'])
-
-            if corrupted:
-                print(f"  ⚠️  发现损坏文件: {', '.join(corrupted)}")
-                print(f"  ⚠️  建议使用 --clean 模式完全重试")
-
-                # 将损坏文件加入删除列表
-                prep_info['files_to_remove'].extend(corrupted)
-                prep_info['files_to_keep'] = [f for f in prep_info['files_to_keep'] if f not in corrupted]
-
-        # 5. 清理文件
-        if prep_info['files_to_remove']:
-            print(f"\n🗑️  清理文件...")
-            self.clean_files(task, prep_info['files_to_remove'])
-
-        # 6. 记录重试历史
-        retry_record = {
-            "timestamp": datetime.now().isoformat(),
-            "operation": self._get_operation_type(task.status),
-            "previous_status": task.status.value,
-            "retry_count": task.retry_count + 1 if task.status != TaskStatus.CANCELLED else 0,
-            "previous_error": task.error if (task.status == TaskStatus.FAILED or task.status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]) else None,
-            "previous_stage": task.failed_stage,
-            "strategy": prep_info['strategy'],
-            "playbook_action": prep_info['playbook_action']
-        }
-        task.retry_history.append(retry_record)
+            emit(f"\n📋 重试策略: {prep_info['strategy']}")
+            emit(f"  - 从阶段开始: {prep_info['resume_from_stage']}")
+            emit(f"  - 恢复到状态: {prep_info['resume_from_status'].value}")
+
+            # 3. Playbook 操作（关键新增）
+            if prep_info['playbook_action'] == 'rollback':
+                emit(f"\n🔄 回滚 Playbook...")
+                flush()
+                self._rollback_playbook(task)
+
+            # 4. 验证文件
+            if prep_info['files_to_keep']:
+                emit(f"\n🔍 验证文件完整性...")
+                flush()
+                corrupted = self.validate_files(task, prep_info['files_to_keep'], entries)
+
+                if corrupted:
+                    emit(f"  ⚠️  发现损坏文件: {', '.join(corrupted)}")
+                    emit(f"  ⚠️  建议使用 --clean 模式完全重试")
+
+                    # 将损坏文件加入删除列表
+                    prep_info['files_to_remove'].extend(corrupted)
+                    prep_info['files_to_keep'] = [f for f in prep_info['files_to_keep'] if f not in corrupted]
+
+            # 5. 清理文件
+            if prep_info['files_to_remove']:
+                emit(f"\n🗑️  清理文件...")
+                flush()
+                self.clean_files(task, prep_info['files_to_remove'], entries)
+
+            # 6. 记录重试历史
+            retry_record = RetryRecord(
+                timestamp=datetime.now().isoformat(),
+                operation=self._get_operation_type(task.status),
+                previous_status=task.status.value,
+                retry_count=task.retry_count + 1 if task.status != TaskStatus.CANCELLED else 0,
+                previous_error=task.error if (task.status == TaskStatus.FAILED or task.status in _STUCK_STATES) else None,
+                previous_stage=task.failed_stage,
+                strategy=prep_info['strategy'],
+                playbook_action=prep_info['playbook_action'],
+                backoff_delay=round(backoff_delay, 3)
+            )
+            task.append_retry_record(retry_record)
+
+            # 7. 更新任务状态
+            task.status = prep_info['resume_from_status']
+            task.error = None  # 清除错误信息
+            task.failed_stage = None  # 清除失败阶段
+
+            # 更新重试计数
+            if retry_record.operation == 'resume_cancelled':
+                # CANCELLED 任务：重置重试计数
+                task.retry_count = 0
+                emit(f"  ℹ️  重试计数已重置为 0")
+            elif retry_record.operation == 'retry':
+                # FAILED 任务：递增重试计数
+                task.retry_count += 1
+                emit(f"  ℹ️  重试次数: {task.retry_count}/{task.max_retries}")
+            # COMPLETED 任务（regenerate）：不修改 retry_count
+
+            # Feedback流程重置
+            if prep_info['resume_from_stage'] in _FEEDBACK_STAGES:
+                task.feedback_status = "pending"
+                task.feedback_error = None
+
+            # 8. 保存任务
+            self.task_manager._save_task(task)
+
+            emit(f"\n✅ 重试准备完成")
+            emit(f"  - 任务状态已更新: {task.status.value}")
+
+            return True
+        finally:
+            flush()
 
-        # 7. 更新任务状态
-        task.status = prep_info['resume_from_status']
-        task.error = None  # 清除错误信息
-        task.failed_stage = None  # 清除失败阶段
+    @staticmethod
+    def _compute_backoff(attempt: int, seed: Optional[str] = None) -> float:
+        """计算第 attempt 次重试的退避时间（full jitter）
 
-        # 更新重试计数
-        if retry_record['operation'] == 'resume_cancelled':
-            # CANCELLED 任务：重置重试计数
-            task.retry_count = 0
-            print(f"  ℹ️  重试计数已重置为 0")
-        elif retry_record['operation'] == 'retry':
-            # FAILED 任务：递增重试计数
-            task.retry_count += 1
-            print(f"  ℹ️  重试次数: {task.retry_count}/{task.max_retries}")
-        # COMPLETED 任务（regenerate）：不修改 retry_count
+        在 [0, min(cap, base * 2^attempt)] 内均匀取值，避免多个任务同时重试。
+        指定 seed 时结果固定，同一任务反复 /retry 不会重新抽签绕过退避
+        """
+        ceiling = min(_BACKOFF_CAP_S, _BACKOFF_BASE_S * (2 ** min(attempt, 16)))
+        rng = random.Random(seed) if seed is not None else random
+        return rng.uniform(0, ceiling)
 
-        # Feedback流程重置
-        if prep_info['resume_from_stage'] in ['evaluating', 'reflecting', 'curating']:
-            task.feedback_status = "pending"
-            task.feedback_error = None
+    def _backoff_remaining(self, task: GenerationTask) -> Tuple[float, float]:
+        """计算本次重试的退避时间及距上次重试尚需等待的秒数
 
-        # 8. 保存任务
-        self.task_manager._save_task(task)
+        Returns:
+            (退避时间, 剩余等待秒数)；剩余 <= 0 表示可以立即重试
+        """
+        delay = self._compute_backoff(task.retry_count, seed=f"{task.task_id}:{task.retry_count}")
 
-        print(f"\n✅ 重试准备完成")
-        print(f"  - 任务状态已更新: {task.status.value}")
+        # 退避从上次重试算起，扣除已经过去的时间（首次重试无需等待）
+        remaining = 0.0
+        if task.retry_history:
+            try:
+                last = datetime.fromisoformat(task.retry_history[-1].timestamp)
+                remaining = delay - (datetime.now() - last).total_seconds()
+            except ValueError:
+                pass
 
-        return True
+        return delay, remaining
 
     def _get_operation_type(self, status: TaskStatus) -> str:
         """获取操作类型（用于审计日志）"""
@@ -869,7 +997,7 @@ class RetryHandler:
             return "resume_cancelled"
         elif status == TaskStatus.COMPLETED:
             return "regenerate"
-        elif status in [TaskStatus.PENDING, TaskStatus.EXTRACTING, TaskStatus.RETRIEVING, TaskStatus.GENERATING]:
+        elif status in _STUCK_STATES:
             # 卡住的中间状态：视为失败重试
             return "retry"
         else:
@@ -0,0 +1,163 @@
+"""RAG 语义缓存
+
+功能：
+1. 持久化保存 查询 → 检索结果（SQLite，跨进程/跨任务复用）
+2. 按查询向量余弦相似度命中（近似相同的查询也能复用）
+3. TTL 过期淘汰
+4. 向量按 int8 量化存储（每个向量一个缩放系数，体积为 float32 的 1/4）
+
+设计原则：
+- 查询向量由调用方提供的 embed_fn 计算（复用 LargeRAG 的 embedding 模型）
+- 缓存只是加速手段：任何缓存错误都由调用方降级为正常检索
+- 缓存条目很少（每个需求一条），相似度用 numpy 暴力计算即可
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 表结构版本（存储格式变化时旧缓存直接丢弃重建）
+SCHEMA_VERSION = 2
+
+
+class SemanticCache:
+    """基于查询向量相似度的检索结果缓存"""
+
+    def __init__(
+        self,
+        path: str,
+        embed_fn: Callable[[str], Sequence[float]],
+        threshold: float = 0.92,
+        ttl: float = 86400
+    ):
+        """初始化
+
+        Args:
+            path: SQLite 数据库文件路径
+            embed_fn: 查询文本 → 向量
+            threshold: 命中所需的最低余弦相似度
+            ttl: 条目有效期（秒）
+        """
+        self.path = Path(path)
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl = ttl
+
+        # 未命中时 put() 复用 get() 已算好的向量，避免重复 embedding 调用
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS rag_cache")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rag_cache ("
+                " query TEXT NOT NULL,"
+                " top_k INTEGER NOT NULL,"
+                " embedding BLOB NOT NULL,"
+                " scale REAL NOT NULL,"
+                " templates TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，退出时提交并关闭"""
+        conn = sqlite3.connect(str(self.path), timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _embed(self, query: str) -> np.ndarray:
+        """计算归一化的查询向量（内积即余弦相似度）"""
+        vector = self._embeddings.get(query)
+        if vector is None:
+            vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+            with self._lock:
+                if len(self._embeddings) >= 64:
+                    self._embeddings.clear()
+                self._embeddings[query] = vector
+        return vector
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """对称 int8 量化：vector ≈ q * scale"""
+        max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+        if max_abs == 0.0:
+            return np.zeros(vector.shape, dtype=np.int8), 1.0
+        scale = max_abs / 127.0
+        q = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return q, scale
+
+    def get(self, query: str, top_k: int) -> Optional[List[Dict]]:
+        """查找相似查询的缓存结果
+
+        Args:
+            query: 查询字符串
+            top_k: 返回文档数量（只匹配相同 top_k 的条目）
+
+        Returns:
+            命中时返回缓存的模板列表，否则 None
+        """
+        cutoff = time.time() - self.ttl
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rag_cache WHERE created_at < ?", (cutoff,))
+            rows = conn.execute(
+                "SELECT embedding, scale, templates FROM rag_cache WHERE top_k = ?",
+                (top_k,)
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        vector = self._embed(query)
+        # 维度不同的条目来自旧的 embedding 模型，不可比
+        rows = [row for row in rows if len(row[0]) == vector.shape[0]]
+        if not rows:
+            return None
+
+        # 反量化：score_i = (q_i · v) * scale_i
+        matrix = np.stack([np.frombuffer(row[0], dtype=np.int8) for row in rows])
+        scales = np.array([row[1] for row in rows], dtype=np.float32)
+        scores = (matrix.astype(np.float32) @ vector) * scales
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        return json.loads(rows[best][2])
+
+    def put(self, query: str, top_k: int, templates: List[Dict]):
+        """保存检索结果
+
+        Args:
+            query: 查询字符串
+            top_k: 返回文档数量
+            templates: 检索结果（需可 JSON 序列化）
+        """
+        q, scale = self._quantize(self._embed(query))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO rag_cache (query, top_k, embedding, scale, templates, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    query,
+                    top_k,
+                    q.tobytes(),
+                    scale,
+                    json.dumps(templates, ensure_ascii=False),
+                    time.time()
+                )
+            )
@@ -8,18 +8,52 @@
 """
 
 import threading
-import queue
 import time
 import signal
 import atexit
 import json
 import os
+import re
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Dict, Any, Optional, Callable, List
-from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable, List, Deque, Iterator, NamedTuple, Set, Tuple
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
 
+from utils import json_utils
+
+# ijson 作为可选依赖（流式解析超大 generation_result.json），不可用时整体加载
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+
+# 内存中保留的最近重试记录条数（完整历史在 retry_history.jsonl 中）
+RETRY_HISTORY_LIMIT = 50
+
+# generation_result.json 超过该大小（字节）时流式解析 trajectory；
+# 小文件整体解析更快（流式解析器的逐事件开销大于节省的内存）
+STREAM_PARSE_THRESHOLD = 5_000_000
+
+# 启动时恢复任务：任务数达到 PARALLEL_RESTORE_MIN 时用 RESTORE_WORKERS 个线程并行读取
+PARALLEL_RESTORE_MIN = 32
+RESTORE_WORKERS = 16
+
+# task.json 开头的 task_id / session_id / status（to_dict 按此顺序输出）。
+# 只查询状态时读取文件开头的 TASK_HEADER_SIZE 字节并匹配，不解析整个文件
+TASK_HEADER_SIZE = 512
+_JSON_STRING = rb'("(?:[^"\\]|\\.)*")'
+_TASK_HEADER_RE = re.compile(
+    rb'\A\{\s*"task_id":\s*' + _JSON_STRING +
+    rb',\s*"session_id":\s*' + _JSON_STRING +
+    rb',\s*"status":\s*"([a-z_]+)"'
+)
+
 
 class TaskStatus(str, Enum):
     """任务状态"""
@@ -33,6 +67,71 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"             # 取消
 
 
+# 终态：任务已结束，不会再被 Worker 推进
+TERMINAL_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED})
+# 正常结束（完成或取消）的终态；FAILED 在 resume_task 中单独提示
+_ENDED_STATUSES = frozenset({TaskStatus.COMPLETED, TaskStatus.CANCELLED})
+
+
+def create_task_dir(tasks_dir: Path) -> Tuple[str, Path]:
+    """生成新的任务ID并创建任务目录
+
+    直接 os.mkdir（tasks_dir 已存在），ID 冲突时重新生成，
+    不会复用其他任务的目录。
+
+    Returns:
+        (task_id, task_dir)
+    """
+    while True:
+        task_id = uuid.uuid4().hex[:8]
+        task_dir = tasks_dir / task_id
+        try:
+            os.mkdir(task_dir)
+        except FileExistsError:
+            continue
+        return task_id, task_dir
+
+
+@dataclass(slots=True)
+class RetryRecord:
+    """一次重试操作的审计记录（task.json 中 retry_history 的元素）"""
+    timestamp: str
+    operation: str                      # retry, resume_cancelled, regenerate
+    previous_status: str
+    retry_count: int
+    previous_error: Optional[str]
+    previous_stage: Optional[str]
+    strategy: str                       # clean, partial, resume_cancelled, regenerate
+    playbook_action: str                # none, rollback
+    backoff_delay: float = 0.0          # 本次重试距上次重试的最小间隔（秒）
+
+    def to_dict(self) -> Dict:
+        """序列化为字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RetryRecord":
+        """从字典反序列化（兼容缺少字段的旧记录）"""
+        return cls(
+            timestamp=data.get("timestamp", ""),
+            operation=data.get("operation", "unknown"),
+            previous_status=data.get("previous_status", ""),
+            retry_count=data.get("retry_count", 0),
+            previous_error=data.get("previous_error"),
+            previous_stage=data.get("previous_stage"),
+            strategy=data.get("strategy", ""),
+            playbook_action=data.get("playbook_action", "none"),
+            backoff_delay=data.get("backoff_delay", 0.0)
+        )
+
+
+class TaskMeta(NamedTuple):
+    """任务的轻量摘要（只需要状态时使用，见 TaskManager.get_all_task_meta）"""
+    task_id: str
+    session_id: str
+    status: TaskStatus
+
+
 @dataclass
 class GenerationTask:
     """生成任务（持久化版本）"""
@@ -53,7 +152,13 @@ class GenerationTask:
     retry_count: int = 0
     max_retries: int = 3
     failed_stage: Optional[str] = None  # extracting, retrieving, generating, evaluating, reflecting, curating
-    retry_history: List[Dict] = field(default_factory=list)
+    # 最近 RETRY_HISTORY_LIMIT 条重试记录（环形缓冲，内存有界）
+    retry_history: Deque[RetryRecord] = field(
+        default_factory=lambda: deque(maxlen=RETRY_HISTORY_LIMIT)
+    )
+    # 旧版本写在 task.json 中的重试记录：原样保留在 task.json，
+    # 新记录只追加到 retry_history.jsonl（每次重试 O(1) 写入）
+    _legacy_retry_history: List[RetryRecord] = field(default_factory=list, repr=False)
 
     # Feedback流程状态（独立于主任务状态）
     feedback_status: Optional[str] = None  # pending, running, completed, failed
@@ -62,73 +167,138 @@ class GenerationTask:
     feedback_mode: Optional[str] = None  # auto, llm_judge, human - 记录评估模式
     feedback_file_path: Optional[str] = None  # human模式的反馈文件路径
 
-    # 缓存失效机制：记录文件最后修改时间
-    _file_mtime: Optional[float] = field(default=None, repr=False)
+    # 缓存失效机制：记录加载/保存时 task.json 的 (st_mtime_ns, st_size)
+    # （纳秒时间戳 + 大小，同一秒内的多次写入也能区分）
+    _file_stat: Optional[Tuple[int, int]] = field(default=None, repr=False)
+    # 最近一次写入 task.json 的内容（相同内容的重复保存直接跳过）
+    _saved_payload: Optional[bytes] = field(default=None, repr=False)
+    # 任务目录下各文件的路径（task_dir 创建后不再改变，按文件名缓存）
+    _paths: Dict[str, Path] = field(default_factory=dict, repr=False, compare=False)
+    # 本进程通过 save_* 写入的文件（to_dict 的 has_* 不必再 stat 检查）
+    _written_files: Set[str] = field(default_factory=set, repr=False, compare=False)
+
+    def __post_init__(self):
+        # 传入普通列表时转换为有界环形缓冲
+        if not isinstance(self.retry_history, deque) or self.retry_history.maxlen != RETRY_HISTORY_LIMIT:
+            self.retry_history = deque(self.retry_history, maxlen=RETRY_HISTORY_LIMIT)
+
+    def _task_path(self, name: str) -> Path:
+        """任务目录下的文件路径（缓存，避免每次访问都拼接新的 Path）"""
+        path = self._paths.get(name)
+        if path is None:
+            path = self._paths[name] = self.task_dir / name
+        return path
+
+    def _has_file(self, name: str) -> bool:
+        """文件是否存在（本进程写入过的文件直接返回 True，不做 stat）"""
+        return name in self._written_files or self._task_path(name).exists()
+
+    def discard_file_state(self, names):
+        """文件被外部删除后调用，之后的 has_* 重新检查磁盘"""
+        self._written_files.difference_update(names)
+
+    @property
+    def task_file(self) -> Path:
+        """任务状态文件路径"""
+        return self._task_path("task.json")
 
     @property
     def requirements_file(self) -> Path:
         """需求文件路径"""
-        return self.task_dir / "requirements.json"
+        return self._task_path("requirements.json")
 
     @property
     def templates_file(self) -> Path:
         """模板文件路径"""
-        return self.task_dir / "templates.json"
+        return self._task_path("templates.json")
 
     @property
     def plan_file(self) -> Path:
         """方案文件路径"""
-        return self.task_dir / "plan.json"
+        return self._task_path("plan.json")
 
     @property
     def generation_result_file(self) -> Path:
         """完整生成结果文件路径（包含trajectory和bullets）"""
-        return self.task_dir / "generation_result.json"
+        return self._task_path("generation_result.json")
 
     @property
     def feedback_file(self) -> Path:
         """反馈文件路径"""
-        return self.task_dir / "feedback.json"
+        return self._task_path("feedback.json")
 
     @property
     def reflection_file(self) -> Path:
         """反思结果文件路径"""
-        return self.task_dir / "reflection.json"
+        return self._task_path("reflection.json")
 
     @property
     def curation_file(self) -> Path:
         """Playbook更新记录文件路径"""
-        return self.task_dir / "curation.json"
+        return self._task_path("curation.json")
+
+    @property
+    def retry_history_file(self) -> Path:
+        """重试记录文件路径（JSONL，每行一条 RetryRecord）"""
+        return self._task_path("retry_history.jsonl")
+
+    def append_retry_record(self, record: RetryRecord):
+        """追加一条重试记录（写入 retry_history.jsonl 并更新内存中的最近记录）"""
+        with open(self.retry_history_file, 'ab') as f:
+            f.write(json_utils.dumps(record.to_dict()) + b"\n")
+        self.retry_history.append(record)
+
+    @staticmethod
+    def _load_retry_history_file(task_dir: Path) -> List[RetryRecord]:
+        """读取 retry_history.jsonl 的最近记录（跳过写入中断留下的残行）"""
+        try:
+            lines = (task_dir / "retry_history.jsonl").read_bytes().splitlines()
+        except FileNotFoundError:
+            return []
+
+        # 只解析内存中会保留的最后几行
+        lines = lines[-RETRY_HISTORY_LIMIT:]
+
+        records = []
+        for line in lines:
+            try:
+                records.append(RetryRecord.from_dict(json_utils.loads(line)))
+            except (json_utils.JSONDecodeError, AttributeError):
+                continue
+        return records
+
+    @staticmethod
+    def _write_json(path: Path, obj):
+        """以缩进 JSON 原子写入任务文件（读取方不会看到写了一半的文件）"""
+        json_utils.write_bytes_atomic(path, json_utils.dumps(obj, indent=True), fsync=False)
 
     def save_requirements(self, requirements: Dict):
         """保存需求到文件"""
-        with open(self.requirements_file, 'w', encoding='utf-8') as f:
-            json.dump(requirements, f, indent=2, ensure_ascii=False)
+        self._write_json(self.requirements_file, requirements)
+        self._written_files.add("requirements.json")
 
     def load_requirements(self) -> Optional[Dict]:
         """从文件加载需求"""
         if not self.requirements_file.exists():
             return None
-        with open(self.requirements_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_utils.loads(self.requirements_file.read_bytes())
 
     def save_templates(self, templates: List[Dict]):
         """保存模板到文件"""
-        with open(self.templates_file, 'w', encoding='utf-8') as f:
-            json.dump(templates, f, indent=2, ensure_ascii=False)
+        self._write_json(self.templates_file, templates)
+        self._written_files.add("templates.json")
 
     def save_plan(self, plan):
         """保存方案到文件"""
-        # 将Pydantic模型转为dict
-        if hasattr(plan, 'model_dump'):
-            plan_dict = plan.model_dump()
-        elif hasattr(plan, 'dict'):
-            plan_dict = plan.dict()
+        if hasattr(plan, 'model_dump_json'):
+            # Pydantic v2：直接序列化为 JSON 字节，不构造中间字典
+            data = plan.model_dump_json(indent=2).encode('utf-8')
+            json_utils.write_bytes_atomic(self.plan_file, data, fsync=False)
         else:
-            plan_dict = plan
-
-        with open(self.plan_file, 'w', encoding='utf-8') as f:
-            json.dump(plan_dict, f, indent=2, ensure_ascii=False)
+            # Pydantic v1 模型或普通 dict
+            plan_dict = plan.dict() if hasattr(plan, 'dict') else plan
+            self._write_json(self.plan_file, plan_dict)
+        self._written_files.add("plan.json")
 
     def save_generation_result(self, generation_result):
         """保存完整的GenerationResult（包含trajectory和bullets）
@@ -141,28 +311,72 @@ class GenerationTask:
                 - generation_metadata: Dict
         """
         # 使用Pydantic的mode='json'进行序列化（处理datetime等特殊类型）
-        result_dict = {
-            "plan": generation_result.generated_plan.model_dump(mode='json'),
-            "trajectory": [step.model_dump(mode='json') for step in generation_result.trajectory],
-            "relevant_bullets": generation_result.relevant_bullets,
-            "generation_metadata": generation_result.generation_metadata
-        }
-
-        with open(self.generation_result_file, 'w', encoding='utf-8') as f:
-            json.dump(result_dict, f, indent=2, ensure_ascii=False)
-
-    def load_generation_result(self) -> Optional[Dict]:
+        # trajectory 逐步序列化并写入（每步一行），不在内存中构造整个结果字典；
+        # 文件仍是同样字段的单个 JSON 对象，读取方无需改动。
+        # 写入临时文件后原子替换：中途出错（如某一步 model_dump 失败）不会留下截断的文件
+        dumps = json_utils.dumps
+        with json_utils.open_atomic(self.generation_result_file, fsync=False) as f:
+            f.write(b'{"plan": ')
+            f.write(dumps(generation_result.generated_plan.model_dump(mode='json')))
+            f.write(b',\n"trajectory": [')
+            for i, step in enumerate(generation_result.trajectory):
+                f.write(b'\n' if i == 0 else b',\n')
+                f.write(dumps(step.model_dump(mode='json')))
+            f.write(b'\n],\n"relevant_bullets": ')
+            f.write(dumps(generation_result.relevant_bullets))
+            f.write(b',\n"generation_metadata": ')
+            f.write(dumps(generation_result.generation_metadata))
+            f.write(b'}\n')
+
+    def load_generation_result(
+        self,
+        trajectory_factory: Optional[Callable[[Dict], Any]] = None
+    ) -> Optional[Dict]:
         """加载GenerationResult
 
+        Args:
+            trajectory_factory: 可选，把每个trajectory步骤字典转换为对象
+                （如 TrajectoryStep(**step)），返回字典中的trajectory即为转换结果
+
         Returns:
             包含plan、trajectory、relevant_bullets、generation_metadata的字典，
             如果文件不存在则返回None
+
+        Notes:
+            小文件以二进制读取并用 json_utils.loads 解析（orjson可用时走C解析器），
+            返回的字典结构与 json.load 完全一致。
+            超过 STREAM_PARSE_THRESHOLD 且安装了 ijson 时，trajectory 逐项流式解析
+            并立即转换，不会同时持有原始字典列表和转换结果（峰值内存减半）
         """
-        if not self.generation_result_file.exists():
+        path = self.generation_result_file
+        if not path.exists():
             return None
 
-        with open(self.generation_result_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if not IJSON_AVAILABLE or path.stat().st_size <= STREAM_PARSE_THRESHOLD:
+            data = json_utils.loads(path.read_bytes())
+            if trajectory_factory is not None:
+                data["trajectory"] = [
+                    trajectory_factory(step) for step in data.get("trajectory", [])
+                ]
+            return data
+
+        # 流式解析：每个顶层字段单独扫描一遍
+        def first(prefix: str, default):
+            with open(path, "rb") as f:
+                return next(ijson.items(f, prefix, use_float=True), default)
+
+        with open(path, "rb") as f:
+            steps = ijson.items(f, "trajectory.item", use_float=True)
+            if trajectory_factory is not None:
+                steps = map(trajectory_factory, steps)
+            trajectory = list(steps)
+
+        return {
+            "plan": first("plan", None),
+            "trajectory": trajectory,
+            "relevant_bullets": first("relevant_bullets", []),
+            "generation_metadata": first("generation_metadata", {})
+        }
 
     def save_feedback(self, feedback):
         """保存评估反馈
@@ -172,8 +386,7 @@ class GenerationTask:
         """
         feedback_dict = feedback.model_dump(mode='json')
 
-        with open(self.feedback_file, 'w', encoding='utf-8') as f:
-            json.dump(feedback_dict, f, indent=2, ensure_ascii=False)
+        self._write_json(self.feedback_file, feedback_dict)
 
     def save_reflection(self, reflection):
         """保存反思结果
@@ -183,8 +396,7 @@ class GenerationTask:
         """
         reflection_dict = reflection.model_dump(mode='json')
 
-        with open(self.reflection_file, 'w', encoding='utf-8') as f:
-            json.dump(reflection_dict, f, indent=2, ensure_ascii=False)
+        self._write_json(self.reflection_file, reflection_dict)
 
     def save_curation(self, curation):
         """保存Playbook更新记录
@@ -192,27 +404,21 @@ class GenerationTask:
         Args:
             curation: PlaybookUpdateResult对象
         """
-        curation_dict = curation.model_dump(mode='json')
-
-        # 🔧 移除 embedding 以减小文件大小
-        # Embedding 只用于去重，保存到文件后不再需要
-        if 'updated_playbook' in curation_dict and 'bullets' in curation_dict['updated_playbook']:
-            for bullet in curation_dict['updated_playbook']['bullets']:
-                if 'metadata' in bullet and 'embedding' in bullet['metadata']:
-                    bullet['metadata']['embedding'] = None
-
-        # 也清理 delta_operations 中的 embedding
-        if 'delta_operations' in curation_dict:
-            for op in curation_dict['delta_operations']:
-                if 'new_bullet' in op and op['new_bullet'] and 'metadata' in op['new_bullet']:
-                    if 'embedding' in op['new_bullet']['metadata']:
-                        op['new_bullet']['metadata']['embedding'] = None
-                if 'old_bullet' in op and op['old_bullet'] and 'metadata' in op['old_bullet']:
-                    if 'embedding' in op['old_bullet']['metadata']:
-                        op['old_bullet']['metadata']['embedding'] = None
-
-        with open(self.curation_file, 'w', encoding='utf-8') as f:
-            json.dump(curation_dict, f, indent=2, ensure_ascii=False)
+        # 🔧 不导出 embedding 以减小文件大小
+        # Embedding 只用于去重，保存到文件后不再需要（加载时默认为 None）
+        # 由 Pydantic 在序列化时直接跳过，不会先生成再清空大的浮点数列表
+        no_embedding = {'metadata': {'embedding'}}
+        curation_dict = curation.model_dump(
+            mode='json',
+            exclude={
+                'updated_playbook': {'bullets': {'__all__': no_embedding}},
+                'delta_operations': {
+                    '__all__': {'new_bullet': no_embedding, 'removed_bullet': no_embedding}
+                }
+            }
+        )
+
+        self._write_json(self.curation_file, curation_dict)
 
     def to_dict(self) -> Dict:
         """序列化为字典"""
@@ -221,9 +427,9 @@ class GenerationTask:
             "session_id": self.session_id,
             "status": self.status.value,
             "created_at": self.created_at.isoformat(),
-            "has_requirements": self.requirements_file.exists() if self.task_dir else False,
-            "has_templates": self.templates_file.exists() if self.task_dir else False,
-            "has_plan": self.plan_file.exists() if self.task_dir else False,
+            "has_requirements": self._has_file("requirements.json") if self.task_dir else False,
+            "has_templates": self._has_file("templates.json") if self.task_dir else False,
+            "has_plan": self._has_file("plan.json") if self.task_dir else False,
             "error": self.error,
             "metadata": self.metadata,
             "task_dir": str(self.task_dir) if self.task_dir else None,
@@ -232,7 +438,7 @@ class GenerationTask:
             "retry_count": self.retry_count,
             "max_retries": self.max_retries,
             "failed_stage": self.failed_stage,
-            "retry_history": self.retry_history,
+            "retry_history": [record.to_dict() for record in self._legacy_retry_history],
             # Feedback相关字段
             "feedback_status": self.feedback_status,
             "feedback_error": self.feedback_error,
@@ -244,6 +450,9 @@ class GenerationTask:
     @classmethod
     def from_dict(cls, data: Dict, task_dir: Path):
         """从字典反序列化"""
+        legacy_history = [
+            RetryRecord.from_dict(record) for record in data.get("retry_history", [])
+        ]
         return cls(
             task_id=data["task_id"],
             session_id=data["session_id"],
@@ -257,7 +466,8 @@ class GenerationTask:
             retry_count=data.get("retry_count", 0),
             max_retries=data.get("max_retries", 3),
             failed_stage=data.get("failed_stage"),
-            retry_history=data.get("retry_history", []),
+            retry_history=legacy_history + cls._load_retry_history_file(task_dir),
+            _legacy_retry_history=legacy_history,
             # Feedback相关字段
             feedback_status=data.get("feedback_status"),
             feedback_error=data.get("feedback_error"),
@@ -277,55 +487,121 @@ class LogWriter:
     这样避免了LogWriter和TaskScheduler双重写入同一个文件。
     """
 
+    # 缓冲区超过该大小（字节）时立即写盘，否则由后台线程每 FLUSH_INTERVAL 秒写一次
+    BUFFER_LIMIT = 64 * 1024
+    FLUSH_INTERVAL = 0.1
+
     def __init__(self, log_file: Path, write_to_file: bool = True):
         self.log_file = log_file
         self.write_to_file = write_to_file
         self.file = None
 
+        self.lock = threading.Lock()
+
+        # 时间戳的 "HH:MM:SS" 部分按秒缓存（strftime 较慢）
+        self._last_second = None
+        self._second_prefix = ""
+
+        # 文件写入缓冲：每行不再单独 flush（一次系统调用），由后台线程批量写入
+        self._buf = bytearray()
+        self._closed = threading.Event()
+        self._flush_thread = None
+
         if self.write_to_file:
-            self.file = open(log_file, 'w', encoding='utf-8')
+            # 追加模式（O_APPEND）：恢复执行的任务不会清空之前的日志，
+            # 每次批量写入都原子地追加到文件末尾（与其他写入方交错时不会互相覆盖）
+            self.file = open(log_file, 'ab')
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop,
+                daemon=True,
+                name="LogWriterFlush"
+            )
+            self._flush_thread.start()
 
-        self.lock = threading.Lock()
+    def _timestamp(self) -> str:
+        """当前时间 HH:MM:SS.mmm（调用方持有 self.lock）"""
+        now = time.time()
+        second = int(now)
+        if second != self._last_second:
+            self._last_second = second
+            self._second_prefix = time.strftime("%H:%M:%S", time.localtime(second))
+        return f"{self._second_prefix}.{int((now - second) * 1000):03d}"
 
     def write(self, message: str):
         """写入日志（带时间戳）并输出到stdout（管道捕获）"""
         with self.lock:
-            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            log_line = f"[{timestamp}] {message}"
+            log_line = f"[{self._timestamp()}] {message}"
 
-            # 1. 写入文件（持久化）- 仅在非子进程模式
+            # 1. 写入文件缓冲（持久化）- 仅在非子进程模式
             if self.write_to_file and self.file:
-                self.file.write(log_line + "\n")
-                self.file.flush()
+                self._buf += log_line.encode("utf-8")
+                self._buf += b"\n"
+                if len(self._buf) >= self.BUFFER_LIMIT:
+                    self._drain()
 
             # 2. 输出到stdout（被管道捕获）
             print(log_line)
 
+    def _drain(self):
+        """把缓冲区写入文件（调用方持有 self.lock）"""
+        if self._buf and self.file and not self.file.closed:
+            self.file.write(self._buf)
+            self.file.flush()
+            self._buf.clear()
+
+    def _flush_loop(self):
+        """后台线程：定期写出缓冲区，直到 close()"""
+        while not self._closed.wait(self.FLUSH_INTERVAL):
+            with self.lock:
+                self._drain()
+
     def close(self):
-        """关闭日志文件"""
-        if self.file and not self.file.closed:
-            self.file.close()
+        """写出剩余日志并关闭日志文件"""
+        self._closed.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+
+        with self.lock:
+            self._drain()
+            if self.file and not self.file.closed:
+                self.file.close()
 
 
 class TaskManager:
     """持久化任务管理器（单例）"""
 
+    # 锁文件心跳间隔（秒）
+    HEARTBEAT_INTERVAL = 10
+
     _instance = None
     _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
+        return cls.instance()
 
-    def __init__(self):
-        if hasattr(self, '_initialized'):
-            return
+    @classmethod
+    def instance(cls) -> "TaskManager":
+        """获取单例
+
+        创建后只读一次类属性，不加锁；首次创建在锁内完成初始化后才发布实例，
+        并发的首次调用不会看到（或重复执行）未完成的初始化。
+        """
+        inst = cls._instance
+        if inst is not None:
+            return inst
+        with cls._lock:
+            if cls._instance is None:
+                inst = super().__new__(cls)
+                inst._build()
+                cls._instance = inst
+            return cls._instance
 
-        self._initialized = True
+    def __init__(self):
+        # 初始化只在 _build() 中执行一次，TaskManager() 不会重置状态
+        pass
 
+    def _build(self):
+        """初始化单例状态（由 instance() 调用一次）"""
         # 任务目录
         self.tasks_dir = Path("logs/generation_tasks")
         self.tasks_dir.mkdir(parents=True, exist_ok=True)
@@ -333,16 +609,35 @@ class TaskManager:
         # 锁文件（用于防止多实例冲突）
         self.lock_file_path = self.tasks_dir / ".worker.lock"
         self.lock_file_fd = None
+        self._lock_started_at = None
 
         # 任务存储（内存缓存）
+        # 写时复制：写入方在 task_lock 内替换整个字典，读取方直接读 self.tasks 无需加锁
         self.tasks: Dict[str, GenerationTask] = {}
         self.task_lock = threading.Lock()
 
-        # 任务队列
-        self.task_queue = queue.Queue()
+        # 延迟持久化（mark_dirty/flush）：合并中间状态的多次写入
+        # 标记后至少200ms再落盘（可通过环境变量 TASK_SAVE_DELAY 调整，单位秒）
+        self.save_delay = float(os.environ.get("TASK_SAVE_DELAY", "0.2"))
+        self._dirty_timers: Dict[str, threading.Timer] = {}
+        self._save_lock = threading.Lock()
+
+        # 工作线程数（默认 1，可通过环境变量 TASK_WORKER_THREADS 调大）
+        # 多线程时不同会话的任务并发执行，而 GenerateCommandHandler 的 generator、
+        # StructuredLogger、性能监控和进程级 PlaybookManager 未做线程安全审查，
+        # 因此并发只作为显式开启的选项
+        self.worker_count = max(1, int(os.environ.get("TASK_WORKER_THREADS", "1")))
+
+        # 任务队列：按 session 分片（同一会话的任务始终进入同一队列，保持提交顺序），
+        # 空闲的工作线程可以从其他分片窃取队首任务
+        self.task_queues: List[Deque[tuple]] = [deque() for _ in range(self.worker_count)]
+        self._task_cond = threading.Condition()
+        self._running_sessions = set()  # 正在执行任务的会话（同一会话不并发执行）
 
         # 工作线程控制
-        self.worker_thread = None
+        self.worker_threads: List[threading.Thread] = []
+        self._alive_workers = 0
+        self._heartbeat_stop = threading.Event()
         self.running = False
         self.idle_timeout = 300  # 空闲5分钟后自动退出
         self.last_activity_time = time.time()
@@ -380,14 +675,27 @@ class TaskManager:
         self.last_activity_time = time.time()
 
         # 非守护线程，CLI退出后继续运行
-        self.worker_thread = threading.Thread(
-            target=self._worker,
-            daemon=as_daemon,
-            name="TaskWorker"
-        )
-        self.worker_thread.start()
+        self.worker_threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(index,),
+                daemon=as_daemon,
+                name=f"TaskWorker-{index}"
+            )
+            for index in range(self.worker_count)
+        ]
+        self._alive_workers = len(self.worker_threads)
+        for thread in self.worker_threads:
+            thread.start()
 
-        print(f"[TaskManager] Worker线程已启动 (daemon={as_daemon}, pid={os.getpid()})")
+        # 心跳由独立的守护线程负责（工作线程空闲时完全阻塞，不再轮询）
+        self._heartbeat_stop = threading.Event()
+        threading.Thread(target=self._heartbeat_loop, daemon=True, name="TaskHeartbeat").start()
+
+        print(
+            f"[TaskManager] {self.worker_count} 个Worker线程已启动 "
+            f"(daemon={as_daemon}, pid={os.getpid()})"
+        )
 
     def ensure_worker_running(self):
         """确保Worker线程运行中（惰性启动）
@@ -396,21 +704,23 @@ class TaskManager:
         """
         # 检查是否需要（重新）启动
         needs_start = False
+        alive = any(thread.is_alive() for thread in self.worker_threads)
 
         if not self.running:
             needs_start = True
             reason = "Worker未启动"
-        elif self.worker_thread is None:
+        elif not self.worker_threads:
             needs_start = True
             reason = "Worker线程不存在"
-        elif not self.worker_thread.is_alive():
+        elif not alive:
             needs_start = True
             reason = "Worker线程已退出"
 
         if needs_start:
             print(f"[TaskManager] {reason}，正在启动Worker...")
             # 清理旧状态
-            if self.worker_thread and not self.worker_thread.is_alive():
+            if self.worker_threads and not alive:
+                self.running = False
                 self._release_lock()
             # 启动新Worker
             self.start(as_daemon=False)
@@ -420,14 +730,19 @@ class TaskManager:
 
     def stop(self):
         """停止工作线程（优雅关闭）"""
-        if not self.running:
+        # 信号处理器只清除 running，锁文件仍由本进程持有时继续完成关闭
+        if not self.running and self.lock_file_fd is None:
             return
 
         print("[TaskManager] 正在停止Worker线程...")
-        self.running = False
+        with self._task_cond:
+            self.running = False
+            self._task_cond.notify_all()
+        self._heartbeat_stop.set()
 
-        if self.worker_thread and self.worker_thread.is_alive():
-            self.worker_thread.join(timeout=5)
+        for thread in self.worker_threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=5)
 
         self._release_lock()
         print("[TaskManager] Worker线程已停止")
@@ -445,13 +760,10 @@ class TaskManager:
             import fcntl
             fcntl.flock(self.lock_file_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
 
-            # 写入进程信息
-            lock_info = {
-                "pid": os.getpid(),
-                "started_at": datetime.now().isoformat(),
-                "heartbeat": datetime.now().isoformat()
-            }
-            os.write(self.lock_file_fd, json.dumps(lock_info).encode())
+            # 写入进程信息（清除上次运行残留的内容）
+            self._lock_started_at = datetime.now().isoformat(timespec="microseconds")
+            os.ftruncate(self.lock_file_fd, 0)
+            os.pwrite(self.lock_file_fd, self._lock_record(), 0)
 
             return True
 
@@ -482,19 +794,24 @@ class TaskManager:
             finally:
                 self.lock_file_fd = None
 
+    def _lock_record(self) -> bytes:
+        """锁文件内容（JSON）
+
+        时间戳固定精确到微秒，同一进程每次生成的记录长度相同，
+        心跳更新只需在偏移 0 处覆盖写一次，不必先清空文件。
+        """
+        lock_info = {
+            "pid": os.getpid(),
+            "started_at": self._lock_started_at,
+            "heartbeat": datetime.now().isoformat(timespec="microseconds")
+        }
+        return json.dumps(lock_info).encode()
+
     def _update_heartbeat(self):
         """更新心跳时间戳（表明进程还活着）"""
         if self.lock_file_fd is not None:
             try:
-                lock_info = {
-                    "pid": os.getpid(),
-                    "heartbeat": datetime.now().isoformat()
-                }
-
-                # 清空文件并写入新内容
-                os.lseek(self.lock_file_fd, 0, os.SEEK_SET)
-                os.ftruncate(self.lock_file_fd, 0)
-                os.write(self.lock_file_fd, json.dumps(lock_info).encode())
+                os.pwrite(self.lock_file_fd, self._lock_record(), 0)
             except Exception as e:
                 print(f"[TaskManager] 更新心跳失败: {e}")
 
@@ -503,9 +820,15 @@ class TaskManager:
         self.stop()
 
     def _signal_handler(self, signum, frame):
-        """信号处理器（优雅关闭）"""
+        """信号处理器（优雅关闭）
+
+        信号处理器中不直接调用 stop()：stop() 需要获取 _task_cond，
+        而主线程可能正持有它（会死锁）。改为清除 running 标志，
+        由单独的线程执行 stop()（唤醒阻塞的工作线程、等待退出并释放锁）。
+        """
         print(f"\n[TaskManager] 收到信号 {signum}，正在关闭...")
-        self.stop()
+        self.running = False
+        threading.Thread(target=self.stop, name="TaskManagerStop").start()
         exit(0)
 
     def submit_task(
@@ -524,12 +847,8 @@ class TaskManager:
         Returns:
             task_id
         """
-        import uuid
-        task_id = str(uuid.uuid4())[:8]
-
-        # 创建任务目录
-        task_dir = self.tasks_dir / task_id
-        task_dir.mkdir(exist_ok=True)
+        # 生成任务ID并创建任务目录
+        task_id, task_dir = create_task_dir(self.tasks_dir)
 
         # 创建任务
         task = GenerationTask(
@@ -539,14 +858,16 @@ class TaskManager:
             log_file=task_dir / "task.log"
         )
 
-        with self.task_lock:
-            self.tasks[task_id] = task
+        self._cache_tasks([task])
 
         # 持久化任务状态
         self._save_task(task)
 
-        # 提交到队列
-        self.task_queue.put((task_id, handler, kwargs))
+        # 提交到会话对应的分片队列
+        shard = hash(session_id) % self.worker_count
+        with self._task_cond:
+            self.task_queues[shard].append((task_id, session_id, handler, kwargs))
+            self._task_cond.notify()
 
         # 更新活动时间
         self.last_activity_time = time.time()
@@ -555,70 +876,178 @@ class TaskManager:
 
     def get_task(self, task_id: str) -> Optional[GenerationTask]:
         """获取任务（自动检测文件变化，智能刷新缓存）"""
-        # 检查任务文件是否存在
         task_dir = self.tasks_dir / task_id
-        if not task_dir.exists():
-            return None
-
         task_file = task_dir / "task.json"
-        if not task_file.exists():
-            return None
 
+        # 一次 stat 同时检查存在性和变化（轮询时的热路径）
         try:
-            # 获取文件当前修改时间
-            current_mtime = task_file.stat().st_mtime
-
-            with self.task_lock:
-                # 如果缓存存在，检查文件是否被修改
-                if task_id in self.tasks:
-                    cached_task = self.tasks[task_id]
+            st = os.stat(task_file)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except OSError as e:
+            print(f"[TaskManager] 加载任务失败 {task_id}: {e}")
+            return None
 
-                    # 智能刷新：只有文件被修改时才重新加载
-                    if cached_task._file_mtime == current_mtime:
-                        return cached_task  # 文件未变化，返回缓存（快速）
-                    else:
-                        # 文件已被修改（子进程更新了），清除缓存
-                        del self.tasks[task_id]
+        return self._get_task_with_stat(task_id, task_dir, (st.st_mtime_ns, st.st_size))
 
-            # 从磁盘加载最新数据
-            with open(task_file, 'r', encoding='utf-8') as f:
-                task_data = json.load(f)
+    def _get_task_with_stat(
+        self,
+        task_id: str,
+        task_dir: Path,
+        file_stat: Tuple[int, int]
+    ) -> Optional[GenerationTask]:
+        """按 task.json 的 (st_mtime_ns, st_size) 返回缓存或从磁盘重新加载"""
+        cached_task, task = self._load_task(task_id, task_dir, file_stat)
+        if task is not cached_task:
+            self._cache_tasks([task] if task else [], stale=[cached_task] if cached_task else None)
+        return task
+
+    def _load_task(
+        self,
+        task_id: str,
+        task_dir: Path,
+        file_stat: Tuple[int, int]
+    ) -> Tuple[Optional[GenerationTask], Optional[GenerationTask]]:
+        """返回 (当前缓存, 最新任务)，不修改缓存
+
+        文件未变化时两者是同一对象；否则最新任务从磁盘加载（加载失败为 None），
+        由调用方写回缓存（批量调用方只替换一次 self.tasks）。
+        """
+        # 如果缓存存在，检查文件是否被修改（无锁读取）
+        cached_task = self.tasks.get(task_id)
+        if cached_task is not None and cached_task._file_stat == file_stat:
+            return cached_task, cached_task  # 文件未变化，返回缓存（不打开文件）
 
+        # 文件已被修改（子进程更新了）或未缓存，从磁盘加载最新数据
+        try:
+            task_data = json_utils.loads((task_dir / "task.json").read_bytes())
             task = GenerationTask.from_dict(task_data, task_dir)
-            task._file_mtime = current_mtime  # 记录加载时的mtime
+        except Exception as e:
+            print(f"[TaskManager] 加载任务失败 {task_id}: {e}")
+            return cached_task, None
 
-            # 缓存到内存
-            with self.task_lock:
-                self.tasks[task_id] = task
+        task._file_stat = file_stat  # 记录加载时的文件状态
+        return cached_task, task
 
-            return task
+    def _cache_tasks(self, tasks: List[GenerationTask], stale: Optional[List[GenerationTask]] = None):
+        """更新内存缓存：写入 tasks，移除 stale 中的过期任务（已被其他线程替换的不处理）
 
-        except Exception as e:
-            print(f"[TaskManager] 加载任务失败 {task_id}: {e}")
-            return None
+        复制一次后整体替换 self.tasks，批量更新也只复制一次
+        """
+        with self.task_lock:
+            tasks_map = dict(self.tasks)
+            for task in stale or ():
+                if tasks_map.get(task.task_id) is task:
+                    del tasks_map[task.task_id]
+            for task in tasks:
+                tasks_map[task.task_id] = task
+            self.tasks = tasks_map
+
+    def _scan_task_files(self) -> Iterator[Tuple[str, Path, Tuple[int, int]]]:
+        """扫描任务目录，逐个返回 (task_id, task_dir, task.json 的 (st_mtime_ns, st_size))
+
+        is_dir() 使用目录项自带的类型信息，每个任务只 stat 一次 task.json
+        """
+        try:
+            it = os.scandir(self.tasks_dir)
+        except FileNotFoundError:
+            return
 
-    def get_all_tasks(self) -> List[GenerationTask]:
-        """获取所有任务"""
-        tasks = []
+        with it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
 
-        # 从磁盘扫描所有任务
-        if not self.tasks_dir.exists():
-            return tasks
+                try:
+                    st = os.stat(os.path.join(entry.path, "task.json"))
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    print(f"[TaskManager] 加载任务失败 {entry.name}: {e}")
+                    continue
 
-        for task_dir in self.tasks_dir.iterdir():
-            if not task_dir.is_dir():
-                continue
+                yield entry.name, self.tasks_dir / entry.name, (st.st_mtime_ns, st.st_size)
 
-            task = self.get_task(task_dir.name)
+    def get_all_tasks(self) -> List[GenerationTask]:
+        """获取所有任务"""
+        tasks = []
+        loaded = []
+        stale = []
+
+        # 从磁盘扫描所有任务，未变化的任务直接复用缓存；
+        # 重新加载的任务最后一次性写回缓存（只复制一次 self.tasks）
+        for task_id, task_dir, file_stat in self._scan_task_files():
+            cached_task, task = self._load_task(task_id, task_dir, file_stat)
+            if task is not cached_task:
+                if task:
+                    loaded.append(task)
+                if cached_task:
+                    stale.append(cached_task)
             if task:
                 tasks.append(task)
 
+        if loaded or stale:
+            self._cache_tasks(loaded, stale=stale)
+
         return tasks
 
+    def get_all_task_meta(self) -> List[TaskMeta]:
+        """获取所有任务的摘要（task_id、session_id、status）
+
+        只需要状态时使用：未缓存或已变化的任务只读取 task.json 开头部分，
+        不构造完整的 GenerationTask。
+        """
+        metas = []
+        for task_id, task_dir, file_stat in self._scan_task_files():
+            meta = self._read_task_meta(task_id, task_dir, file_stat)
+            if meta:
+                metas.append(meta)
+        return metas
+
+    def _read_task_meta(
+        self,
+        task_id: str,
+        task_dir: Path,
+        file_stat: Tuple[int, int]
+    ) -> Optional[TaskMeta]:
+        """读取任务摘要（缓存有效时直接使用缓存，否则只解析文件开头）"""
+        cached_task = self.tasks.get(task_id)
+        if cached_task is not None and cached_task._file_stat == file_stat:
+            return TaskMeta(cached_task.task_id, cached_task.session_id, cached_task.status)
+
+        try:
+            with open(task_dir / "task.json", "rb") as f:
+                header = f.read(TASK_HEADER_SIZE)
+        except OSError as e:
+            print(f"[TaskManager] 加载任务失败 {task_id}: {e}")
+            return None
+
+        match = _TASK_HEADER_RE.match(header)
+        if match:
+            try:
+                return TaskMeta(
+                    json_utils.loads(match[1]),
+                    json_utils.loads(match[2]),
+                    TaskStatus(match[3].decode())
+                )
+            except ValueError:
+                pass
+
+        # 字段顺序不同（外部写入）或开头过长：完整加载
+        task = self._get_task_with_stat(task_id, task_dir, file_stat)
+        if not task:
+            return None
+        return TaskMeta(task.task_id, task.session_id, task.status)
+
     def get_session_tasks(self, session_id: str) -> List[GenerationTask]:
         """获取会话的所有任务"""
-        all_tasks = self.get_all_tasks()
-        return [t for t in all_tasks if t.session_id == session_id]
+        tasks = []
+        for meta in self.get_all_task_meta():
+            if meta.session_id == session_id:
+                task = self.get_task(meta.task_id)
+                if task:
+                    tasks.append(task)
+        return tasks
 
     def get_resumable_tasks(self) -> List[GenerationTask]:
         """获取所有可恢复的任务
@@ -628,11 +1057,14 @@ class TaskManager:
         Returns:
             可恢复的任务列表
         """
-        all_tasks = self.get_all_tasks()
-        return [
-            task for task in all_tasks
-            if task.status == TaskStatus.AWAITING_CONFIRM
-        ]
+        # 先按摘要筛选状态，只完整加载符合条件的任务
+        tasks = []
+        for meta in self.get_all_task_meta():
+            if meta.status == TaskStatus.AWAITING_CONFIRM:
+                task = self.get_task(meta.task_id)
+                if task and task.status == TaskStatus.AWAITING_CONFIRM:
+                    tasks.append(task)
+        return tasks
 
     def resume_task(self, task_id: str) -> bool:
         """恢复已中断的任务（仅支持 AWAITING_CONFIRM 状态）
@@ -670,7 +1102,7 @@ class TaskManager:
             print(f"[TaskManager] 任务 {task_id} 已恢复，Worker将继续执行")
             return True
 
-        elif task.status in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]:
+        elif task.status in _ENDED_STATUSES:
             print(f"[TaskManager] 任务 {task_id} 已结束（{task.status.value}），无需恢复")
             return False
 
@@ -685,88 +1117,197 @@ class TaskManager:
             print(f"[TaskManager] 提示: 只有 AWAITING_CONFIRM 状态的任务需要恢复")
             return False
 
+    def mark_dirty(self, task: GenerationTask):
+        """标记任务状态已变更，延迟持久化
+
+        内存状态立即生效；task.json 在 save_delay 秒后写入一次，
+        期间的多次状态变更会合并为一次写入（定时器触发时写入最新状态）。
+        用于中间状态（EXTRACTING/RETRIEVING/GENERATING等），
+        检查点（等待确认、完成、失败）请使用 flush()。
+        """
+        if not task.task_dir:
+            return
+
+        with self.task_lock:
+            if task.task_id in self._dirty_timers:
+                return  # 已有待写入，定时器触发时会写入最新状态
+
+            timer = threading.Timer(self.save_delay, self._flush_dirty, args=(task,))
+            timer.daemon = True
+            self._dirty_timers[task.task_id] = timer
+
+        timer.start()
+
+    def flush(self, task: GenerationTask):
+        """立即持久化任务状态（取消待执行的延迟写入）"""
+        with self.task_lock:
+            timer = self._dirty_timers.pop(task.task_id, None)
+
+        if timer is not None:
+            timer.cancel()
+
+        self._save_task(task)
+
+    def _flush_dirty(self, task: GenerationTask):
+        """延迟写入定时器回调"""
+        with self.task_lock:
+            if self._dirty_timers.pop(task.task_id, None) is None:
+                return  # 已被 flush() 接管
+
+        self._save_task(task)
+
     def _save_task(self, task: GenerationTask):
         """保存任务状态到磁盘"""
         if not task.task_dir:
             return
 
-        task_file = task.task_dir / "task.json"
+        task_file = task.task_file
 
-        with open(task_file, 'w', encoding='utf-8') as f:
-            json.dump(task.to_dict(), f, indent=2, ensure_ascii=False)
+        # 延迟写入定时器与工作线程可能同时写入：序列化、比较、写入和记录
+        # 都在锁内完成，后获得锁的一方总是序列化最新状态，旧快照不会覆盖新状态
+        with self._save_lock:
+            # 仍写缩进的 JSON（TUI、子进程和人工查看都直接读取 task.json），
+            # 序列化走 json_utils（orjson 可用时为 C 编码器）
+            payload = json_utils.dumps(task.to_dict(), indent=True)
 
-    def _restore_tasks(self):
-        """从磁盘恢复任务"""
-        if not self.tasks_dir.exists():
-            return
+            # 内容与上次写入相同且文件未被其他进程改动：跳过写入
+            # （不改变 mtime，其他进程的 get_task 缓存也不会失效）
+            if payload == task._saved_payload:
+                try:
+                    st = os.stat(task_file)
+                except FileNotFoundError:
+                    st = None
+                if st is not None and (st.st_mtime_ns, st.st_size) == task._file_stat:
+                    return
 
-        for task_dir in self.tasks_dir.iterdir():
-            if not task_dir.is_dir():
-                continue
+            # 原子替换：读取方（TUI、子进程）不会读到写了一半的 task.json。
+            # 状态切换很频繁，不做 fsync（断电最多丢失最近一次状态）
+            json_utils.write_bytes_atomic(task_file, payload, fsync=False)
+            st = os.stat(task_file)
 
-            task_file = task_dir / "task.json"
-            if not task_file.exists():
-                continue
+            # 自己写入的变更不必再从磁盘重新加载
+            task._file_stat = (st.st_mtime_ns, st.st_size)
+            task._saved_payload = payload
 
-            try:
-                with open(task_file, 'r', encoding='utf-8') as f:
-                    task_data = json.load(f)
+    def _restore_tasks(self):
+        """从磁盘恢复任务（只恢复状态，不重新执行）
+
+        任务较多时用线程池并行读取（瓶颈是逐个文件的 I/O 延迟）。
+        恢复的任务记录 task.json 的文件状态，之后的 get_task 可直接命中缓存。
+        """
+        entries = list(self._scan_task_files())
 
-                # 重建任务对象
+        def load(entry) -> Optional[GenerationTask]:
+            task_id, task_dir, file_stat = entry
+            try:
+                task_data = json_utils.loads((task_dir / "task.json").read_bytes())
                 task = GenerationTask.from_dict(task_data, task_dir)
-                self.tasks[task.task_id] = task
+            except Exception as e:
+                print(f"[TaskManager] 恢复任务失败 {task_id}: {e}")
+                return None
+            task._file_stat = file_stat
+            return task
 
-                # 如果任务未完成，重新加入队列
-                # （这里简化处理，不重新执行，只是恢复状态）
+        if len(entries) < PARALLEL_RESTORE_MIN:
+            tasks = [load(entry) for entry in entries]
+        else:
+            with ThreadPoolExecutor(max_workers=RESTORE_WORKERS) as executor:
+                tasks = list(executor.map(load, entries))
 
-            except Exception as e:
-                print(f"[TaskManager] 恢复任务失败 {task_dir.name}: {e}")
+        self._cache_tasks([task for task in tasks if task])
 
-    def _worker(self):
-        """工作线程主循环"""
-        print("[TaskWorker] 工作线程开始运行")
+    def _take_task(self, index: int) -> Optional[tuple]:
+        """取出下一个可执行的任务（调用方持有 self._task_cond）
 
-        heartbeat_interval = 10  # 每10秒更新一次心跳
-        last_heartbeat = time.time()
+        先查看自己的分片，再依次窃取其他分片的队首任务。
+        队首任务所属会话正在执行时跳过该分片：同一会话的任务都在同一分片中，
+        只取队首就保证了会话内按提交顺序串行执行。
+        """
+        for k in range(self.worker_count):
+            task_queue = self.task_queues[(index + k) % self.worker_count]
+            if task_queue and task_queue[0][1] not in self._running_sessions:
+                item = task_queue.popleft()
+                self._running_sessions.add(item[1])
+                return item
+        return None
+
+    def _wait_for_task(self, index: int) -> Optional[tuple]:
+        """阻塞等待下一个可执行的任务，Worker 应退出时返回 None
+
+        不做周期性轮询：提交任务、任务结束和 stop() 都会唤醒等待的线程；
+        没有执行中/排队的任务时，只在空闲超时到期时醒来一次。
+        """
+        with self._task_cond:
+            while self.running:
+                item = self._take_task(index)
+                if item is not None:
+                    return item
+
+                if self._running_sessions or any(self.task_queues):
+                    # 有任务在执行（或排队等同一会话的任务结束）：等待唤醒
+                    self._task_cond.wait()
+                    continue
 
-        while self.running:
-            try:
-                # 更新心跳
-                if time.time() - last_heartbeat > heartbeat_interval:
-                    self._update_heartbeat()
-                    last_heartbeat = time.time()
-
-                # 检查空闲超时
-                if time.time() - self.last_activity_time > self.idle_timeout:
-                    print("[TaskWorker] 空闲超时，自动退出")
+                remaining = self.last_activity_time + self.idle_timeout - time.time()
+                if remaining <= 0:
+                    print(f"[TaskWorker-{index}] 空闲超时，自动退出")
                     self.running = False
+                    self._task_cond.notify_all()
                     break
+                self._task_cond.wait(timeout=remaining)
+        return None
 
-                # 获取任务（超时1秒）
-                try:
-                    task_id, handler, kwargs = self.task_queue.get(timeout=1)
-                except queue.Empty:
-                    continue
+    def _heartbeat_loop(self):
+        """心跳线程：每 HEARTBEAT_INTERVAL 秒更新一次锁文件，直到 Worker 全部退出"""
+        while not self._heartbeat_stop.wait(self.HEARTBEAT_INTERVAL):
+            self._update_heartbeat()
+
+    def _worker(self, index: int = 0):
+        """工作线程主循环"""
+        print(f"[TaskWorker-{index}] 工作线程开始运行")
+
+        while True:
+            item = self._wait_for_task(index)
+            if item is None:
+                break
 
-                # 更新活动时间
-                self.last_activity_time = time.time()
+            task_id, session_id, handler, kwargs = item
 
+            # 更新活动时间
+            self.last_activity_time = time.time()
+
+            try:
                 # 从内存或磁盘加载任务
                 task = self.get_task(task_id)
                 if not task:
-                    print(f"[TaskWorker] 任务 {task_id} 不存在")
+                    print(f"[TaskWorker-{index}] 任务 {task_id} 不存在")
                     continue
 
                 # 执行任务
                 self._execute_task(task, handler, kwargs)
 
             except Exception as e:
-                print(f"[TaskWorker] Worker异常: {e}")
+                print(f"[TaskWorker-{index}] Worker异常: {e}")
                 import traceback
                 traceback.print_exc()
 
-        print("[TaskWorker] 工作线程已停止")
-        self._release_lock()
+            finally:
+                with self._task_cond:
+                    self._running_sessions.discard(session_id)
+                    self.last_activity_time = time.time()
+                    # 唤醒等待中的线程：该会话排队的后续任务现在可以执行，
+                    # 空闲的线程也据此重新计算空闲超时
+                    self._task_cond.notify_all()
+
+        print(f"[TaskWorker-{index}] 工作线程已停止")
+
+        # 最后一个退出的线程停止心跳并释放锁
+        with self._task_cond:
+            self._alive_workers -= 1
+            last = self._alive_workers == 0
+        if last:
+            self._heartbeat_stop.set()
+            self._release_lock()
 
     def _execute_task(
         self,
@@ -791,9 +1332,8 @@ class TaskManager:
             import traceback
             error_msg = traceback.format_exc()
 
-            with self.task_lock:
-                task.status = TaskStatus.FAILED
-                task.error = str(e)
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
 
             self._save_task(task)
 
@@ -811,5 +1351,5 @@ def get_task_manager() -> TaskManager:
     """获取全局任务管理器（单例）"""
     global _task_manager
     if _task_manager is None:
-        _task_manager = TaskManager()
+        _task_manager = TaskManager.instance()
     return _task_manager
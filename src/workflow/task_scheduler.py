@@ -3,6 +3,7 @@
 核心特性：
 - subprocess.Popen 启动独立工作进程（start_new_session=True）
 - 子进程输出直接写入日志文件（不使用管道）
+- 提交任务后预先启动一个待命工作进程，下一个任务直接分配（省去解释器启动和导入开销）
 - 通过 PID 文件管理进程生命周期
 - 提供 get_logs() API 直接读取日志文件
 
@@ -20,16 +21,64 @@
 类比：类似docker、kubectl的模式
 """
 
+import atexit
 import sys
 import subprocess
 import json
 import os
 import signal
+import threading
+from io import StringIO
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 
-from workflow.task_manager import get_task_manager, TaskStatus
+from workflow.task_manager import get_task_manager, create_task_dir, TaskStatus, TERMINAL_STATUSES
+
+# get_logs 从文件末尾向前读取的块大小
+TAIL_BLOCK_SIZE = 8192
+
+# 统计日志行数时每次读取的块大小
+LINE_COUNT_CHUNK = 1 << 16
+
+# 生成任务工作进程脚本
+WORKER_SCRIPT = Path(__file__).parent / "task_worker.py"
+
+
+class _LineCount(NamedTuple):
+    """日志行数统计进度"""
+    file_id: Tuple[int, int]   # (st_dev, st_ino)，文件被重建时变化
+    mtime_ns: int
+    offset: int                # 已统计到的偏移
+    newlines: int              # 换行符数
+    ends_with_newline: bool    # 最后一个字节是否为换行
+
+
+def _read_tail_lines(log_file: Path, tail: int) -> List[str]:
+    """读取文件的最后 tail 行（从末尾按块向前读，不扫描整个文件）
+
+    读到的换行符多于 tail 个（或到达文件开头）即停止；
+    第一段可能不完整，不在文件开头时丢弃。
+    """
+    with open(log_file, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+        while pos > 0 and newlines <= tail:
+            size = min(TAIL_BLOCK_SIZE, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    if pos > 0:
+        data = data[data.index(b'\n') + 1:]
+
+    # 与文本模式读取一致：UTF-8 解码 + 通用换行符
+    lines = [line.rstrip('\n') for line in StringIO(data.decode('utf-8'), newline=None)]
+    return lines[-tail:]
 
 
 class TaskScheduler:
@@ -49,7 +98,121 @@ class TaskScheduler:
 
         # 子进程跟踪（只用于 CLI 当前会话，非持久化）
         # 重启后通过 PID 文件恢复进程信息
+        # 写时复制：写入方在锁内替换整个字典，遍历方（/tasks 轮询）直接读取快照
         self.processes: Dict[str, subprocess.Popen] = {}
+        self._processes_lock = threading.Lock()
+
+        # 日志行数统计进度（/tasks 轮询可能来自多个线程，读写都在锁内）
+        self._line_counts: Dict[Path, _LineCount] = {}
+        self._line_counts_lock = threading.Lock()
+
+        # 待命工作进程：预先完成解释器启动和模块导入，提交任务时直接分配给它，
+        # 省去每个任务数百毫秒的启动开销（TASK_WORKER_STANDBY=0 关闭）。
+        # 首次 submit_task 时才启动（只查看任务的 CLI 会话不会常驻一个空闲进程），
+        # 退出时终止
+        self.standby_enabled = os.environ.get("TASK_WORKER_STANDBY", "1") != "0"
+        self._standby: Optional[subprocess.Popen] = None
+        self._standby_lock = threading.Lock()
+        atexit.register(self._stop_standby)
+
+    def _track_process(self, process_key: str, process: subprocess.Popen):
+        """记录子进程（复制后整体替换 self.processes，不修改读取方持有的快照）"""
+        with self._processes_lock:
+            self.processes = {**self.processes, process_key: process}
+
+    @staticmethod
+    def _worker_env() -> Dict[str, str]:
+        """工作进程环境变量（禁用输出缓冲，确保日志实时可见）"""
+        env = os.environ.copy()
+        env['PYTHONUNBUFFERED'] = '1'
+        return env
+
+    def _spawn_standby(self):
+        """补充一个待命工作进程（已有存活的待命进程时不处理）"""
+        if not self.standby_enabled:
+            return
+
+        with self._standby_lock:
+            if self._standby is not None and self._standby.poll() is None:
+                return
+            try:
+                self._standby = subprocess.Popen(
+                    [sys.executable, str(WORKER_SCRIPT), "--standby"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,  # 分配任务后工作进程自行重定向到 task.log
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                    cwd=Path.cwd(),
+                    env=self._worker_env()
+                )
+            except OSError as e:
+                self._standby = None
+                print(f"[Scheduler] 启动待命进程失败: {e}")
+
+    def _assign_standby(self, task_id: str, log_file: Path, resume: bool) -> Optional[subprocess.Popen]:
+        """把任务分配给待命进程，没有可用的待命进程时返回 None"""
+        with self._standby_lock:
+            process, self._standby = self._standby, None
+
+        if process is None or process.poll() is not None:
+            return None
+
+        message = json.dumps({
+            "task_id": task_id,
+            "resume": resume,
+            "log_file": str(log_file.resolve())
+        })
+        try:
+            # 一行消息远小于 PIPE_BUF，写入不会阻塞；关闭 stdin 后与父进程再无管道联系
+            process.stdin.write(message.encode('utf-8') + b"\n")
+            process.stdin.close()
+        except OSError:
+            # 待命进程刚好退出（BrokenPipeError）
+            process.kill()
+            return None
+
+        return process
+
+    def _stop_standby(self):
+        """终止待命进程（尚未分配任务，直接结束即可）"""
+        with self._standby_lock:
+            standby, self._standby = self._standby, None
+        if standby is None or standby.poll() is not None:
+            return
+
+        try:
+            standby.stdin.close()
+        except OSError:
+            pass
+        standby.terminate()
+        try:
+            standby.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            standby.kill()
+
+    def _start_worker(self, task_id: str, log_file: Path, resume: bool = False) -> subprocess.Popen:
+        """启动任务工作进程
+
+        有待命进程时把任务发给它，否则直接启动新进程。两种方式下工作进程都脱离父进程会话（start_new_session=True），
+        输出都追加写入 task.log。
+        """
+        process = self._assign_standby(task_id, log_file, resume)
+
+        if process is None:
+            args = [task_id, "--resume"] if resume else [task_id]
+            # 打开日志文件（追加模式）：Popen 把它复制为子进程的 stdout/stderr，
+            # 子进程启动后父进程即关闭自己的句柄（否则每个任务泄漏一个文件描述符）
+            with open(log_file, 'ab', buffering=0) as log_fp:
+                process = subprocess.Popen(
+                    [sys.executable, str(WORKER_SCRIPT), *args],
+                    stdout=log_fp,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,  # 关键：脱离父进程的进程组
+                    cwd=Path.cwd(),
+                    env=self._worker_env()
+                )
+
+        return process
 
     def submit_task(
         self,
@@ -73,12 +236,8 @@ class TaskScheduler:
             ... )
             >>> print(f"Task {task_id} submitted")
         """
-        import uuid
-        task_id = str(uuid.uuid4())[:8]
-
-        # 创建任务目录
-        task_dir = self.tasks_dir / task_id
-        task_dir.mkdir(exist_ok=True)
+        # 生成任务ID并创建任务目录
+        task_id, task_dir = create_task_dir(self.tasks_dir)
 
         # 保存任务配置到JSON（供工作进程读取）
         config_file = task_dir / "config.json"
@@ -110,38 +269,22 @@ class TaskScheduler:
         task_manager._save_task(task)
 
         # 启动独立子进程
-        worker_script = Path(__file__).parent / "task_worker.py"
         log_file = task_dir / "task.log"
         pid_file = task_dir / "process.pid"
 
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
+        process = self._start_worker(task_id, log_file)
 
-        # 打开日志文件（不在 with 块内，让子进程继承文件句柄）
-        log_fp = open(log_file, 'a', buffering=1, encoding='utf-8')
+        # 保存 PID 到文件
+        with open(pid_file, 'w') as f:
+            f.write(str(process.pid))
 
-        try:
-            process = subprocess.Popen(
-                [sys.executable, str(worker_script), task_id],
-                stdout=log_fp,
-                stderr=subprocess.STDOUT,
-                start_new_session=True,  # 关键：脱离父进程的进程组
-                cwd=Path.cwd(),
-                env=env
-            )
+        # 跟踪进程（仅当前 CLI 会话有效）
+        self._track_process(task_id, process)
 
-            # 保存 PID 到文件
-            with open(pid_file, 'w') as f:
-                f.write(str(process.pid))
-
-            # 跟踪进程（仅当前 CLI 会话有效）
-            self.processes[task_id] = process
-
-            return task_id
+        # 为下一个任务补充待命进程（只在有任务提交时补充）
+        self._spawn_standby()
 
-        except Exception as e:
-            log_fp.close()
-            raise e
+        return task_id
 
     def resume_task(self, task_id: str) -> bool:
         """恢复已中断的任务（重新启动子进程，resume模式）
@@ -165,7 +308,7 @@ class TaskScheduler:
             return False
 
         # 检查任务状态
-        if task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
+        if task.status in TERMINAL_STATUSES:
             print(f"❌ 任务已结束（{task.status.value}），无法恢复")
             return False
 
@@ -177,38 +320,23 @@ class TaskScheduler:
                 return False
 
         # 启动独立子进程（resume模式）
-        worker_script = Path(__file__).parent / "task_worker.py"
         task_dir = self.tasks_dir / task_id
         log_file = task_dir / "task.log"
         pid_file = task_dir / "process.pid"
 
-        env = os.environ.copy()
-        env['PYTHONUNBUFFERED'] = '1'
-
-        # 打开日志文件（追加模式）
-        log_fp = open(log_file, 'a', buffering=1, encoding='utf-8')
-
         try:
-            process = subprocess.Popen(
-                [sys.executable, str(worker_script), task_id, "--resume"],
-                stdout=log_fp,
-                stderr=subprocess.STDOUT,
-                start_new_session=True,  # 完全独立
-                cwd=Path.cwd(),
-                env=env
-            )
+            process = self._start_worker(task_id, log_file, resume=True)
 
             # 更新 PID 文件
             with open(pid_file, 'w') as f:
                 f.write(str(process.pid))
 
             # 跟踪进程
-            self.processes[task_id] = process
+            self._track_process(task_id, process)
 
             return True
 
         except Exception as e:
-            log_fp.close()
             print(f"❌ 启动子进程失败: {e}")
             return False
 
@@ -271,30 +399,29 @@ class TaskScheduler:
         env = os.environ.copy()
         env['PYTHONUNBUFFERED'] = '1'
 
-        # 打开日志文件（追加模式，不在 with 块内，让子进程继承文件句柄）
-        log_fp = open(log_file, 'a', buffering=1, encoding='utf-8')
-
+        # 打开日志文件（追加模式）：Popen 把它复制为子进程的 stdout/stderr，
+        # 子进程启动后父进程即关闭自己的句柄（否则每个任务泄漏一个文件描述符）
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=log_fp,
-                stderr=subprocess.STDOUT,
-                start_new_session=True,  # 完全独立
-                cwd=Path.cwd(),
-                env=env
-            )
+            with open(log_file, 'ab', buffering=0) as log_fp:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=log_fp,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,  # 完全独立
+                    cwd=Path.cwd(),
+                    env=env
+                )
 
             # 保存 PID 到文件
             with open(pid_file, 'w') as f:
                 f.write(str(process.pid))
 
             # 跟踪进程
-            self.processes[feedback_process_id] = process
+            self._track_process(feedback_process_id, process)
 
             return True
 
         except Exception as e:
-            log_fp.close()
             print(f"❌ 启动反馈子进程失败: {e}")
             return False
 
@@ -316,7 +443,7 @@ class TaskScheduler:
         Notes:
             - 直接从 task.log 文件读取（持久化）
             - 支持 CLI 重启后继续查看日志
-            - 高效处理大文件（使用 deque 滚动窗口）
+            - 高效处理大文件（tail > 0 时只从末尾读取所需的块）
         """
         log_file = self.tasks_dir / task_id / "task.log"
 
@@ -325,17 +452,13 @@ class TaskScheduler:
             return [f"❌ 任务 {task_id} 日志文件不存在"]
 
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                if tail <= 0:
-                    # 返回所有行
+            if tail <= 0:
+                # 返回所有行
+                with open(log_file, 'r', encoding='utf-8') as f:
                     lines = [line.rstrip('\n') for line in f]
-                else:
-                    # 返回最后 N 行（使用 deque 高效滚动窗口）
-                    from collections import deque
-                    lines = deque(maxlen=tail)
-                    for line in f:
-                        lines.append(line.rstrip('\n'))
-                    lines = list(lines)
+            else:
+                # 返回最后 N 行（只读取文件末尾）
+                lines = _read_tail_lines(log_file, tail)
 
             # 如果文件为空
             if not lines:
@@ -438,18 +561,11 @@ class TaskScheduler:
         """
         info = {}
 
-        for task_id, process in self.processes.items():
+        for task_id, process in self.processes.items():  # 快照，无需加锁
             poll_result = process.poll()
 
-            # 计算日志行数（从日志文件读取）
-            log_file = self.tasks_dir / task_id / "task.log"
-            log_lines = 0
-            if log_file.exists():
-                try:
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        log_lines = sum(1 for _ in f)
-                except Exception:
-                    log_lines = 0
+            # 计算日志行数（增量统计，只读取上次之后新增的部分）
+            log_lines = self._count_log_lines(self.tasks_dir / task_id / "task.log")
 
             info[task_id] = {
                 "status": "running" if poll_result is None else (
@@ -461,6 +577,41 @@ class TaskScheduler:
 
         return info
 
+    def _count_log_lines(self, log_file: Path) -> int:
+        """统计日志行数（与逐行迭代文件的计数相同，最后一行没有换行符也计入）
+
+        task.log 只追加写入：记录已统计到的偏移，/tasks 轮询时只读取新增的字节。
+        以下情况视为文件已被替换，从头重新统计：
+        - inode 变化（被删除后重建）
+        - 文件变短（被截断）
+        - 大小未增长但 mtime 变化（被等长改写）
+        """
+        with self._line_counts_lock:
+            try:
+                with open(log_file, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    file_id = (st.st_dev, st.st_ino)
+                    count = self._line_counts.get(log_file)
+                    if (count is None or count.file_id != file_id or st.st_size < count.offset
+                            or (st.st_size == count.offset and st.st_mtime_ns != count.mtime_ns)):
+                        count = _LineCount(file_id, st.st_mtime_ns, 0, 0, True)
+
+                    offset, newlines, ends_with_newline = count.offset, count.newlines, count.ends_with_newline
+                    f.seek(offset)
+                    while True:
+                        chunk = f.read(LINE_COUNT_CHUNK)
+                        if not chunk:
+                            break
+                        newlines += chunk.count(b'\n')
+                        ends_with_newline = chunk.endswith(b'\n')
+                    offset = f.tell()
+            except OSError:
+                return 0
+
+            self._line_counts[log_file] = _LineCount(file_id, st.st_mtime_ns, offset, newlines, ends_with_newline)
+
+        return newlines if ends_with_newline else newlines + 1
+
     def terminate_task(self, task_id: str) -> bool:
         """终止任务子进程（支持 PID 文件查找）
 
@@ -578,6 +729,8 @@ class TaskScheduler:
         """
         print("[Scheduler] 正在清理资源...")
 
+        self._stop_standby()
+
         # 终止所有子进程（如果需要的话）
         # 注意：由于使用 start_new_session=True，即使不终止，子进程也会继续运行
         for task_id, process in self.processes.items():
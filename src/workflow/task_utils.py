@@ -349,7 +349,8 @@ def get_task_statistics() -> Dict[str, int]:
         此函数为未来分析脚本设计
     """
     tm = get_task_manager()
-    all_tasks = tm.get_all_tasks()
+    # 只需要状态：读取任务摘要，不完整加载每个任务
+    all_tasks = tm.get_all_task_meta()
 
     stats = {
         "total": len(all_tasks),
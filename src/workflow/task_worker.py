@@ -3,6 +3,7 @@
 用法:
     python -m workflow.task_worker <task_id>
     python -m workflow.task_worker <task_id> --resume
+    python -m workflow.task_worker --standby
 
 特性:
 - 作为独立进程运行（可脱离主CLI）
@@ -22,6 +23,7 @@ import time
 import argparse
 import os
 from pathlib import Path
+from typing import Optional, Tuple
 
 # 确保 src 在 Python 路径中（支持作为模块运行）
 # 当前文件：src/workflow/task_worker.py
@@ -36,17 +38,69 @@ if str(src_dir) not in sys.path:
 from dotenv import load_dotenv
 load_dotenv(project_root / ".env")
 
+# 待命模式下预先导入的模块（解释器启动加上这些导入是启动开销的主要部分）
+STANDBY_PRELOAD_MODULES = (
+    "workflow.task_manager",
+    "workflow.command_handler",
+    "utils.llm_provider",
+    "ace_framework.generator.generator",
+)
+
+
+def wait_for_assignment() -> Optional[Tuple[str, bool]]:
+    """待命模式：预先导入模块，然后等待 TaskScheduler 通过 stdin 分配任务
+
+    分配消息为一行 JSON：{"task_id": ..., "resume": ..., "log_file": ...}。
+    收到后把 stdout/stderr 重定向到该任务的 task.log（与直接启动时相同），
+    stdin 换成 /dev/null，此后与父进程不再有管道联系。
+
+    Returns:
+        (task_id, resume_mode)；父进程未分配任务就关闭了管道时返回 None
+    """
+    import importlib
+    for name in STANDBY_PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # 执行任务时会再次导入并报告错误
+
+    line = sys.stdin.buffer.readline()
+    if not line:
+        return None
+    assignment = json.loads(line)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    log_fd = os.open(assignment["log_file"], os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    os.dup2(log_fd, 1)
+    os.dup2(log_fd, 2)
+    os.close(log_fd)
+    null_fd = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null_fd, 0)
+    os.close(null_fd)
+
+    return assignment["task_id"], bool(assignment.get("resume"))
+
 
 def main():
     """工作进程主入口"""
     # 解析参数
     parser = argparse.ArgumentParser(description="任务工作进程")
-    parser.add_argument("task_id", help="任务ID")
+    parser.add_argument("task_id", nargs="?", help="任务ID")
     parser.add_argument("--resume", action="store_true", help="断点恢复模式")
+    parser.add_argument("--standby", action="store_true", help="待命模式（从stdin接收任务）")
     args = parser.parse_args()
 
-    task_id = args.task_id
-    resume_mode = args.resume
+    if args.standby:
+        assignment = wait_for_assignment()
+        if assignment is None:
+            return
+        task_id, resume_mode = assignment
+    elif args.task_id:
+        task_id = args.task_id
+        resume_mode = args.resume
+    else:
+        parser.error("需要 task_id 或 --standby")
 
     print("=" * 70)
     print("🔧 Task Worker Started")
@@ -76,7 +130,7 @@ def main():
             if task:
                 task.status = TaskStatus.FAILED
                 task.error = str(e)
-                tm._save_task(task)
+                tm.flush(task)
         except:
             pass
 
@@ -94,7 +148,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
         根据任务当前状态，决定从哪个步骤开始执行
     """
     import os
-    from workflow.task_manager import get_task_manager, TaskStatus
+    from workflow.task_manager import get_task_manager, TaskStatus, TERMINAL_STATUSES
 
     # 加载任务
     task_manager = get_task_manager()
@@ -184,8 +238,10 @@ def run_task_workflow(task_id: str, resume_mode: bool):
             history = config['history']
 
         # 提取需求
+        # 中间状态用 mark_dirty 延迟写入（相邻的快速切换合并为一次 task.json 写入），
+        # 等待确认/完成/失败用 flush 立即落盘（同时取消待执行的延迟写入）
         task.status = TaskStatus.EXTRACTING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         from workflow.command_handler import GenerateCommandHandler
         from workflow.task_manager import LogWriter
@@ -214,7 +270,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
             task.status = TaskStatus.FAILED
             task.error = f"需求提取失败: {str(e)}"
             task.failed_stage = "extracting"  # 记录失败阶段
-            task_manager._save_task(task)
+            task_manager.flush(task)
             log_writer.write(f"失败: {task.error}")
             log_writer.close()
             sys.exit(1)
@@ -223,7 +279,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
 
         # 进入等待确认状态
         task.status = TaskStatus.AWAITING_CONFIRM
-        task_manager._save_task(task)
+        task_manager.flush(task)
 
         print()
         print("=" * 70)
@@ -258,7 +314,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
         print("[Worker] 从生成步骤继续...")
         # 继续往下执行
 
-    elif task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]:
+    elif task.status in TERMINAL_STATUSES:
         print(f"⚠️  任务已结束（{task.status.value}），无需执行")
         sys.exit(0)
 
@@ -273,14 +329,14 @@ def run_task_workflow(task_id: str, resume_mode: bool):
         print("=" * 70)
 
         task.status = TaskStatus.RETRIEVING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         # 加载需求
         requirements = task.load_requirements()
         if not requirements:
             task.status = TaskStatus.FAILED
             task.error = "需求文件不存在或已损坏"
-            task_manager._save_task(task)
+            task_manager.flush(task)
             print(f"❌ {task.error}")
             sys.exit(1)
 
@@ -331,7 +387,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
         ensure_components_initialized()
 
         task.status = TaskStatus.GENERATING
-        task_manager._save_task(task)
+        task_manager.mark_dirty(task)
 
         # 加载需求和模板
         requirements = task.load_requirements()
@@ -376,7 +432,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
 
             # 完成
             task.status = TaskStatus.COMPLETED
-            task_manager._save_task(task)
+            task_manager.flush(task)
 
             print()
             print("=" * 70)
@@ -392,7 +448,7 @@ def run_task_workflow(task_id: str, resume_mode: bool):
             task.status = TaskStatus.FAILED
             task.error = f"生成失败: {str(e)}"
             task.failed_stage = "generating"  # 记录失败阶段
-            task_manager._save_task(task)
+            task_manager.flush(task)
 
             print(f"❌ 生成失败: {e}")
             traceback.print_exc()
@@ -0,0 +1,82 @@
+"""
+Unit tests for json_utils.
+
+Tests JSON round-tripping and atomic file writes.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils import json_utils
+
+
+class TestDumps:
+    """Test serialization options."""
+
+    def test_sort_keys_is_canonical(self):
+        first = json_utils.dumps({"b": 1, "a": {"d": [1], "c": "乙"}}, sort_keys=True)
+        second = json_utils.dumps({"a": {"c": "乙", "d": [1]}, "b": 1}, sort_keys=True)
+
+        assert first == second
+        assert json.loads(first) == {"a": {"c": "乙", "d": [1]}, "b": 1}
+
+
+class TestWriteAtomic:
+    """Test crash-safe JSON file replacement."""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "data.json"
+        obj = {"bullets": [{"id": "b1", "content": "乙酰化"}]}
+
+        json_utils.write_atomic(path, obj, indent=True)
+
+        assert json.loads(path.read_text(encoding="utf-8")) == obj
+        assert "乙酰化" in path.read_text(encoding="utf-8")
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_permissions_are_preserved(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text("{}")
+        os.chmod(path, 0o640)
+
+        json_utils.write_atomic(path, {"a": 1})
+
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text('{"old": true}')
+
+        with pytest.raises(TypeError):
+            json_utils.write_atomic(path, {"bad": object()})
+
+        assert path.read_text() == '{"old": true}'
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_bytes_without_fsync(self, tmp_path):
+        path = tmp_path / "task.json"
+        path.write_bytes(b"old")
+
+        json_utils.write_bytes_atomic(path, b'{"new": 1}', fsync=False)
+
+        assert path.read_bytes() == b'{"new": 1}'
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_open_atomic_failure_keeps_old_file(self, tmp_path):
+        path = tmp_path / "generation_result.json"
+        path.write_text('{"old": true}')
+
+        with pytest.raises(RuntimeError):
+            with json_utils.open_atomic(path, fsync=False) as f:
+                f.write(b'{"partial": ')
+                raise RuntimeError("step serialization failed")
+
+        assert path.read_text() == '{"old": true}'
+        assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,137 @@
+"""
+Unit tests for MockRAGRetriever.
+
+Tests keyword scoring and retrieval caching of the mock RAG retriever.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow import mock_rag
+from workflow.mock_rag import MockRAGRetriever
+
+
+TEMPLATES = [
+    {
+        "title": "Aspirin Synthesis",
+        "procedure_summary": "Acetylation of salicylic acid",
+        "key_points": ["Use acetic anhydride", "Basic equipment only"],
+        "difficulty": "beginner"
+    },
+    {
+        "title": "DSS Solution Treatment",
+        "procedure_summary": "Heat treatment of duplex stainless steel",
+        "key_points": ["Precise furnace control", "Water quench"],
+        "difficulty": "advanced"
+    },
+    {
+        "title": "Salicylic Acid Recrystallization",
+        "procedure_summary": "Purify aspirin by recrystallization",
+        "key_points": ["Hot ethanol", "aspirin purity check"],
+        "difficulty": "intermediate"
+    },
+]
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    """Create a retriever backed by a temporary templates file."""
+    templates_file = tmp_path / "templates.json"
+    with open(templates_file, "w", encoding="utf-8") as f:
+        json.dump(TEMPLATES, f)
+    return MockRAGRetriever(str(templates_file))
+
+
+class TestMockRAGRetriever:
+    """Test MockRAGRetriever retrieval."""
+
+    def test_retrieve_ranks_by_relevance(self, retriever):
+        results = retriever.retrieve({"target_compound": "Aspirin"}, top_k=2)
+
+        assert [t["title"] for t in results] == [
+            "Aspirin Synthesis",
+            "Salicylic Acid Recrystallization"
+        ]
+
+    def test_retrieve_returns_unmodified_templates(self, retriever):
+        results = retriever.retrieve({"objective": "heat treatment"}, top_k=1)
+
+        assert results[0] == TEMPLATES[1]
+
+    def test_repeated_query_hits_cache(self, retriever):
+        requirements = {"objective": "aspirin", "constraints": ["basic"]}
+
+        first = retriever.retrieve(requirements)
+        second = retriever.retrieve(requirements)
+
+        assert first == second
+        assert first is not second
+        assert retriever._retrieve_cached.cache_info().hits == 1
+
+    def test_cache_key_is_canonical_for_nested_values(self, retriever):
+        first = retriever._cache_key({"objective": "aspirin", "special_requirements": {"a": [1], "b": 2}})
+        second = retriever._cache_key({"special_requirements": {"b": 2, "a": [1]}, "objective": "aspirin"})
+
+        assert first == second
+        assert hash(first) == hash(second)
+
+    def test_unserializable_requirements_skip_cache(self, retriever):
+        requirements = {"objective": "aspirin", "constraints": {"basic"}}  # set 无法序列化为JSON
+
+        results = retriever.retrieve(requirements)
+
+        assert results == retriever.retrieve({"objective": "aspirin", "constraints": ["basic"]})
+        assert retriever._retrieve_cached.cache_info().currsize == 1
+
+    def test_matcher_scores_match_substring_scan(self, retriever):
+        pytest.importorskip("ahocorasick")
+
+        keywords = ["aspirin", "aspirin", "acid", "", "steel"]
+        with_matcher = [
+            retriever._calculate_relevance(
+                t, f, keywords, mock_rag._KeywordMatcher(keywords)
+            )
+            for t, f in zip(retriever.templates, retriever._search_fields)
+        ]
+        without_matcher = [
+            retriever._calculate_relevance(t, f, keywords)
+            for t, f in zip(retriever.templates, retriever._search_fields)
+        ]
+
+        assert with_matcher == without_matcher
+
+
+class TestBinaryCache:
+    """Test the msgpack template cache."""
+
+    def test_cache_written_and_reused(self, retriever):
+        pytest.importorskip("msgpack")
+        cache_file = retriever.templates_file.with_suffix(".msgpack")
+
+        assert cache_file.exists()
+        assert retriever._load_binary_cache() == TEMPLATES
+        assert MockRAGRetriever(str(retriever.templates_file)).templates == TEMPLATES
+
+    def test_stale_cache_is_ignored(self, retriever):
+        pytest.importorskip("msgpack")
+        cache_file = retriever.templates_file.with_suffix(".msgpack")
+        json_stat = retriever.templates_file.stat()
+
+        # 缓存比JSON旧
+        os.utime(cache_file, ns=(json_stat.st_atime_ns, json_stat.st_mtime_ns - 10**9))
+
+        assert retriever._load_binary_cache() is None
+
+    def test_corrupted_cache_falls_back_to_json(self, retriever):
+        pytest.importorskip("msgpack")
+        retriever.templates_file.with_suffix(".msgpack").write_bytes(b"\xc1garbage")
+
+        assert MockRAGRetriever(str(retriever.templates_file)).templates == TEMPLATES
+
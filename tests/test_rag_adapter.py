@@ -0,0 +1,109 @@
+"""
+Unit tests for RAGAdapter.
+
+Tests query building, format conversion and query caching with a fake
+LargeRAG backend (no index or API key required).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow.rag_adapter import RAGAdapter
+
+
+class FakeRAG:
+    """Stand-in for LargeRAG that counts retrieval calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_similar_docs(self, query_text, top_k=5):
+        self.calls += 1
+        return [{"text": f"{query_text} document", "score": 0.9}][:top_k]
+
+
+@pytest.fixture
+def adapter():
+    """Create an adapter backed by FakeRAG, without the semantic cache."""
+    adapter = RAGAdapter(semantic_cache_path=None)
+    adapter._rag = FakeRAG()
+    adapter._initialized = True
+    return adapter
+
+
+class TestQueryCache:
+    """Test the in-process exact-match query cache."""
+
+    def test_repeated_query_skips_retrieval(self, adapter):
+        requirements = {"objective": "合成阿司匹林"}
+
+        first = adapter.retrieve_templates(requirements)
+        second = adapter.retrieve_templates(requirements)
+
+        assert first == second
+        assert first is not second
+        assert adapter._rag.calls == 1
+
+    def test_top_k_is_part_of_key(self, adapter):
+        requirements = {"objective": "合成阿司匹林"}
+
+        adapter.retrieve_templates(requirements, top_k=5)
+        adapter.retrieve_templates(requirements, top_k=3)
+
+        assert adapter._rag.calls == 2
+
+    def test_cache_evicts_least_recently_used(self, adapter, monkeypatch):
+        monkeypatch.setattr(RAGAdapter, "EXACT_CACHE_SIZE", 2)
+
+        adapter.retrieve_templates({"objective": "a"})
+        adapter.retrieve_templates({"objective": "b"})
+        adapter.retrieve_templates({"objective": "a"})  # a 变为最近使用
+        adapter.retrieve_templates({"objective": "c"})  # 淘汰 b
+
+        assert [key[0] for key in adapter._exact_cache] == ["a", "c"]
+
+
+class TestBuildQuery:
+    """Test query string construction."""
+
+    def test_fields_in_priority_order(self, adapter):
+        query = adapter._build_query({
+            "constraints": ["常压", "室温", "无水", "避光"],
+            "target_compound": "阿司匹林",
+            "objective": "合成"
+        })
+
+        assert query == "合成 阿司匹林 常压 室温 无水"
+
+    def test_empty_fields_are_skipped(self, adapter):
+        assert adapter._build_query({"objective": "", "target_compound": "DSS"}) == "DSS"
+
+    def test_empty_requirements_use_default(self, adapter):
+        assert adapter._build_query({"constraints": []}) == "实验方案"
+
+
+class TestConvertToTemplateFormat:
+    """Test LargeRAG output conversion."""
+
+    def test_short_text_uses_score_title(self, adapter):
+        templates = adapter._convert_to_template_format([
+            {"text": "短文本", "score": 0.85, "metadata": {"doc_hash": "x"}}
+        ])
+
+        assert templates == [
+            {"title": "相关文献 1 (相关度: 0.850)", "content": "短文本", "score": 0.85}
+        ]
+
+    def test_long_text_uses_preview_title(self, adapter):
+        text = "第一行\n" + "内容" * 40
+        templates = adapter._convert_to_template_format([{"score": 0.1}, {"text": text}])
+
+        assert templates[0]["title"] == "相关文献 1 (相关度: 0.100)"
+        assert templates[0]["content"] == ""
+        assert templates[1]["title"] == f"文献 2: {text[:50].replace(chr(10), ' ')}..."
+        assert templates[1]["score"] == 0.0
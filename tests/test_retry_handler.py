@@ -0,0 +1,389 @@
+"""
+Unit tests for RetryHandler.
+
+Tests error classification and retry planning of the workflow retry handler.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow import retry_handler
+from workflow.retry_handler import RetryHandler, NON_RETRYABLE_ERRORS
+from workflow.task_manager import GenerationTask, RetryRecord, TaskStatus
+
+
+class FakeTaskManager:
+    """Records saved tasks instead of writing task.json."""
+
+    def __init__(self):
+        self.saved = []
+
+    def _save_task(self, task):
+        self.saved.append(task.status)
+
+
+@pytest.fixture
+def handler():
+    """Create a handler that never touches the TaskManager singleton."""
+    return RetryHandler(task_manager=object())
+
+
+def make_task(tmp_path, status: TaskStatus, failed_stage=None) -> GenerationTask:
+    """Create an in-memory task in a temporary directory."""
+    task = GenerationTask(
+        task_id="t0001",
+        session_id="session",
+        task_dir=tmp_path,
+        log_file=tmp_path / "task.log"
+    )
+    task.status = status
+    task.failed_stage = failed_stage
+    return task
+
+
+class TestIsRetryableError:
+    """Test non-retryable error classification."""
+
+    @pytest.mark.parametrize("pattern", NON_RETRYABLE_ERRORS)
+    def test_known_patterns_are_not_retryable(self, handler, pattern):
+        assert not handler._is_retryable_error(f"生成失败: {pattern} (详见日志)")
+
+    def test_other_errors_are_retryable(self, handler):
+        assert handler._is_retryable_error("TimeoutError: LLM 调用超时")
+
+    def test_patterns_are_matched_literally(self, handler):
+        # "config.json" 中的 "." 不应匹配任意字符
+        assert handler._is_retryable_error("读取 config_json 失败")
+
+
+class TestPrepareRetry:
+    """Test retry planning per task status."""
+
+    def test_failed_resumes_from_failed_stage(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="generating")
+
+        info = handler.prepare_retry(task)
+
+        assert info["strategy"] == "partial"
+        assert info["resume_from_status"] == TaskStatus.RETRIEVING
+        assert info["files_to_keep"] == ["requirements.json", "templates.json"]
+        assert info["files_to_remove"] == ["plan.json", "generation_result.json"]
+
+    def test_stage_alias_is_resolved(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED)
+
+        info = handler.prepare_retry(task, force_stage="feedback")
+
+        assert info["resume_from_stage"] == "evaluating"
+        assert info["resume_from_status"] == TaskStatus.COMPLETED
+
+    def test_stuck_task_detects_stage_from_status(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.RETRIEVING)
+
+        info = handler.prepare_retry(task)
+
+        assert info["resume_from_stage"] == "retrieving"
+        assert info["resume_from_status"] == TaskStatus.AWAITING_CONFIRM
+
+    def test_regenerate_discards_feedback_outputs(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.COMPLETED)
+
+        info = handler.prepare_retry(task, keep_playbook=False)
+
+        assert info["strategy"] == "regenerate"
+        assert info["files_to_remove"] == [
+            "plan.json", "generation_result.json",
+            "feedback.json", "reflection.json", "curation.json"
+        ]
+
+    def test_keep_playbook_keeps_curation(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.CANCELLED, failed_stage="curating")
+
+        info = handler.prepare_retry(task, keep_playbook=True)
+
+        assert info["strategy"] == "resume_cancelled"
+        assert info["files_to_remove"] == []
+
+    def test_discard_playbook_rolls_back_after_feedback(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.COMPLETED)
+        (tmp_path / "curation.json").write_text("{}")
+
+        assert handler.prepare_retry(task, keep_playbook=False)["playbook_action"] == "rollback"
+        assert handler.prepare_retry(
+            task, keep_playbook=False, entries={}
+        )["playbook_action"] == "none"
+
+        task.feedback_status = "completed"
+        assert handler.prepare_retry(
+            task, keep_playbook=False, entries={}
+        )["playbook_action"] == "rollback"
+
+    def test_plans_do_not_share_mutable_lists(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="extracting")
+
+        handler.prepare_retry(task)["files_to_remove"].append("extra.json")
+
+        assert handler.prepare_retry(task)["files_to_remove"] == ["requirements.json"]
+
+    def test_unknown_stage_is_rejected_by_can_retry(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.COMPLETED)
+
+        can_retry, reason = handler.can_retry(task, force=True, force_stage="typo")
+
+        assert not can_retry
+        assert "typo" in reason
+
+    def test_unknown_stage_raises(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="unknown")
+
+        with pytest.raises(ValueError):
+            handler.prepare_retry(task)
+
+
+class TestValidateFiles:
+    """Test kept-file validation."""
+
+    def write(self, task, filename, data):
+        (task.task_dir / filename).write_text(json.dumps(data), encoding="utf-8")
+
+    def test_valid_files_pass(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED)
+        self.write(task, "requirements.json", {"objective": "合成阿司匹林"})
+        self.write(task, "templates.json", [])
+        self.write(task, "plan.json", {"title": "方案"})
+        self.write(task, "generation_result.json", {"plan": {"title": "方案"}, "trajectory": []})
+
+        assert handler.validate_files(task, [
+            "requirements.json", "templates.json", "plan.json", "generation_result.json"
+        ]) == []
+
+    def test_missing_and_malformed_files_are_corrupted(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED)
+        self.write(task, "requirements.json", {"constraints": []})
+        self.write(task, "templates.json", {"not": "a list"})
+        (task.task_dir / "feedback.json").write_text("{broken", encoding="utf-8")
+
+        assert handler.validate_files(task, [
+            "requirements.json", "templates.json", "plan.json", "feedback.json"
+        ]) == ["requirements.json", "templates.json", "plan.json", "feedback.json"]
+
+    def test_clean_files_uses_snapshot(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED)
+        self.write(task, "plan.json", {"title": "方案"})
+        self.write(task, "feedback.json", {})
+        entries = handler._snapshot_dir(task)
+
+        handler.clean_files(task, ["plan.json", "feedback.json", "missing.json"], entries)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == []
+
+    def test_large_generation_result_is_streamed(self, handler, tmp_path, monkeypatch):
+        pytest.importorskip("ijson")
+        monkeypatch.setattr(retry_handler, "STREAM_PARSE_THRESHOLD", 0)
+        task = make_task(tmp_path, TaskStatus.FAILED)
+        self.write(task, "generation_result.json", {"trajectory": [{"step": 1}], "plan": {"title": "方案"}})
+
+        assert handler.validate_files(task, ["generation_result.json"]) == []
+
+        self.write(task, "generation_result.json", {"trajectory": [], "plan": None})
+        assert handler.validate_files(task, ["generation_result.json"]) == ["generation_result.json"]
+
+
+class TestRollbackPlaybook:
+    """Test discarding a task's playbook changes."""
+
+    @pytest.fixture
+    def playbook_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / "data" / "playbooks" / "chemistry_playbook.json"
+        path.parent.mkdir(parents=True)
+        path.write_text(json.dumps({"bullets": [
+            {"id": "b1", "content": "kept"},
+            {"id": "b2", "content": "new text", "metadata": {"embedding": [0.1]}},
+            {"id": "b3", "content": "added by task"},
+        ]}), encoding="utf-8")
+        return path
+
+    def test_operations_are_reverted(self, handler, tmp_path, playbook_file):
+        task_dir = tmp_path / "task"
+        task_dir.mkdir()
+        task = make_task(task_dir, TaskStatus.COMPLETED)
+        (task_dir / "curation.json").write_text(json.dumps({"delta_operations": [
+            {"operation": "ADD", "bullet_id": None, "new_bullet": {"id": "b3"}},
+            {"operation": "UPDATE", "bullet_id": "b2", "old_content": "old text"},
+            {"operation": "REMOVE", "removed_bullet": {"id": "b0", "content": "removed"}},
+            {"operation": "REMOVE", "removed_bullet": {"id": "b1", "content": "duplicate"}},
+        ]}), encoding="utf-8")
+
+        assert handler._rollback_playbook(task) is True
+
+        bullets = json.loads(playbook_file.read_text(encoding="utf-8"))["bullets"]
+        assert bullets == [
+            {"id": "b1", "content": "kept"},
+            {"id": "b2", "content": "old text", "metadata": {"embedding": None}},
+            {"id": "b0", "content": "removed"},
+        ]
+        assert list(playbook_file.parent.iterdir()) == [playbook_file]
+
+    def test_missing_curation_is_a_no_op(self, handler, tmp_path, playbook_file):
+        before = playbook_file.read_bytes()
+        task_dir = tmp_path / "task"
+        task_dir.mkdir()
+
+        assert handler._rollback_playbook(make_task(task_dir, TaskStatus.COMPLETED)) is True
+        assert playbook_file.read_bytes() == before
+
+    def test_no_operations_skips_playbook(self, handler, tmp_path, playbook_file):
+        playbook_file.write_text("{broken", encoding="utf-8")  # 不应被读取
+        task_dir = tmp_path / "task"
+        task_dir.mkdir()
+        (task_dir / "curation.json").write_text(json.dumps({"delta_operations": []}))
+
+        assert handler._rollback_playbook(make_task(task_dir, TaskStatus.COMPLETED)) is True
+
+    def test_corrupted_playbook_is_left_untouched(self, handler, tmp_path, playbook_file, capsys):
+        playbook_file.write_text("{broken", encoding="utf-8")
+        task_dir = tmp_path / "task"
+        task_dir.mkdir()
+        (task_dir / "curation.json").write_text(json.dumps({"delta_operations": [
+            {"operation": "ADD", "new_bullet": {"id": "b3"}},
+        ]}), encoding="utf-8")
+
+        assert handler._rollback_playbook(make_task(task_dir, TaskStatus.COMPLETED)) is False
+        assert playbook_file.read_text(encoding="utf-8") == "{broken"
+        assert "Traceback" not in capsys.readouterr().err
+
+
+class TestBackoff:
+    """Test exponential backoff with full jitter."""
+
+    def test_delay_is_bounded(self):
+        for attempt in range(12):
+            delay = RetryHandler._compute_backoff(attempt)
+            assert 0 <= delay <= min(60.0, 2 ** attempt)
+
+    def test_seeded_delay_is_stable(self):
+        assert RetryHandler._compute_backoff(5, seed="t0001:5") == RetryHandler._compute_backoff(5, seed="t0001:5")
+
+    def test_elapsed_time_is_deducted(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.FAILED)
+        task.retry_count = 2
+        task.retry_history.append(RetryRecord.from_dict({
+            "timestamp": (datetime.now() - timedelta(minutes=5)).isoformat()
+        }))
+
+        delay, remaining = handler._backoff_remaining(task)
+
+        assert 0 <= delay <= 4.0
+        assert remaining < 0
+
+    def test_recent_retry_is_refused_without_sleeping(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(retry_handler.time, "sleep", lambda s: pytest.fail("retry must not sleep"))
+        monkeypatch.setattr(RetryHandler, "_compute_backoff", staticmethod(lambda attempt, seed=None: 30.0))
+        manager = FakeTaskManager()
+        handler = RetryHandler(task_manager=manager)
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="generating")
+        task.retry_history.append(RetryRecord.from_dict({"timestamp": datetime.now().isoformat()}))
+
+        assert handler.execute_retry(task) is False
+
+        assert "30 秒后可重试" in capsys.readouterr().out
+        assert task.status == TaskStatus.FAILED
+        assert manager.saved == []
+
+    def test_force_skips_backoff(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(RetryHandler, "_compute_backoff", staticmethod(lambda attempt, seed=None: 30.0))
+        manager = FakeTaskManager()
+        handler = RetryHandler(task_manager=manager)
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="generating")
+        task.retry_history.append(RetryRecord.from_dict({"timestamp": datetime.now().isoformat()}))
+
+        assert handler.execute_retry(task, force=True) is True
+
+        assert manager.saved == [TaskStatus.RETRIEVING]
+        assert task.retry_history[-1].backoff_delay == 0.0
+
+
+class TestStuckDetection:
+    """Test PID liveness checks for tasks left in intermediate states."""
+
+    def test_live_process_blocks_retry(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.GENERATING)
+        (tmp_path / "process.pid").write_text(str(os.getpid()))
+        (tmp_path / "task.json").write_text("{}")
+
+        can_retry, reason = handler.can_retry(task)
+
+        assert not can_retry
+        assert "仍在运行" in reason
+        assert handler.can_retry(task, force=True)[0]
+
+    def test_exited_process_allows_retry(self, handler, tmp_path):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        task = make_task(tmp_path, TaskStatus.GENERATING)
+        (tmp_path / "process.pid").write_text(str(proc.pid))
+
+        assert handler.can_retry(task)[0]
+
+    def test_live_but_stale_process_is_stuck(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.GENERATING)
+        (tmp_path / "process.pid").write_text(str(os.getpid()))
+        task_json = tmp_path / "task.json"
+        task_json.write_text("{}")
+        old = task_json.stat().st_mtime - 2 * 3600
+        os.utime(task_json, (old, old))
+
+        assert handler.can_retry(task)[0]
+
+    def test_missing_pid_file_allows_retry(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.EXTRACTING)
+
+        assert handler.can_retry(task)[0]
+
+    def test_unsupported_status_is_rejected(self, handler, tmp_path):
+        task = make_task(tmp_path, TaskStatus.AWAITING_CONFIRM)
+
+        can_retry, reason = handler.can_retry(task)
+
+        assert not can_retry
+        assert "awaiting_confirm" in reason
+
+
+class TestExecuteRetry:
+    """Test the full retry preparation."""
+
+    def test_failed_task_is_reset_and_recorded(self, tmp_path, monkeypatch, capsys):
+        manager = FakeTaskManager()
+        handler = RetryHandler(task_manager=manager)
+        task = make_task(tmp_path, TaskStatus.FAILED, failed_stage="generating")
+        task.error = "TimeoutError"
+        (tmp_path / "requirements.json").write_text(json.dumps({"objective": "合成"}))
+        (tmp_path / "templates.json").write_text("[]")
+        (tmp_path / "plan.json").write_text(json.dumps({"title": "旧方案"}))
+
+        assert handler.execute_retry(task) is True
+
+        assert task.status == TaskStatus.RETRIEVING
+        assert task.error is None and task.failed_stage is None
+        assert task.retry_count == 1
+        assert not (tmp_path / "plan.json").exists()
+        assert manager.saved == [TaskStatus.RETRIEVING]
+
+        record = task.retry_history[-1]
+        assert record.operation == "retry"
+        assert record.previous_error == "TimeoutError"
+        assert record.previous_stage == "generating"
+        assert record.strategy == "partial"
+
+        out = capsys.readouterr().out
+        assert out.index("清理文件") < out.index("已删除: plan.json") < out.index("重试准备完成")
@@ -0,0 +1,87 @@
+"""
+Unit tests for SemanticCache.
+
+Tests similarity lookup and expiry of the RAG semantic cache.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow.semantic_cache import SemanticCache
+
+
+VECTORS = {
+    "aspirin synthesis": [1.0, 0.0, 0.0],
+    "synthesis of aspirin": [0.98, 0.2, 0.0],
+    "steel heat treatment": [0.0, 0.0, 1.0],
+}
+
+TEMPLATES = [{"title": "文献 1", "content": "乙酰水杨酸合成", "score": 0.9}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a cache with a deterministic embedding function."""
+    return SemanticCache(
+        path=str(tmp_path / "cache" / "semcache.sqlite"),
+        embed_fn=lambda query: VECTORS[query]
+    )
+
+
+class TestSemanticCache:
+    """Test SemanticCache lookup."""
+
+    def test_similar_query_hits(self, cache):
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+
+        assert cache.get("synthesis of aspirin", 5) == TEMPLATES
+
+    def test_dissimilar_query_misses(self, cache):
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+
+        assert cache.get("steel heat treatment", 5) is None
+
+    def test_top_k_must_match(self, cache):
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+
+        assert cache.get("aspirin synthesis", 3) is None
+
+    def test_expired_entries_are_dropped(self, cache):
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+        cache.ttl = -1
+
+        assert cache.get("aspirin synthesis", 5) is None
+
+    def test_entries_persist_across_instances(self, cache):
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+
+        reopened = SemanticCache(path=str(cache.path), embed_fn=cache.embed_fn)
+        assert reopened.get("aspirin synthesis", 5) == TEMPLATES
+
+    def test_quantization_preserves_similarity(self):
+        rng = np.random.default_rng(0)
+        vector = rng.standard_normal(1024).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+
+        q, scale = SemanticCache._quantize(vector)
+
+        assert q.dtype == np.int8
+        assert abs(float(q.astype(np.float32) @ vector) * scale - 1.0) < 1e-3
+
+    def test_old_schema_is_rebuilt(self, tmp_path):
+        path = tmp_path / "old.sqlite"
+        with sqlite3.connect(str(path)) as conn:
+            conn.execute("CREATE TABLE rag_cache (query TEXT, embedding BLOB)")
+            conn.execute("INSERT INTO rag_cache VALUES ('q', x'00')")
+
+        cache = SemanticCache(path=str(path), embed_fn=lambda query: VECTORS[query])
+        cache.put("aspirin synthesis", 5, TEMPLATES)
+
+        assert cache.get("aspirin synthesis", 5) == TEMPLATES
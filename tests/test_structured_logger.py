@@ -0,0 +1,94 @@
+"""
+Unit tests for StructuredLogger.
+
+Tests the cached append-only log descriptors.
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.logs_manager import LogsManager
+from utils.structured_logger import StructuredLogger
+
+
+@pytest.fixture
+def logger(tmp_path):
+    """Create a generator logger writing only the global component log."""
+    logger = StructuredLogger("generator", LogsManager(str(tmp_path / "logs")))
+    yield logger
+    logger.close()
+
+
+def read_events(path: Path) -> list:
+    """Read the event types of a JSONL log."""
+    return [json.loads(line)["event_type"] for line in path.read_text().splitlines()]
+
+
+class TestDescriptorCache:
+    """Test descriptor reuse and eviction."""
+
+    def test_evicts_least_recently_used(self, logger, tmp_path):
+        paths = [tmp_path / f"run{i}.jsonl" for i in range(9)]
+        for path in paths[:8]:
+            logger._write_log_entry(path, {"event_type": path.stem})
+        logger._write_log_entry(paths[0], {"event_type": "again"})  # run0 变为最近使用
+
+        logger._write_log_entry(paths[8], {"event_type": "run8"})
+
+        assert list(logger._fds) == paths[2:8] + [paths[0], paths[8]]
+        assert read_events(paths[0]) == ["run0", "again"]
+
+    def test_concurrent_writers_keep_lines_in_their_files(self, logger, tmp_path):
+        paths = [tmp_path / f"run{i}.jsonl" for i in range(12)]
+
+        def write(path):
+            for _ in range(50):
+                logger._write_log_entry(path, {"event_type": path.stem})
+
+        threads = [threading.Thread(target=write, args=(path,)) for path in paths]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for path in paths:
+            assert read_events(path) == [path.stem] * 50
+
+    def test_stale_descriptor_is_reopened(self, logger):
+        logger.info("first", {})
+        os.close(logger._fds[logger.global_log_path])
+
+        logger.info("second", {})
+
+        assert read_events(logger.global_log_path) == ["first", "second"]
+
+
+class TestMissingDirectories:
+    """Test recovery when log directories are removed at runtime."""
+
+    def test_removed_components_dir_is_recreated(self, logger):
+        shutil.rmtree(logger.global_log_path.parent)
+
+        logger.info("after_cleanup", {})
+
+        assert read_events(logger.global_log_path) == ["after_cleanup"]
+
+    def test_removed_run_dir_is_recreated(self, logger):
+        run_id = logger.logs_manager.start_run()
+        logger.info("first", {})
+        run_log = logger.logs_manager.get_component_log_path("generator", run_id)
+        logger.close()
+        shutil.rmtree(run_log.parent)
+
+        logger.info("second", {})
+
+        assert read_events(run_log) == ["second"]
@@ -0,0 +1,814 @@
+"""
+Unit tests for TaskManager persistence.
+
+Tests task.json persistence helpers of the workflow task manager.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow import task_manager as task_manager_module
+from workflow.task_manager import TaskManager, GenerationTask, LogWriter, RetryRecord, TaskMeta, TaskStatus
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Create a fresh TaskManager rooted in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TaskManager, "_instance", None)
+    monkeypatch.setattr(task_manager_module, "_task_manager", None)
+    return TaskManager()
+
+
+def make_task(manager: TaskManager, task_id: str = "t0001") -> GenerationTask:
+    """Create a task directory and an in-memory task."""
+    task_dir = manager.tasks_dir / task_id
+    task_dir.mkdir()
+    return GenerationTask(
+        task_id=task_id,
+        session_id="session",
+        task_dir=task_dir,
+        log_file=task_dir / "task.log"
+    )
+
+
+def read_status(task: GenerationTask) -> str:
+    with open(task.task_dir / "task.json", "r", encoding="utf-8") as f:
+        return json.load(f)["status"]
+
+
+class TestDeferredSave:
+    """Test mark_dirty/flush persistence."""
+
+    def test_flush_writes_immediately(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+
+        assert read_status(task) == "pending"
+
+    def test_mark_dirty_coalesces_writes(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+
+        task.status = TaskStatus.EXTRACTING
+        manager.mark_dirty(task)
+        task.status = TaskStatus.RETRIEVING
+        manager.mark_dirty(task)
+
+        # Not written yet
+        assert read_status(task) == "pending"
+
+        time.sleep(manager.save_delay + 0.2)
+        assert read_status(task) == "retrieving"
+
+    def test_flush_cancels_pending_write(self, manager):
+        task = make_task(manager)
+
+        task.status = TaskStatus.GENERATING
+        manager.mark_dirty(task)
+        task.status = TaskStatus.COMPLETED
+        manager.flush(task)
+
+        assert read_status(task) == "completed"
+        assert task.task_id not in manager._dirty_timers
+
+
+class TestLoadGenerationResult:
+    """Test eager and streaming generation_result.json loading."""
+
+    RESULT = {
+        "plan": {"title": "阿司匹林合成", "objective": "合成乙酰水杨酸"},
+        "trajectory": [
+            {"step_number": 1, "thought": "分析需求"},
+            {"step_number": 2, "thought": "选择模板", "score": 0.5}
+        ],
+        "relevant_bullets": ["mat-00001", "saf-00002"],
+        "generation_metadata": {"model": "qwen-max", "duration": 1.5}
+    }
+
+    def write_result(self, manager):
+        task = make_task(manager)
+        with open(task.generation_result_file, "w", encoding="utf-8") as f:
+            json.dump(self.RESULT, f, ensure_ascii=False)
+        return task
+
+    def test_missing_file_returns_none(self, manager):
+        assert make_task(manager).load_generation_result() is None
+
+    def test_trajectory_factory_is_applied(self, manager):
+        task = self.write_result(manager)
+
+        result = task.load_generation_result(trajectory_factory=lambda s: s["step_number"])
+
+        assert result["trajectory"] == [1, 2]
+        assert result["plan"] == self.RESULT["plan"]
+
+    def test_streaming_matches_eager(self, manager, monkeypatch):
+        pytest.importorskip("ijson")
+        task = self.write_result(manager)
+        eager = task.load_generation_result()
+
+        monkeypatch.setattr(task_manager_module, "STREAM_PARSE_THRESHOLD", 0)
+        streamed = task.load_generation_result()
+
+        assert streamed == eager == self.RESULT
+
+    def test_saved_result_round_trips(self, manager, monkeypatch):
+        class Dumpable:
+            def __init__(self, data):
+                self.data = data
+
+            def model_dump(self, mode="python"):
+                return self.data
+
+        generation_result = SimpleNamespace(
+            generated_plan=Dumpable(self.RESULT["plan"]),
+            trajectory=[Dumpable(step) for step in self.RESULT["trajectory"]],
+            relevant_bullets=self.RESULT["relevant_bullets"],
+            generation_metadata=self.RESULT["generation_metadata"]
+        )
+        task = make_task(manager)
+
+        task.save_generation_result(generation_result)
+
+        text = task.generation_result_file.read_text(encoding="utf-8")
+        assert json.loads(text) == self.RESULT
+        assert task.load_generation_result() == self.RESULT
+        if task_manager_module.IJSON_AVAILABLE:
+            monkeypatch.setattr(task_manager_module, "STREAM_PARSE_THRESHOLD", 0)
+            assert task.load_generation_result() == self.RESULT
+
+    def test_empty_trajectory_is_valid_json(self, manager):
+        generation_result = SimpleNamespace(
+            generated_plan=SimpleNamespace(model_dump=lambda mode: {}),
+            trajectory=[],
+            relevant_bullets=[],
+            generation_metadata={}
+        )
+        task = make_task(manager)
+
+        task.save_generation_result(generation_result)
+
+        assert json.loads(task.generation_result_file.read_text())["trajectory"] == []
+
+
+class TestRetryHistory:
+    """Test retry_history persistence."""
+
+    RECORD = {
+        "timestamp": "2025-01-01T00:00:00",
+        "operation": "regenerate",
+        "previous_status": "completed",
+        "retry_count": 0,
+        "previous_error": None,
+        "previous_stage": None,
+        "strategy": "regenerate",
+        "playbook_action": "rollback"
+    }
+
+    def test_records_are_appended_to_jsonl(self, manager):
+        task = make_task(manager)
+        record = RetryRecord.from_dict(dict(self.RECORD, backoff_delay=0.5))
+
+        task.append_retry_record(record)
+        task.append_retry_record(record)
+
+        assert len(task.retry_history_file.read_bytes().splitlines()) == 2
+        assert task.to_dict()["retry_history"] == []
+
+        restored = GenerationTask.from_dict(task.to_dict(), task.task_dir)
+        assert list(restored.retry_history) == [record, record]
+
+    def test_legacy_records_stay_in_task_json(self, manager):
+        task = make_task(manager)
+        data = task.to_dict()
+        data["retry_history"] = [self.RECORD]
+
+        restored = GenerationTask.from_dict(data, task.task_dir)
+        restored.append_retry_record(RetryRecord.from_dict(self.RECORD))
+
+        assert restored.retry_history[0].backoff_delay == 0.0
+        assert restored.to_dict()["retry_history"] == [dict(self.RECORD, backoff_delay=0.0)]
+        assert len(GenerationTask.from_dict(restored.to_dict(), task.task_dir).retry_history) == 2
+
+    def test_truncated_line_is_skipped(self, manager):
+        task = make_task(manager)
+        task.append_retry_record(RetryRecord.from_dict(self.RECORD))
+        with open(task.retry_history_file, "ab") as f:
+            f.write(b'{"timestamp": "2025-')
+
+        restored = GenerationTask.from_dict(task.to_dict(), task.task_dir)
+
+        assert len(restored.retry_history) == 1
+
+    def test_in_memory_history_is_bounded(self, manager, monkeypatch):
+        monkeypatch.setattr(task_manager_module, "RETRY_HISTORY_LIMIT", 3)
+        task = make_task(manager)
+        for i in range(5):
+            task.append_retry_record(RetryRecord.from_dict(dict(self.RECORD, retry_count=i)))
+
+        restored = GenerationTask.from_dict(task.to_dict(), task.task_dir)
+
+        assert [r.retry_count for r in restored.retry_history] == [2, 3, 4]
+        assert len(task.retry_history_file.read_bytes().splitlines()) == 5
+
+
+class TestTaskFile:
+    """Test task.json serialization."""
+
+    def test_saved_file_is_plain_json(self, manager):
+        task = make_task(manager)
+        task.metadata = {"objective": "合成阿司匹林"}
+        manager.flush(task)
+
+        text = (task.task_dir / "task.json").read_text(encoding="utf-8")
+        assert json.loads(text) == task.to_dict()
+        assert "合成阿司匹林" in text
+
+    def test_stdlib_written_file_is_loaded(self, manager):
+        task = make_task(manager)
+        task.status = TaskStatus.FAILED
+        with open(task.task_dir / "task.json", "w", encoding="utf-8") as f:
+            json.dump(task.to_dict(), f, indent=2, ensure_ascii=False)
+
+        loaded = manager.get_task(task.task_id)
+
+        assert loaded.status == TaskStatus.FAILED
+        assert loaded.to_dict() == task.to_dict()
+
+
+class TestGetTaskCache:
+    """Test get_task cache invalidation."""
+
+    def test_unchanged_file_returns_cached_task(self, manager, monkeypatch):
+        task = make_task(manager)
+        manager.flush(task)
+        first = manager.get_task(task.task_id)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("task.json should not be parsed")
+
+        monkeypatch.setattr(task_manager_module.json_utils, "loads", fail)
+        assert manager.get_task(task.task_id) is first
+
+    def test_own_save_keeps_cached_task(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        cached = manager.get_task(task.task_id)
+
+        cached.status = TaskStatus.COMPLETED
+        manager.flush(cached)
+
+        assert manager.get_task(task.task_id) is cached
+
+    def test_external_write_reloads(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        cached = manager.get_task(task.task_id)
+
+        data = task.to_dict()
+        data["status"] = "failed"
+        (task.task_dir / "task.json").write_text(json.dumps(data), encoding="utf-8")
+
+        reloaded = manager.get_task(task.task_id)
+        assert reloaded is not cached
+        assert reloaded.status == TaskStatus.FAILED
+
+    def test_reload_does_not_mutate_snapshot(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        cached = manager.get_task(task.task_id)
+        snapshot = manager.tasks
+
+        data = task.to_dict()
+        data["status"] = "failed"
+        (task.task_dir / "task.json").write_text(json.dumps(data), encoding="utf-8")
+        reloaded = manager.get_task(task.task_id)
+
+        # 写时复制：读取方持有的旧字典保持不变
+        assert snapshot == {task.task_id: cached}
+        assert manager.tasks == {task.task_id: reloaded}
+
+    def test_missing_task_returns_none(self, manager):
+        assert manager.get_task("missing") is None
+        make_task(manager, "empty")
+        assert manager.get_task("empty") is None
+
+
+class TestGetAllTasks:
+    """Test scanning the tasks directory."""
+
+    def test_scan_skips_files_and_incomplete_dirs(self, manager):
+        for task_id in ("t0001", "t0002"):
+            manager.flush(make_task(manager, task_id))
+        make_task(manager, "t0003")  # 尚未写入 task.json
+        (manager.tasks_dir / "stray.txt").write_text("x")
+
+        tasks = manager.get_all_tasks()
+
+        assert sorted(t.task_id for t in tasks) == ["t0001", "t0002"]
+
+    def test_scan_reuses_cached_tasks(self, manager):
+        manager.flush(make_task(manager))
+        first = manager.get_all_tasks()
+
+        assert manager.get_all_tasks()[0] is first[0]
+
+    def test_reloads_replace_cache_once(self, manager, monkeypatch):
+        for task_id in ("t0001", "t0002", "t0003"):
+            manager.flush(make_task(manager, task_id))
+        manager.tasks = {}
+        batches = []
+        cache_tasks = manager._cache_tasks
+        monkeypatch.setattr(manager, "_cache_tasks", lambda tasks, stale=None: (
+            batches.append(len(tasks)), cache_tasks(tasks, stale)))
+
+        tasks = manager.get_all_tasks()
+
+        assert batches == [3]
+        assert sorted(manager.tasks) == ["t0001", "t0002", "t0003"]
+        assert all(manager.tasks[t.task_id] is t for t in tasks)
+
+    def test_unreadable_task_is_evicted(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        manager.get_all_tasks()
+        (task.task_dir / "task.json").write_text("{broken")
+
+        assert manager.get_all_tasks() == []
+        assert task.task_id not in manager.tasks
+
+
+class TestSaveTask:
+    """Test atomic, change-only task.json writes."""
+
+    def test_identical_save_is_skipped(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        task_file = task.task_dir / "task.json"
+        inode = task_file.stat().st_ino
+
+        manager.flush(task)
+
+        assert task_file.stat().st_ino == inode
+
+    def test_changed_task_is_replaced(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+
+        task.status = TaskStatus.COMPLETED
+        manager.flush(task)
+
+        assert read_status(task) == "completed"
+        assert sorted(p.name for p in task.task_dir.iterdir()) == ["task.json"]
+
+    def test_external_change_is_overwritten(self, manager):
+        task = make_task(manager)
+        manager.flush(task)
+        (task.task_dir / "task.json").write_text('{"status": "failed"}', encoding="utf-8")
+
+        manager.flush(task)
+
+        assert read_status(task) == "pending"
+
+
+    def test_stale_timer_save_does_not_overwrite_flush(self, manager, monkeypatch):
+        task = make_task(manager)
+        task.status = TaskStatus.GENERATING
+        entered = threading.Event()
+        release = threading.Event()
+        original_dumps = task_manager_module.json_utils.dumps
+
+        def slow_first_dumps(obj, indent=False):
+            if not entered.is_set():
+                entered.set()
+                assert release.wait(timeout=5)  # 定时器线程停在序列化之后
+            return original_dumps(obj, indent=indent)
+
+        monkeypatch.setattr(task_manager_module.json_utils, "dumps", slow_first_dumps)
+
+        timer_save = threading.Thread(target=manager._save_task, args=(task,))
+        timer_save.start()
+        assert entered.wait(timeout=5)
+
+        task.status = TaskStatus.COMPLETED
+        flush = threading.Thread(target=manager.flush, args=(task,))
+        flush.start()
+        time.sleep(0.05)
+        release.set()
+        timer_save.join(timeout=5)
+        flush.join(timeout=5)
+
+        assert read_status(task) == "completed"
+
+
+class TestLogWriter:
+    """Test buffered log file writes."""
+
+    def test_close_writes_buffered_lines(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(LogWriter, "FLUSH_INTERVAL", 60)
+        log_file = tmp_path / "task.log"
+        writer = LogWriter(log_file)
+
+        writer.write("第一行")
+        writer.write("second")
+        assert log_file.read_bytes() == b""
+
+        writer.close()
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert [line.split("] ", 1)[1] for line in lines] == ["第一行", "second"]
+        assert re.fullmatch(r"\[\d\d:\d\d:\d\d\.\d{3}\] 第一行", lines[0])
+
+    def test_reopen_appends(self, tmp_path):
+        log_file = tmp_path / "task.log"
+        for message in ("first run", "resumed"):
+            writer = LogWriter(log_file)
+            writer.write(message)
+            writer.close()
+
+        lines = log_file.read_text(encoding="utf-8").splitlines()
+        assert [line.split("] ", 1)[1] for line in lines] == ["first run", "resumed"]
+
+    def test_background_flush(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(LogWriter, "FLUSH_INTERVAL", 0.01)
+        log_file = tmp_path / "task.log"
+        writer = LogWriter(log_file)
+
+        writer.write("hello")
+        deadline = time.time() + 2
+        while not log_file.read_bytes() and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert log_file.read_bytes().endswith(b"hello\n")
+        writer.close()
+
+    def test_full_buffer_is_written_immediately(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(LogWriter, "FLUSH_INTERVAL", 60)
+        monkeypatch.setattr(LogWriter, "BUFFER_LIMIT", 10)
+        log_file = tmp_path / "task.log"
+        writer = LogWriter(log_file)
+
+        writer.write("a long enough line")
+
+        assert log_file.read_bytes().endswith(b"a long enough line\n")
+        writer.close()
+
+
+class TestWorker:
+    """Test task dispatch to the worker thread."""
+
+    def test_submitted_tasks_run_in_order(self, manager):
+        done = []
+        finished = threading.Event()
+
+        def handler(task, log, label):
+            done.append(label)
+            if len(done) == 3:
+                finished.set()
+
+        manager.start(as_daemon=True)
+        try:
+            for label in ("a", "b", "c"):
+                manager.submit_task("session", handler, label=label)
+            assert finished.wait(timeout=5)
+        finally:
+            manager.stop()
+
+        assert done == ["a", "b", "c"]
+
+    def test_single_worker_by_default(self, manager):
+        assert manager.worker_count == 1
+
+    def test_sessions_run_concurrently(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TASK_WORKER_THREADS", "2")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(TaskManager, "_instance", None)
+        manager = TaskManager()
+        started = threading.Barrier(2, timeout=5)
+        done = threading.Event()
+        results = []
+
+        def handler(task, log, label):
+            started.wait()  # 两个会话的任务必须同时在执行
+            results.append(label)
+            if len(results) == 2:
+                done.set()
+
+        manager.start(as_daemon=True)
+        try:
+            manager.submit_task("session-a", handler, label="a")
+            manager.submit_task("session-b", handler, label="b")
+            assert done.wait(timeout=5)
+        finally:
+            manager.stop()
+
+        assert sorted(results) == ["a", "b"]
+
+    def test_same_session_is_serialized(self, manager):
+        active = []
+        overlaps = []
+        done = threading.Event()
+
+        def handler(task, log, label):
+            active.append(label)
+            overlaps.append(len(active))
+            time.sleep(0.05)
+            active.remove(label)
+            if label == 3:
+                done.set()
+
+        manager.start(as_daemon=True)
+        try:
+            for label in range(4):
+                manager.submit_task("session", handler, label=label)
+            assert done.wait(timeout=5)
+        finally:
+            manager.stop()
+
+        assert overlaps == [1, 1, 1, 1]
+
+    def test_stop_after_signal_releases_lock(self, manager):
+        manager.start(as_daemon=True)
+        manager.running = False  # 信号处理器的效果
+
+        manager.stop()
+
+        assert manager.lock_file_fd is None
+        assert not any(thread.is_alive() for thread in manager.worker_threads)
+
+    def test_idle_workers_exit_at_timeout(self, manager):
+        manager.idle_timeout = 0.2
+        manager.start(as_daemon=True)
+
+        for thread in manager.worker_threads:
+            thread.join(timeout=5)
+
+        assert not manager.running
+        assert manager.lock_file_fd is None
+        assert manager._heartbeat_stop.is_set()
+
+    def test_stop_wakes_blocked_workers(self, manager):
+        manager.start(as_daemon=True)
+
+        started = time.monotonic()
+        manager.stop()
+
+        assert time.monotonic() - started < 0.5
+        assert not any(thread.is_alive() for thread in manager.worker_threads)
+
+    def test_heartbeat_overwrites_lock_record(self, manager):
+        manager.lock_file_path.write_text("x" * 500)  # 上次运行残留的内容
+        assert manager._try_acquire_lock()
+        try:
+            first = manager.lock_file_path.read_bytes()
+            manager._update_heartbeat()
+            second = json.loads(manager.lock_file_path.read_bytes())
+        finally:
+            manager._release_lock()
+
+        assert len(first) == len(json.dumps(second))
+        assert second["pid"] == os.getpid()
+        assert second["started_at"] == json.loads(first)["started_at"]
+
+
+class TestSaveCuration:
+    """Test curation.json export."""
+
+    def test_embeddings_are_not_written(self, manager):
+        from ace_framework.playbook.schemas import (
+            BulletMetadata, DeltaOperation, Playbook, PlaybookBullet, PlaybookUpdateResult
+        )
+
+        def bullet(bullet_id):
+            return PlaybookBullet(
+                id=bullet_id,
+                section="safety_protocols",
+                content="Wear goggles when handling acids",
+                metadata=BulletMetadata(helpful_count=2, embedding=[0.1, 0.2])
+            )
+
+        curation = PlaybookUpdateResult(
+            updated_playbook=Playbook(bullets=[bullet("saf-00001")]),
+            delta_operations=[
+                DeltaOperation(operation="ADD", new_bullet=bullet("saf-00002"), reason="new"),
+                DeltaOperation(operation="REMOVE", bullet_id="saf-00003",
+                               removed_bullet=bullet("saf-00003"), reason="dup"),
+            ]
+        )
+        task = make_task(manager)
+
+        task.save_curation(curation)
+
+        data = json.loads(task.curation_file.read_text(encoding="utf-8"))
+        assert "embedding" not in task.curation_file.read_text(encoding="utf-8")
+        assert data["updated_playbook"]["bullets"][0]["metadata"]["helpful_count"] == 2
+        restored = Playbook.model_validate(data["updated_playbook"])
+        assert restored.bullets[0].metadata.embedding is None
+        assert data["delta_operations"][1]["removed_bullet"]["id"] == "saf-00003"
+
+
+class TestTaskMeta:
+    """Test status-only task summaries."""
+
+    def test_header_is_parsed_without_full_load(self, manager, monkeypatch):
+        task = make_task(manager)
+        task.status = TaskStatus.AWAITING_CONFIRM
+        manager.flush(task)
+
+        monkeypatch.setattr(
+            GenerationTask, "from_dict",
+            classmethod(lambda cls, data, task_dir: pytest.fail("full load"))
+        )
+        metas = manager.get_all_task_meta()
+
+        assert metas == [TaskMeta("t0001", "session", TaskStatus.AWAITING_CONFIRM)]
+
+    def test_unexpected_layout_falls_back_to_full_load(self, manager):
+        task = make_task(manager)
+        data = task.to_dict()
+        reordered = {"status": "failed", **{k: v for k, v in data.items() if k != "status"}}
+        (task.task_dir / "task.json").write_text(json.dumps(reordered), encoding="utf-8")
+
+        assert manager.get_all_task_meta() == [TaskMeta("t0001", "session", TaskStatus.FAILED)]
+
+    def test_resumable_tasks_are_filtered_by_status(self, manager):
+        for task_id, status in (("t0001", TaskStatus.AWAITING_CONFIRM), ("t0002", TaskStatus.FAILED)):
+            task = make_task(manager, task_id)
+            task.status = status
+            manager.flush(task)
+
+        assert [t.task_id for t in manager.get_resumable_tasks()] == ["t0001"]
+
+
+class TestTaskPaths:
+    """Test cached task file paths."""
+
+    def test_paths_are_cached(self, manager):
+        task = make_task(manager)
+
+        assert task.plan_file is task.plan_file
+        assert task.plan_file == task.task_dir / "plan.json"
+        assert task.task_file == task.task_dir / "task.json"
+
+    def test_cache_does_not_affect_equality(self, manager):
+        task = make_task(manager)
+        restored = GenerationTask.from_dict(task.to_dict(), task.task_dir)
+        task.requirements_file
+
+        assert restored == task
+
+
+class TestFilePresence:
+    """Test has_* flags in to_dict."""
+
+    def test_saved_files_skip_stat(self, manager):
+        task = make_task(manager)
+        task.save_requirements({"objective": "合成"})
+        task.save_plan({"title": "方案"})
+        # 删除后仍报告存在：说明没有再检查磁盘
+        task.requirements_file.unlink()
+        task.plan_file.unlink()
+
+        data = task.to_dict()
+
+        assert data["has_requirements"] is True
+        assert data["has_plan"] is True
+
+    def test_unsaved_files_are_checked_on_disk(self, manager):
+        task = make_task(manager)
+        task.templates_file.write_text("[]")
+
+        data = task.to_dict()
+
+        assert data["has_templates"] is True
+        assert data["has_requirements"] is False
+
+    def test_discarded_files_are_rechecked(self, manager):
+        task = make_task(manager)
+        task.save_plan({"title": "方案"})
+        task.plan_file.unlink()
+
+        task.discard_file_state(["plan.json"])
+
+        assert task.to_dict()["has_plan"] is False
+
+
+class TestRestoreTasks:
+    """Test loading tasks at startup."""
+
+    @pytest.mark.parametrize("parallel_min", [1000, 1])
+    def test_restored_tasks_are_cached(self, manager, monkeypatch, parallel_min):
+        monkeypatch.setattr(task_manager_module, "PARALLEL_RESTORE_MIN", parallel_min)
+        for i in range(3):
+            manager.flush(make_task(manager, f"t000{i}"))
+        (manager.tasks_dir / "broken").mkdir()
+        (manager.tasks_dir / "broken" / "task.json").write_text("{")
+
+        manager.tasks.clear()
+        manager._restore_tasks()
+
+        assert sorted(manager.tasks) == ["t0000", "t0001", "t0002"]
+        restored = manager.tasks["t0001"]
+        assert manager.get_task("t0001") is restored
+
+
+class TestSaveFiles:
+    """Test the per-stage task files."""
+
+    def test_requirements_round_trip(self, manager):
+        task = make_task(manager)
+        requirements = {"objective": "合成阿司匹林", "constraints": ["常压"]}
+
+        task.save_requirements(requirements)
+
+        text = task.requirements_file.read_text(encoding="utf-8")
+        assert "合成阿司匹林" in text
+        assert json.loads(text) == requirements
+        assert task.load_requirements() == requirements
+        assert sorted(p.name for p in task.task_dir.iterdir()) == ["requirements.json"]
+
+    def test_missing_requirements_return_none(self, manager):
+        assert make_task(manager).load_requirements() is None
+
+    def test_model_plan_round_trip(self, manager):
+        pydantic = pytest.importorskip("pydantic")
+
+        class Plan(pydantic.BaseModel):
+            title: str
+            steps: list
+
+        task = make_task(manager)
+        plan = Plan(title="阿司匹林合成", steps=[{"n": 1}])
+
+        task.save_plan(plan)
+
+        text = task.plan_file.read_text(encoding="utf-8")
+        assert "阿司匹林合成" in text
+        assert json.loads(text) == plan.model_dump()
+        assert task.to_dict()["has_plan"] is True
+
+
+class TestSingleton:
+    """Test TaskManager singleton construction."""
+
+    def test_constructor_does_not_reset_state(self, manager):
+        task = make_task(manager)
+        manager.tasks[task.task_id] = task
+
+        assert TaskManager() is manager
+        assert TaskManager.instance() is manager
+        assert task_manager_module.get_task_manager() is manager
+        assert manager.tasks == {task.task_id: task}
+
+    def test_concurrent_first_calls_build_once(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(TaskManager, "_instance", None)
+        builds = []
+        original_build = TaskManager._build
+
+        def counting_build(self):
+            builds.append(self)
+            time.sleep(0.05)  # 放大竞争窗口
+            original_build(self)
+
+        monkeypatch.setattr(TaskManager, "_build", counting_build)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(TaskManager.instance()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert all(result is builds[0] for result in results)
+
+
+class TestCreateTaskDir:
+    """Test task ID allocation."""
+
+    def test_colliding_id_is_regenerated(self, tmp_path, monkeypatch):
+        (tmp_path / "aaaaaaaa").mkdir()
+        ids = iter(["a" * 32, "b" * 32])
+        monkeypatch.setattr(
+            task_manager_module.uuid, "uuid4", lambda: SimpleNamespace(hex=next(ids))
+        )
+
+        task_id, task_dir = task_manager_module.create_task_dir(tmp_path)
+
+        assert task_id == "bbbbbbbb"
+        assert task_dir == tmp_path / "bbbbbbbb"
+        assert task_dir.is_dir()
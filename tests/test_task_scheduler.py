@@ -0,0 +1,257 @@
+"""
+Unit tests for TaskScheduler.
+
+Tests worker launch (direct and via the standby worker) and reading task
+logs from task.log.
+"""
+
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from workflow import task_manager as task_manager_module
+from workflow import task_scheduler as task_scheduler_module
+from workflow.task_scheduler import TaskScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    """Create a scheduler rooted in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TASK_WORKER_STANDBY", "0")
+    monkeypatch.setattr(task_manager_module.TaskManager, "_instance", None)
+    monkeypatch.setattr(task_manager_module, "_task_manager", None)
+    return TaskScheduler()
+
+
+def write_log(scheduler: TaskScheduler, content: str, task_id: str = "t0001") -> Path:
+    """Write task.log for a task."""
+    task_dir = scheduler.tasks_dir / task_id
+    task_dir.mkdir()
+    log_file = task_dir / "task.log"
+    log_file.write_bytes(content.encode("utf-8"))
+    return log_file
+
+
+class TestGetLogs:
+    """Test get_logs tailing."""
+
+    @pytest.mark.parametrize("block_size", [8192, 7, 1])
+    @pytest.mark.parametrize("tail", [1, 3, 50])
+    def test_tail_matches_full_read(self, scheduler, monkeypatch, block_size, tail):
+        monkeypatch.setattr(task_scheduler_module, "TAIL_BLOCK_SIZE", block_size)
+        lines = [f"[12:00:{i:02d}.000] 第{i}步 生成方案" for i in range(20)]
+        write_log(scheduler, "\n".join(lines) + "\n")
+
+        assert scheduler.get_logs("t0001", tail=tail) == lines[-tail:]
+
+    def test_missing_trailing_newline(self, scheduler, monkeypatch):
+        monkeypatch.setattr(task_scheduler_module, "TAIL_BLOCK_SIZE", 4)
+        write_log(scheduler, "a\nbb\r\nccc")
+
+        assert scheduler.get_logs("t0001", tail=2) == ["bb", "ccc"]
+        assert scheduler.get_logs("t0001", tail=0) == ["a", "bb", "ccc"]
+
+    def test_empty_and_missing_logs(self, scheduler):
+        write_log(scheduler, "")
+
+        assert scheduler.get_logs("t0001") == ["(暂无日志)"]
+        assert scheduler.get_logs("missing")[0].startswith("❌")
+
+
+class TestSubmitTask:
+    """Test worker subprocess launch."""
+
+    def test_parent_closes_log_handle(self, scheduler, monkeypatch):
+        launched = []
+
+        def fake_popen(cmd, stdout, **kwargs):
+            launched.append(stdout)
+            assert not stdout.closed
+            return SimpleNamespace(pid=12345)
+
+        monkeypatch.setattr(task_scheduler_module.subprocess, "Popen", fake_popen)
+
+        task_id = scheduler.submit_task("session", [{"role": "user", "content": "合成阿司匹林"}])
+
+        assert launched[0].closed
+        assert launched[0].name == str(scheduler.tasks_dir / task_id / "task.log")
+        assert (scheduler.tasks_dir / task_id / "process.pid").read_text() == "12345"
+
+
+class TestProcessInfo:
+    """Test get_all_process_info."""
+
+    def test_tracking_does_not_mutate_snapshot(self, scheduler):
+        finished = SimpleNamespace(poll=lambda: 0, returncode=0)
+        scheduler._track_process("t0001", finished)
+        snapshot = scheduler.processes
+
+        scheduler._track_process("t0002", finished)
+
+        assert list(snapshot) == ["t0001"]
+        assert list(scheduler.processes) == ["t0001", "t0002"]
+
+    def test_counts_log_lines(self, scheduler):
+        write_log(scheduler, "第一行\nsecond\nthird")
+        scheduler._track_process("t0001", SimpleNamespace(poll=lambda: None, returncode=None))
+
+        assert scheduler.get_all_process_info() == {
+            "t0001": {"status": "running", "exit_code": None, "log_lines": 3}
+        }
+
+
+    def test_line_count_is_incremental(self, scheduler, monkeypatch):
+        monkeypatch.setattr(task_scheduler_module, "LINE_COUNT_CHUNK", 4)
+        log_file = write_log(scheduler, "")
+
+        counts = []
+        for content in ("", "a\nbb", "a\nbb\n", "a\nbb\nccc\ndd", "x\n"):
+            log_file.write_bytes(content.encode())
+            with open(log_file, "rb") as f:
+                expected = sum(1 for _ in f)
+            counts.append((scheduler._count_log_lines(log_file), expected))
+
+        assert all(got == expected for got, expected in counts)
+        assert scheduler._line_counts[log_file][2:] == (2, 1, True)
+
+    def test_recreated_log_is_recounted(self, scheduler):
+        log_file = write_log(scheduler, "a\nb\n")
+        assert scheduler._count_log_lines(log_file) == 2
+
+        # 替换为更长的新文件：偏移仍有效，但必须按新 inode 从头统计
+        replacement = log_file.with_name("task.log.new")
+        replacement.write_bytes(b"no newlines here")
+        replacement.replace(log_file)
+        assert scheduler._count_log_lines(log_file) == 1
+
+    def test_same_size_rewrite_is_recounted(self, scheduler):
+        log_file = write_log(scheduler, "a\nb\n")
+        assert scheduler._count_log_lines(log_file) == 2
+        mtime_ns = log_file.stat().st_mtime_ns
+
+        with open(log_file, "r+b") as f:
+            f.write(b"abcd")
+        os.utime(log_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+        assert scheduler._count_log_lines(log_file) == 1
+
+    def test_missing_log_counts_zero(self, scheduler):
+        assert scheduler._count_log_lines(scheduler.tasks_dir / "missing" / "task.log") == 0
+
+
+class FakeProcess:
+    """Stand-in for a standby worker Popen."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.stdin = io.BytesIO()
+        self.stdin.close = lambda: setattr(self, "stdin_closed", True)
+        self.stdin_closed = False
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = -15
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+class TestStandbyWorker:
+    """Test handing tasks to the pre-started standby worker."""
+
+    def test_task_is_sent_to_standby(self, scheduler, monkeypatch):
+        spawned = []
+
+        def fake_popen(cmd, **kwargs):
+            assert cmd[-1] == "--standby"
+            spawned.append(FakeProcess(pid=100 + len(spawned)))
+            return spawned[-1]
+
+        monkeypatch.setattr(task_scheduler_module.subprocess, "Popen", fake_popen)
+        scheduler.standby_enabled = True
+        scheduler._spawn_standby()
+
+        task_id = scheduler.submit_task("session", [{"role": "user", "content": "合成阿司匹林"}])
+
+        task_dir = scheduler.tasks_dir / task_id
+        message = json.loads(spawned[0].stdin.getvalue())
+        assert message == {
+            "task_id": task_id,
+            "resume": False,
+            "log_file": str((task_dir / "task.log").resolve())
+        }
+        assert spawned[0].stdin_closed
+        assert (task_dir / "process.pid").read_text() == "100"
+        assert scheduler.processes[task_id] is spawned[0]
+        assert scheduler._standby is spawned[1]  # 已补充下一个待命进程
+
+    def test_standby_is_spawned_lazily_and_stopped(self, scheduler, monkeypatch):
+        spawned = []
+
+        def fake_popen(cmd, **kwargs):
+            spawned.append(FakeProcess(pid=100 + len(spawned)))
+            spawned[-1].standby = cmd[-1] == "--standby"
+            return spawned[-1]
+
+        monkeypatch.setattr(task_scheduler_module.subprocess, "Popen", fake_popen)
+        scheduler.standby_enabled = True
+        assert scheduler._standby is None  # 初始化时不启动
+
+        scheduler.submit_task("session", [])
+        standby = scheduler._standby
+        # 首个任务直接启动，随后补充待命进程
+        assert [process.standby for process in spawned] == [False, True]
+        assert standby is spawned[1]
+
+        scheduler.cleanup()
+
+        assert scheduler._standby is None
+        assert standby.stdin_closed and standby.returncode == -15
+
+    def test_dead_standby_falls_back_to_direct_launch(self, scheduler, monkeypatch):
+        dead = FakeProcess(pid=100)
+        dead.returncode = 1
+        scheduler._standby = dead
+        launched = []
+
+        def fake_popen(cmd, **kwargs):
+            launched.append(cmd)
+            return SimpleNamespace(pid=200)
+
+        monkeypatch.setattr(task_scheduler_module.subprocess, "Popen", fake_popen)
+
+        task_id = scheduler.submit_task("session", [])
+
+        assert launched[0][-1] == task_id
+        assert (scheduler.tasks_dir / task_id / "process.pid").read_text() == "200"
+        assert not dead.stdin.getvalue()
+
+    def test_standby_worker_writes_to_task_log(self, scheduler):
+        scheduler.standby_enabled = True
+        scheduler._spawn_standby()
+        task_dir = scheduler.tasks_dir / "missing1"
+        task_dir.mkdir()
+        log_file = task_dir / "task.log"
+
+        process = scheduler._start_worker("missing1", log_file)
+        try:
+            assert process.wait(timeout=60) == 1
+        finally:
+            scheduler.cleanup()
+
+        log = log_file.read_text(encoding="utf-8")
+        assert "Task ID: missing1" in log
+        assert "任务 missing1 不存在" in log